@@ -1,17 +1,35 @@
-from PyQt5 import QtCore, QtGui, QtWidgets
-from PyQt5.QtCore import Qt
-from PyQt5 import uic
-from PyQt5 import QtGui
-import re
 import sys
+# Frozen builds run the commands of the jobs through this executable
+if sys.argv[1:2] == ["--adelie-launch"]:
+    import Job_Launcher
+    sys.exit(Job_Launcher.Main(sys.argv[2:]))
+if sys.argv[1:2] == ["--adelie-tcp-probe"]:
+    import TCP_Probe
+    sys.exit(TCP_Probe.Main(sys.argv[2:]))
+import Startup_Profiler
+with Startup_Profiler.Phase("qt_import"):
+    from PyQt5 import QtCore, QtGui, QtWidgets
+    from PyQt5.QtCore import Qt
+    from PyQt5 import QtGui
+import re
 import subprocess
-from main_window_logic import main_window_logic
+with Startup_Profiler.Phase("main_window_import"):
+    from main_window_logic import main_window_logic
 """Main function of and the starting point of this project.
+
+Set ``ADELIE_PROFILE`` to a file path (``-`` for the standard error) to
+write a startup report, see :mod:`Startup_Profiler`.
 """
 if __name__ == '__main__':
-    app = QtWidgets.QApplication(sys.argv)
-    ui = main_window_logic(None)
+    with Startup_Profiler.Phase("qapplication"):
+        app = QtWidgets.QApplication(sys.argv)
+    # --prewarm creates the network tools pages once the window is shown
+    with Startup_Profiler.Phase("main_window"):
+        ui = main_window_logic(None, prewarm="--prewarm" in sys.argv)
 
-    ui.show()
+    with Startup_Profiler.Phase("show"):
+        ui.show()
+    # Runs once the first events, including the first paint, are handled
+    QtCore.QTimer.singleShot(0, Startup_Profiler.Write_Report)
 
     sys.exit(app.exec_())
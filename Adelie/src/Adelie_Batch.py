@@ -0,0 +1,306 @@
+"""
+    Headless entry point that runs a file of commands.
+
+    ``Adelie_Batch.py`` runs commands on a machine without a display, for
+    example nightly checks on a server. It reads one command per line, in
+    the format of the command history of the pages (``sort data | uniq
+    -c``), runs them through the :class:`Job_Manager.Job_Manager` used by
+    the pages and writes one JSON line per command to the standard output as
+    soon as it exits.
+
+    Only ``QtCore`` is imported, neither a display nor ``QtWidgets`` is
+    needed.
+
+    Example:
+        Run the commands of ``checks.txt``, 8 at a time, each for at most a
+        minute::
+
+            python Adelie_Batch.py --jobs 8 --timeout 60 checks.txt
+
+        Each result is a JSON line::
+
+            {"line": 3, "command": "df -h /", "state": "Finished",
+             "exit_code": 0, "exit_codes": [0], "timed_out": false, ...}
+
+    Blank lines, lines starting with ``#`` and the lines the pages add to
+    the history once a command exits (``df -h / -> exit 0, ...``) are
+    skipped. The exit code is ``0`` if every command succeeded, ``1``
+    otherwise and ``130`` if the batch was interrupted.
+
+    Attributes:
+        PAGE (str): Page of the batch jobs in the :mod:`History_Store`.
+        ANNOTATION (Pattern): Matches the lines added to the history once a
+            command exits.
+        SKIPPED (list): History entries that are not commands.
+"""
+
+import argparse
+import json
+import re
+import signal
+import sys
+from PyQt5.QtCore import QCoreApplication, QTimer
+from GNU_Pipeline import Parse_Stages
+import History_Store
+import Job_Manager
+
+
+PAGE = "batch"
+ANNOTATION = re.compile(r" -> (exit -?\d+|killed|queued)(, .*)?$")
+SKIPPED = ["clear", "Keyboard: Ctrl+C"]
+
+
+def Read_Commands(lines):
+    """Reads the commands of a batch file.
+
+    Args:
+        lines (:obj:`list` of ``str``): Lines of the file.
+
+    Returns:
+        :obj:`list` of ``tuple``: Line number, command and stages of each
+        command, the stages are the error message if the command can not be
+        parsed. See :func:`GNU_Pipeline.Parse_Stages`.
+    """
+
+    commands = []
+    for number, line in enumerate(lines, 1):
+        command = line.strip()
+        if (command == "" or command.startswith("#") or command in SKIPPED
+                or ANNOTATION.search(command)):
+            continue
+        try:
+            stages = Parse_Stages(command)
+        except ValueError as error:
+            stages = str(error)
+        commands.append((number, command, stages))
+    return commands
+
+
+class Batch_Runner():
+    """Submits the commands of a batch and writes their results.
+
+    Args:
+        manager (:obj:`Job_Manager`): Manager that runs the commands.
+        output (:obj:`file`): Stream the JSON lines are written to.
+        timeout (:obj:`float`): Seconds each command may run, ``None`` for
+            no limit.
+        cache (:obj:`bool`): ``True`` to replay the cached results of the
+            read-only commands, see :mod:`Result_Cache`.
+        keep_output (:obj:`bool`): ``False`` to leave the output of the
+            commands out of the results.
+
+    Attributes:
+        manager (:obj:`Job_Manager`): See Args.
+        output (:obj:`file`): See Args.
+        timeout (:obj:`float`): See Args.
+        cache (:obj:`bool`): See Args.
+        keep_output (:obj:`bool`): See Args.
+        lines (:obj:`dict`): Contains the job id and the line number of its
+            command.
+        outputs (:obj:`dict`): Contains the job id and the standard output
+            and error read so far.
+        submitting (:obj:`int`): Line number of the command being
+            submitted.
+        remaining (:obj:`int`): Number of commands that did not exit yet.
+        failed (:obj:`bool`): ``True`` if a command failed.
+        interrupted (:obj:`bool`): ``True`` once the batch was interrupted.
+    """
+
+    def __init__(self, manager, output, timeout=None, cache=False,
+                 keep_output=True):
+        self.manager = manager
+        self.output = output
+        self.timeout = timeout
+        self.cache = cache
+        self.keep_output = keep_output
+        self.lines = {}
+        self.outputs = {}
+        self.submitting = None
+        self.remaining = 0
+        self.failed = False
+        self.interrupted = False
+        self.manager.job_added.connect(self.Job_Added)
+        self.manager.output_ready.connect(
+            lambda job_id, text, data: self.Job_Output(job_id, 0, text))
+        self.manager.error_ready.connect(
+            lambda job_id, text, data: self.Job_Output(job_id, 1, text))
+        self.manager.job_finished.connect(self.Job_Finished)
+
+    def Start(self, commands):
+        """Submits the commands, they run up to the manager limit at once.
+
+        Args:
+            commands (:obj:`list` of ``tuple``): See :func:`Read_Commands`.
+        """
+
+        self.remaining = len(commands)
+        for number, command, stages in commands:
+            if isinstance(stages, str):
+                self.Write({"line": number, "command": command,
+                            "error": stages})
+                self.failed = True
+                self.remaining -= 1
+                continue
+            # A job can finish inside Submit, with a cached result
+            self.submitting = number
+            self.manager.Submit(PAGE, command, stages, self.cache,
+                                self.timeout)
+        self.submitting = None
+        self.Check_Done()
+
+    def Job_Added(self, job_id):
+        """Records the line of a new job.
+
+        Args:
+            job_id (:obj:`int`): Id of the job.
+        """
+
+        self.lines[job_id] = self.submitting
+        self.outputs[job_id] = ([], [])
+
+    def Job_Output(self, job_id, channel, text):
+        """Keeps the output of a job.
+
+        Args:
+            job_id (:obj:`int`): Id of the job.
+            channel (:obj:`int`): ``0`` for the standard output, ``1`` for
+                the standard error.
+            text (:obj:`str`): Decoded output.
+        """
+
+        if self.keep_output and job_id in self.outputs:
+            self.outputs[job_id][channel].append(text)
+
+    def Job_Finished(self, job_id):
+        """Writes the result of a job.
+
+        Args:
+            job_id (:obj:`int`): Id of the job.
+        """
+
+        job = self.manager.jobs[job_id]
+        stdout, stderr = self.outputs.pop(job_id)
+        result = {
+                "line": self.lines.pop(job_id),
+                "command": job.command,
+                "state": job.state,
+                "exit_code": job.exit_code,
+                "exit_codes": job.exit_codes,
+                "timed_out": job.timed_out,
+                "cached": job.cached,
+                "duration": job.Get_Duration(),
+                "resources": job.resources
+                }
+        if self.keep_output:
+            result["stdout"] = "".join(stdout)
+            result["stderr"] = "".join(stderr)
+        self.Write(result)
+        if job.state != Job_Manager.FINISHED or job.exit_code != 0:
+            self.failed = True
+        self.remaining -= 1
+        self.Check_Done()
+
+    def Write(self, result):
+        """Writes a result as a JSON line.
+
+        Args:
+            result (:obj:`dict`): Result of a command.
+        """
+
+        self.output.write(json.dumps(result) + "\n")
+        self.output.flush()
+
+    def Check_Done(self):
+        """Quits once every command exited.
+        """
+
+        if self.remaining == 0 and self.submitting is None:
+            QCoreApplication.exit(self.Get_Exit_Code())
+
+    def Interrupt(self):
+        """Kills the running commands and drops the queued ones, their
+        results are still written.
+        """
+
+        self.interrupted = True
+        for job in self.manager.Get_Jobs(
+                states=(Job_Manager.QUEUED, Job_Manager.RUNNING)):
+            self.manager.Kill(job.job_id)
+
+    def Get_Exit_Code(self):
+        """Returns the exit code of the batch.
+
+        Returns:
+            :obj:`int`: ``130`` if interrupted, ``1`` if a command failed,
+            ``0`` otherwise.
+        """
+
+        if self.interrupted:
+            return 130
+        return 1 if self.failed else 0
+
+
+def Main(argv):
+    """Runs a batch file.
+
+    Args:
+        argv (:obj:`list` of ``str``): Command line arguments, see
+            ``Adelie_Batch.py --help``.
+
+    Returns:
+        :obj:`int`: Exit code of the batch, see
+        :meth:`Batch_Runner.Get_Exit_Code`.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="Adelie_Batch.py",
+        description="Run a file of commands without a display and write "
+                    "one JSON line per command.")
+    parser.add_argument("file", help="file of commands, - for the standard "
+                                     "input")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="number of commands run at once")
+    parser.add_argument("-t", "--timeout", type=float, default=None,
+                        help="seconds each command may run")
+    parser.add_argument("--cache", action="store_true",
+                        help="replay the results of read-only commands run "
+                             "again on unchanged files")
+    parser.add_argument("--history", action="store_true",
+                        help="record the commands in the Adelie history")
+    parser.add_argument("--no-output", action="store_true",
+                        help="leave the output of the commands out of the "
+                             "results")
+    arguments = parser.parse_args(argv)
+
+    try:
+        if arguments.file == "-":
+            lines = sys.stdin.read().splitlines()
+        else:
+            with open(arguments.file, encoding="utf8") as batch_file:
+                lines = batch_file.read().splitlines()
+    except OSError as error:
+        parser.error(str(error))
+    commands = Read_Commands(lines)
+
+    app = QCoreApplication([sys.argv[0]])
+    if arguments.history:
+        store = History_Store.Get_Store()
+    else:
+        store = History_Store.History_Store(":memory:")
+    # The results are written as soon as the jobs exit, none is kept
+    manager = Job_Manager.Job_Manager(limit=arguments.jobs, history=0,
+                                      store=store)
+    runner = Batch_Runner(manager, sys.stdout, arguments.timeout,
+                          arguments.cache, not arguments.no_output)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda signum, frame: runner.Interrupt())
+    # Python signal handlers only run between two Qt events
+    wake_timer = QTimer()
+    wake_timer.timeout.connect(lambda: None)
+    wake_timer.start(200)
+    QTimer.singleShot(0, lambda: runner.Start(commands))
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(Main(sys.argv[1:]))
@@ -1,6 +1,7 @@
 from PyQt5 import QtCore, QtGui, QtWidgets, QtWidgets
 from PyQt5.QtCore import pyqtSignal, pyqtSlot, QObject, Qt, QTime
-from PyQt5 import uic
+import UI_Loader
+import Startup_Profiler
 from crontab import CronTab
 import os
 import sys
@@ -9,7 +10,7 @@ CURRENT_DIR = os.path.dirname(os.path.realpath(__file__))
 PARENT_DIR = os.path.dirname(CURRENT_DIR)
 GUI_DIR = os.path.join(CURRENT_DIR, "GUI")
 ui_filename = os.path.join(GUI_DIR, "crontab_options.ui")
-baseUIClass, baseUIWidget = uic.loadUiType(ui_filename)
+baseUIClass, baseUIWidget = UI_Loader.Load_Ui_Type(ui_filename)
 
 
 class CronTab_Options_Logic(baseUIClass, baseUIWidget):
@@ -44,6 +45,7 @@ class CronTab_Options_Logic(baseUIClass, baseUIWidget):
     month = ""
     dayOfWeek = ""
 
+    @Startup_Profiler.Profiled("CronTab_Options_Logic")
     def __init__(self, parent=None):
 
         super(CronTab_Options_Logic, self).__init__(parent)
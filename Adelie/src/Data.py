@@ -15,6 +15,31 @@
             ``format`` mandatory options. 
         FMT_Files (dict): ist that contains the ToolTips for the files
             ``format`` mandatory options.
+        GNU_Coreutils (list): List that contains the GNU Core Utilities
+            recognized when the package manager is not supported.
+        GNU_Excluded (list): List that contains the tools that are never
+            displayed.
+        Scrollback_Lines (int): Maximum number of lines kept by the output
+            terminals, the full output is kept in the spool files.
+        Spool_Files (int): Number of commands whose full output is kept
+            on disk by each terminal, see :mod:`Output_Spool`.
+        Job_Limit (int): Number of commands run at the same time, the
+            others wait in a queue, see :mod:`Job_Manager`.
+        Job_History (int): Number of finished commands kept in the job
+            table with their output.
+        Pure_Tools (list): Tools that only read their files and whose
+            output only depends on their arguments and files. Their output
+            can be replayed by :mod:`Result_Cache`.
+        Impure_Options (dict): Contains a pure tool and its options that
+            write files or follow changes, the tool is then not cached.
+        Result_Cache_Bytes (int): Maximum size of the outputs kept by
+            :mod:`Result_Cache`.
+        Ping_Samples (int): Number of replies of each ping kept for its
+            statistics, see :mod:`Ping_Stats`.
+        Sweep_Limit (int): Number of targets pinged at the same time by a
+            sweep, see :mod:`Ping_Sweep`.
+        Sweep_Max_Targets (int): Maximum number of targets of a sweep, a
+            ``/20`` range.
 """
 
 import sys
@@ -158,3 +183,55 @@ FMT_Files = {
   "%Z":   "time of last status change, seconds since Epoch",
 }
 
+# GNU Core Utilities recognized by GNU_Discovery
+# when the package manager is not supported
+GNU_Coreutils = [
+  "arch", "b2sum", "base32", "base64", "basename", "basenc", "cat", "chcon",
+  "chgrp", "chmod", "chown", "chroot", "cksum", "comm", "cp", "csplit",
+  "cut", "date", "dd", "df", "dir", "dircolors", "dirname", "du", "echo",
+  "env", "expand", "expr", "factor", "fmt", "fold", "groups", "head",
+  "hostid", "id", "install", "join", "link", "ln", "logname", "ls",
+  "md5sum", "mkdir", "mkfifo", "mknod", "mktemp", "mv", "nice", "nl",
+  "nohup", "nproc", "numfmt", "od", "paste", "pathchk", "pinky", "pr",
+  "printenv", "printf", "ptx", "pwd", "readlink", "realpath", "rm",
+  "rmdir", "runcon", "seq", "sha1sum", "sha224sum", "sha256sum",
+  "sha384sum", "sha512sum", "shred", "shuf", "sleep", "sort", "split",
+  "stat", "stdbuf", "stty", "sum", "sync", "tac", "tail", "tee", "test",
+  "timeout", "touch", "tr", "true", "truncate", "tsort", "tty", "uname",
+  "unexpand", "uniq", "unlink", "users", "vdir", "wc", "who", "whoami",
+  "yes"
+]
+# false returns exit code of 1
+# [ is test
+GNU_Excluded = ["false", "[", "coreutils"]
+
+Scrollback_Lines = 5000
+
+Spool_Files = 4
+
+Job_Limit = 4
+
+Job_History = 100
+
+Pure_Tools = [
+  "b2sum", "base32", "base64", "basename", "basenc", "cat", "cksum", "comm",
+  "cut", "dirname", "expand", "factor", "fmt", "fold", "head", "join", "ls",
+  "md5sum", "nl", "numfmt", "od", "paste", "pr", "printf", "readlink",
+  "realpath", "seq", "sha1sum", "sha224sum", "sha256sum", "sha384sum",
+  "sha512sum", "sort", "stat", "sum", "tac", "tail", "tr", "tsort",
+  "unexpand", "uniq", "wc"
+]
+
+Impure_Options = {
+  "ls": ["-R", "--recursive"],
+  "sort": ["-o", "--output"],
+  "tail": ["-f", "-F", "--follow"]
+}
+
+Result_Cache_Bytes = 32 * 1024 * 1024
+
+Ping_Samples = 4096
+
+Sweep_Limit = 64
+
+Sweep_Max_Targets = 4096
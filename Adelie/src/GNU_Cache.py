@@ -0,0 +1,209 @@
+"""
+    This module is the on-disk cache for the :mod:`GNU_Handler`.
+
+    It stores the metadata parsed from each tool's ``--help`` (description,
+    options, options descriptions, arguments and mandatory options) so Adelie
+    does not have to invoke every GNU Core Utility on each launch.
+
+    Every entry is keyed on the tool's binary path, inode and modification
+    time. The whole file is keyed on :attr:`CACHE_VERSION` and the current
+    locale, since ``--help`` output is translated.
+
+    Attributes:
+        CACHE_VERSION (int): Version of the cache file format. Bump it whenever
+            the parsed metadata format changes, old files are then ignored.
+        CACHE_DIR (str): Directory that contains Adelie's cache files.
+            Follows ``$XDG_CACHE_HOME`` and defaults to ``~/.cache/adelie``.
+        CACHE_FILE (str): Path of the GNU Core Utilities metadata cache.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+
+CACHE_VERSION = 2
+CACHE_DIR = os.path.join(
+                        os.environ.get("XDG_CACHE_HOME",
+                                       os.path.expanduser("~/.cache")),
+                        "adelie")
+CACHE_FILE = os.path.join(CACHE_DIR, "gnu_tools.json")
+
+
+def Get_Locale():
+    """Returns the locale used by the tools to translate their ``--help``.
+
+    Returns:
+        :obj:`str`: ``LANGUAGE`` and the effective ``LC_MESSAGES`` locale
+        separated by ``|``.
+    """
+
+    messages = "C"
+    for variable in ("LC_ALL", "LC_MESSAGES", "LANG"):
+        if os.environ.get(variable):
+            messages = os.environ[variable]
+            break
+    return os.environ.get("LANGUAGE", "") + "|" + messages
+
+
+class GNU_Cache():
+    """Versioned cache file of the GNU Core Utilities parsed ``--help``.
+
+    Args:
+        path (:obj:`str`): Cache file path, defaults to :attr:`CACHE_FILE`.
+
+    Attributes:
+        path (:obj:`str`): Cache file path.
+        locale (:obj:`str`): Locale the cached metadata was parsed in.
+            See :func:`Get_Locale`.
+        discovery (:obj:`dict`): The tools found by
+            :class:`GNU_Discovery.GNU_Discovery` and the key of the ``PATH``
+            and package database state they were found in.
+        entries (:obj:`dict`): Contains the tool name and its cache entry
+            ``{"key": [path, inode, mtime], "data": {...}}``, ``data`` is
+            the dictionary of the tool's :class:`GNU_ToolSpec.ToolSpec`.
+        changed (:obj:`bool`): ``True`` if entries were added since the
+            cache was loaded.
+
+    Note:
+        A missing, corrupted or outdated cache file is never an error,
+        the cache simply starts empty and the tools are harvested again.
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.locale = Get_Locale()
+        self.entries = {}
+        self.discovery = {}
+        self.changed = False
+        self.Load()
+
+    def Load(self):
+        """Loads the cache file, ignores it if its version or locale differ.
+        """
+
+        try:
+            with open(self.path, "r", encoding="utf8") as cache_file:
+                content = json.load(cache_file)
+        except (OSError, ValueError):
+            return
+        if not isinstance(content, dict):
+            return
+        if (content.get("version") != CACHE_VERSION
+                or content.get("locale") != self.locale):
+            return
+        self.entries = content.get("tools", {})
+        self.discovery = content.get("discovery", {})
+
+    def Save(self):
+        """Writes the cache file if it changed.
+
+        The file is written to a temporary file first then renamed, a crash
+        while saving can not leave a truncated cache behind.
+        """
+
+        if not self.changed:
+            return
+        content = {
+                    "version": CACHE_VERSION,
+                    "locale": self.locale,
+                    "tools": self.entries,
+                    "discovery": self.discovery
+                    }
+        try:
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf8") as tmp_file:
+                json.dump(content, tmp_file, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # Read only home or full disk, Adelie still works without a cache
+            return
+        self.changed = False
+
+    def Tool_Key(self, tool_name, path=None):
+        """Returns the key that identifies the tool binary.
+
+        Args:
+            tool_name (:obj:`str`): Tool's name.
+            path (:obj:`str`): Tool's path if it is already known, otherwise
+                the tool is looked up in ``PATH``.
+
+        Returns:
+            :obj:`list`: ``[path, inode, mtime]`` of the tool binary, ``None``
+            if the tool is not found in ``PATH``.
+        """
+
+        if path is None:
+            path = shutil.which(tool_name)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [path, stat.st_ino, stat.st_mtime_ns]
+
+    def Get(self, tool_name, path=None):
+        """Returns the cached metadata of a tool.
+
+        Args:
+            tool_name (:obj:`str`): Tool's name.
+            path (:obj:`str`): Tool's path, see :meth:`Tool_Key`.
+
+        Returns:
+            :obj:`dict`: Tool's metadata, ``None`` if the tool is not cached
+            or its binary changed since it was cached.
+        """
+
+        entry = self.entries.get(tool_name)
+        if entry is None:
+            return None
+        key = self.Tool_Key(tool_name, path)
+        if key is None or entry.get("key") != key:
+            return None
+        return entry.get("data")
+
+    def Set(self, tool_name, data, path=None):
+        """Caches the metadata of a tool.
+
+        Args:
+            tool_name (:obj:`str`): Tool's name.
+            data (:obj:`dict`): Tool's metadata.
+            path (:obj:`str`): Tool's path, see :meth:`Tool_Key`.
+        """
+
+        key = self.Tool_Key(tool_name, path)
+        if key is None:
+            return
+        self.entries[tool_name] = {"key": key, "data": data}
+        self.changed = True
+
+    def Get_Discovery(self, key):
+        """Returns the cached tools found by the discovery.
+
+        Args:
+            key (:obj:`list`): ``PATH`` and package database state, see
+                :meth:`GNU_Discovery.GNU_Discovery.Key`.
+
+        Returns:
+            :obj:`dict`: Contains the tool name and its path, ``None`` if the
+            state changed since the tools were found.
+        """
+
+        if self.discovery.get("key") != key:
+            return None
+        return self.discovery.get("tools")
+
+    def Set_Discovery(self, key, tools):
+        """Caches the tools found by the discovery.
+
+        Args:
+            key (:obj:`list`): ``PATH`` and package database state.
+            tools (:obj:`dict`): Contains the tool name and its path.
+        """
+
+        self.discovery = {"key": key, "tools": tools}
+        self.changed = True
@@ -0,0 +1,305 @@
+"""
+    This module finds the GNU Core Utilities installed on the host system.
+
+    The directories of ``PATH`` are scanned with :func:`os.scandir`, a tool
+    is a GNU Core Utility if the package manager says it belongs to the
+    ``coreutils`` package, or if it is a link to the single multicall
+    ``coreutils`` binary. Hosts without a supported package manager fall
+    back to :attr:`Data.GNU_Coreutils`.
+
+    Package managers are supported through backends, see
+    :class:`Discovery_Backend`. They read the package database files
+    directly when possible, nothing is invoked on Debian or Alpine hosts.
+
+    Attributes:
+        BACKENDS (:obj:`list`): Backends tried in order, the first available
+            backend is used.
+"""
+
+import abc
+import os
+import shutil
+import subprocess
+import Data
+
+
+class Discovery_Backend(abc.ABC):
+    """Finds the tools that belong to the ``coreutils`` package.
+
+    Each backend implements :meth:`Get_Tools`.
+
+    Attributes:
+        name (:obj:`str`): Package manager's name.
+        database (:obj:`list` of ``str``): Files that change when the
+            package is installed, upgraded or removed.
+        bin_dirs (:obj:`tuple` of ``str``): Directories that contain the
+            tools in the package.
+    """
+
+    name = ""
+    database = []
+    bin_dirs = ("/bin/", "/usr/bin/", "/sbin/", "/usr/sbin/")
+
+    def Get_Database(self):
+        """Returns the first package database file that exists.
+
+        Returns:
+            :obj:`str`: Database file path, ``None`` if the package manager
+            is not installed.
+        """
+
+        for path in self.database:
+            if os.path.exists(path):
+                return path
+        return None
+
+    def Is_Available(self):
+        """Returns True if the package manager is installed.
+
+        Returns:
+            :obj:`bool`: Returns ``True`` if the backend can be used.
+        """
+
+        return self.Get_Database() is not None
+
+    def Key(self):
+        """Returns the key that identifies the package database state.
+
+        Returns:
+            :obj:`list`: ``[backend, path, mtime]`` of the database file.
+        """
+
+        path = self.Get_Database()
+        return [self.name, path, os.stat(path).st_mtime_ns]
+
+    @abc.abstractmethod
+    def Get_Tools(self):
+        """Returns the tools that belong to the ``coreutils`` package.
+
+        Returns:
+            :obj:`set` of ``str``: Tools' names, ``None`` if the package is
+            not found.
+        """
+
+    def Tools_From_Files(self, files):
+        """Returns the names of the files installed in :attr:`bin_dirs`.
+
+        Args:
+            files (:obj:`iterable` of ``str``): Absolute paths of the
+                package files.
+
+        Returns:
+            :obj:`set` of ``str``: Tools' names.
+        """
+
+        tools = set()
+        for path in files:
+            directory, name = os.path.split(path)
+            if directory + "/" in self.bin_dirs and name != "":
+                tools.add(name)
+        return tools
+
+
+class Dpkg_Backend(Discovery_Backend):
+    """Reads the ``coreutils`` file list of ``dpkg`` (Debian, Ubuntu).
+    """
+
+    name = "dpkg"
+    database = ["/var/lib/dpkg/info/coreutils.list"]
+
+    def Get_Tools(self):
+        try:
+            with open(self.Get_Database(), "r", encoding="utf8") as file_list:
+                return self.Tools_From_Files(file_list.read().split("\n"))
+        except OSError:
+            return None
+
+
+class Apk_Backend(Discovery_Backend):
+    """Reads the installed packages database of ``apk`` (Alpine).
+    """
+
+    name = "apk"
+    database = ["/lib/apk/db/installed"]
+
+    def Get_Tools(self):
+        files = []
+        package = None
+        directory = ""
+        try:
+            with open(self.Get_Database(), "r", encoding="utf8") as installed:
+                for line in installed:
+                    # Each package is a block of "K:value" lines
+                    key, _, value = line.rstrip("\n").partition(":")
+                    if key == "P":
+                        package = value
+                    elif package != "coreutils":
+                        continue
+                    elif key == "F":
+                        directory = "/" + value
+                    elif key == "R":
+                        files.append(directory + "/" + value)
+        except OSError:
+            return None
+        if files == []:
+            return None
+        return self.Tools_From_Files(files)
+
+
+class Rpm_Backend(Discovery_Backend):
+    """Queries ``rpm`` for the ``coreutils`` files (Fedora, RHEL, SUSE).
+
+    Note:
+        ``rpm`` is invoked, the result is cached by :class:`GNU_Discovery`
+        until the rpm database changes.
+    """
+
+    name = "rpm"
+    database = ["/var/lib/rpm/rpmdb.sqlite", "/var/lib/rpm/Packages",
+                "/usr/lib/sysimage/rpm/rpmdb.sqlite",
+                "/usr/lib/sysimage/rpm/Packages.db"]
+
+    def Is_Available(self):
+        return (shutil.which("rpm") is not None
+                and self.Get_Database() is not None)
+
+    def Get_Tools(self):
+        # coreutils-single ships the multicall binary
+        for package in ("coreutils", "coreutils-single"):
+            try:
+                res = subprocess.check_output(("rpm", "-ql", package),
+                                              universal_newlines=True,
+                                              stderr=subprocess.DEVNULL)
+            except (OSError, subprocess.CalledProcessError):
+                continue
+            return self.Tools_From_Files(res.split("\n"))
+        return None
+
+
+BACKENDS = [Dpkg_Backend, Apk_Backend, Rpm_Backend]
+
+
+class GNU_Discovery():
+    """Finds the GNU Core Utilities in ``PATH``.
+
+    Args:
+        cache (:class:`GNU_Cache.GNU_Cache`): Cache that keeps the tools
+            found until ``PATH`` or the package database change.
+        backends (:obj:`list`): Backend classes to try, defaults to
+            :attr:`BACKENDS`.
+
+    Attributes:
+        excluded (:obj:`list` of ``str``): Tools never listed, see
+            :attr:`Data.GNU_Excluded`.
+        multicall (:obj:`str`): Name of the multicall binary.
+    """
+
+    excluded = Data.GNU_Excluded
+    multicall = "coreutils"
+
+    def __init__(self, cache=None, backends=None):
+        self.cache = cache
+        self.backend = None
+        for backend in (backends if backends is not None else BACKENDS):
+            if backend().Is_Available():
+                self.backend = backend()
+                break
+
+    def Get_Path_Dirs(self):
+        """Returns the directories of ``PATH`` without duplicates.
+
+        Returns:
+            :obj:`list` of ``str``: Directories in ``PATH`` order.
+        """
+
+        dirs = []
+        for directory in os.environ.get("PATH", os.defpath).split(os.pathsep):
+            directory = directory or "."
+            if directory not in dirs:
+                dirs.append(directory)
+        return dirs
+
+    def Key(self):
+        """Returns the key that identifies ``PATH`` and the package database.
+
+        Returns:
+            :obj:`list`: ``PATH`` directories and modification times, and
+            the backend key.
+        """
+
+        key = []
+        for directory in self.Get_Path_Dirs():
+            try:
+                key.append([directory, os.stat(directory).st_mtime_ns])
+            except OSError:
+                continue
+        if self.backend is not None:
+            key.append(self.backend.Key())
+        return key
+
+    def Find_Tools(self):
+        """Returns the GNU Core Utilities installed on the system.
+
+        The result is taken from the cache if ``PATH`` and the package
+        database did not change since the last scan.
+
+        Returns:
+            :obj:`dict`: Contains the tool name and its path, sorted by name.
+        """
+
+        key = self.Key()
+        if self.cache is not None:
+            tools = self.cache.Get_Discovery(key)
+            if tools is not None:
+                return tools
+        tools = self.Scan()
+        if self.cache is not None:
+            self.cache.Set_Discovery(key, tools)
+            self.cache.Save()
+        return tools
+
+    def Scan(self):
+        """Scans ``PATH`` for the GNU Core Utilities.
+
+        Returns:
+            :obj:`dict`: Contains the tool name and its path, sorted by name.
+        """
+
+        known = None
+        if self.backend is not None:
+            known = self.backend.Get_Tools()
+        if known is None:
+            known = set(Data.GNU_Coreutils)
+        found = {}
+        links = {}
+        multicall = None
+        for directory in self.Get_Path_Dirs():
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    name = entry.name
+                    if name == self.multicall:
+                        if multicall is None:
+                            multicall = entry.path
+                        continue
+                    # The first tool in PATH is the one the shell executes
+                    if name in found or name in self.excluded or "." in name:
+                        continue
+                    if name in known:
+                        if os.access(entry.path, os.X_OK):
+                            found[name] = entry.path
+                    elif entry.is_symlink() and name not in links:
+                        links[name] = entry.path
+        if multicall is not None:
+            # Links to the multicall binary are GNU Core Utilities even if
+            # the package database does not list them
+            multicall = os.path.realpath(multicall)
+            for name, path in links.items():
+                if name in found:
+                    continue
+                if os.path.realpath(path) == multicall:
+                    found[name] = path
+        return dict(sorted(found.items()))
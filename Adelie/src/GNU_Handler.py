@@ -1,7 +1,15 @@
-import re
 import subprocess
 import Data
 import sys
+import os
+import threading
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from GNU_Cache import GNU_Cache
+from GNU_Discovery import GNU_Discovery
+from GNU_ToolSpec import ToolSpec
+import GNU_ToolSpec
+import Startup_Profiler
 
 
 
@@ -26,6 +34,8 @@ class GNU_Handler():
         gnu_tool (:obj:`list` of ``str``): Contains the GNU Core Utils 
             installed on the system.
 
+        tool_Paths (:obj:`dict`): Contains Tool name and its path.
+
         ToolName_ToolDescription (:obj:`dict`): A dictionary that contains
             the tool name and its description
 
@@ -33,6 +43,35 @@ class GNU_Handler():
 
         Name_OptionDescription_Option (:obj:`dict`): Contains the Tool name 
         options description and options. 
+
+        tool_Specs (:obj:`dict`): Contains Tool name and its parsed
+            ``--help``, see :class:`GNU_ToolSpec.ToolSpec`.
+
+        Description_ToolName (:obj:`dict`): Reverse index of
+            :attr:`ToolName_ToolDescription` {Tool Description: Tool name}.
+
+        Name_Option_OptionDescription (:obj:`dict`): Reverse index of
+            :attr:`Name_OptionDescription_Option`, contains the Tool name
+            options and options description.
+
+        Options_Descriptions_Views (:obj:`dict`): Contains Tool name and a
+            :obj:`tuple` of its options descriptions, built once per tool.
+
+        cache (:class:`GNU_Cache`): On-disk cache of the parsed ``--help``
+            of the tools.
+
+        workers (:obj:`int`): Maximum number of tools harvested at the same
+            time, defaults to the number of CPU cores.
+
+        executor (:obj:`str`): ``thread`` or ``process``, the kind of pool
+            used to harvest the tools at startup.
+
+        lazy (:obj:`bool`): If ``True`` only the cached tools are loaded at
+            startup, the other tools are resolved in the background using
+            :meth:`Resolve_Async` and :meth:`Harvest_Remaining`.
+
+        pending (:obj:`dict`): Contains Tool name and the
+            :obj:`concurrent.futures.Future` of its background harvest.
         
         types (:obj:`dict`) : Contains the supported arguments taken from 
             :mod:`.Data`
@@ -40,13 +79,32 @@ class GNU_Handler():
 
     types = Data.types
     gnu_tools = []
+    tool_Paths = {}
     ToolName_ToolDescription = {}
     tool_Options = {}
     Name_OptionDescription_Option = {}
-
-    def __init__(self):
+    tool_Specs = {}
+    Description_ToolName = {}
+    Name_Option_OptionDescription = {}
+    Options_Descriptions_Views = {}
+
+    def __init__(self, cache=None, workers=None, executor="thread",
+                 lazy=False):
+        self.cache = cache if cache is not None else GNU_Cache()
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = executor
+        self.lazy = lazy
+        self.pending = {}
+        self.lock = threading.RLock()
+        # Background harvest pool and the pool of the tools the user is
+        # waiting for. Created on first use.
+        self.pool = None
+        self.priority_pool = None
         self.Create_GNU_Tools()
-        self.Create_GNU_Descriptions()
+        if lazy:
+            self.Load_Cached_Tools()
+        else:
+            self.Create_GNU_Descriptions()
 
     def Get_Tool_Help(self, tool_name):
         """Returns the result of ``--help`` of a tool given as a parameter
@@ -62,21 +120,19 @@ class GNU_Handler():
                                       universal_newlines=True)
         return res
 
+    @Startup_Profiler.Profiled("gnu_discovery")
     def Create_GNU_Tools(self):
         """ 
             Finds GNU Coreutils Installed on the System.
+
+            Scans ``PATH`` using :class:`GNU_Discovery.GNU_Discovery`,
+            the result is cached until ``PATH`` or the package database
+            change.
         """
 
-        installed_utils = []
-        res = subprocess.check_output(("dpkg", "-s", "coreutils"),
-                                      universal_newlines=True)
-        regex = r"Specifically, this package includes:\n ([\w \w+\n|*]+\n)"
-        srch = re.search(regex, res)
-        installed_utils = srch[1].split()
-        # false returns exit code of 1
-        installed_utils.remove('false')
-        installed_utils.remove('sha*sum')
-        self.gnu_tools = installed_utils
+        discovery = GNU_Discovery(self.cache)
+        self.tool_Paths = discovery.Find_Tools()
+        self.gnu_tools = list(self.tool_Paths)
 
     def Get_GNU_Tools(self):
         """Returns a list of all GNU Coreutils installed on the system.
@@ -88,53 +144,218 @@ class GNU_Handler():
   
         return self.gnu_tools
 
+    @Startup_Profiler.Profiled("gnu_harvest")
     def Create_GNU_Descriptions(self):
         """
             Finds and Creates Description of GNU Coreutils.
             using each tool ``--help``.
+
+            Tools already in the :attr:`cache` are not invoked, only tools
+            that are new or whose binaries changed are harvested again.
+            They are harvested concurrently by a pool of :attr:`workers`,
+            the results are added in the order of :attr:`gnu_tools`.
         """
+        specs = {}
+        missing = []
+        for tool in self.gnu_tools:
+            data = self.cache.Get(tool, self.tool_Paths.get(tool))
+            if data is None:
+                missing.append(tool)
+            else:
+                specs[tool] = ToolSpec.From_Dict(data)
+        for spec in self.Harvest_Tools(missing):
+            self.cache.Set(spec.name, spec.To_Dict(),
+                           self.tool_Paths.get(spec.name))
+            specs[spec.name] = spec
         for tool in self.gnu_tools:
-            res = self.Get_Tool_Help(tool)
-            # Corner Case 1
-            if tool == "expr":
-                # --help --version writter under or (not Description)
-                str1 = "Print the value of EXPRESSION to standard output"
-                self.ToolName_ToolDescription["expr"] = str1
-                # Added Item with its Description
-                # Do not reach REGEX code (NoneType)
-                continue
-            # Corner Case 2
-            if tool == "pinky":
-                # Description written after arguments
-                s = "A lightweight 'finger' program;  print user information"
-                self.ToolName_ToolDescription["pinky"] = s
-                # Added Item with its Description
-                # Do not reach REGEX code (NoneType)
-                self.Find_Options(tool)
-                continue
-            # Corner Case 3
-            if tool == "flock":
-                # No or after options
-                string = "Manage file locks from shell scripts"
-                self.ToolName_ToolDescription["flock"] = string
-                # Do not reach REGEX code (NoneType)
-                continue
-            # Corner Case 4
-            if tool == "test":
-                # Arguments can be any string --help will not work
-                test = ("Used as part of the conditional" +
-                        " execution of shell commands")
-                self.ToolName_ToolDescription["test"] = test
-                # Do not reach REGEX code (NoneType)
-                continue
-            regex = "Usage:(.*\n\s+or.+)+\n+(.*)|Usage:.*\n*(([A-Z]).*)"
-            srch = re.search(regex, res)
-            if srch[2] is not None:
-                self.ToolName_ToolDescription[tool] = srch[2]
-
-            if srch[3] is not None:
-                self.ToolName_ToolDescription[tool] = srch[3]
-            self.Find_Options(tool)
+            self.Add_Tool_Spec(specs[tool])
+        self.cache.Save()
+
+    @Startup_Profiler.Profiled("gnu_cache_load")
+    def Load_Cached_Tools(self):
+        """
+            Adds the tools found in the :attr:`cache` without invoking any
+            tool. Used in :attr:`lazy` mode.
+        """
+        for tool in self.gnu_tools:
+            data = self.cache.Get(tool, self.tool_Paths.get(tool))
+            if data is not None:
+                self.Add_Tool_Spec(ToolSpec.From_Dict(data))
+
+    def Is_Resolved(self, tool_name):
+        """Returns True if the tool's ``--help`` is already parsed.
+
+        Args:
+            tool_name (:obj:`str`): Tool's Name.
+
+        Returns:
+            :obj:`bool`: Returns ``True`` if the tool's options, arguments
+            and Mandatory Options are available.
+        """
+
+        return tool_name in self.tool_Specs
+
+    def Resolve_Async(self, tool_name, callback=None):
+        """Harvests a tool in the background, ahead of the other tools.
+
+        If the tool is still queued by :meth:`Harvest_Remaining` it is
+        moved to the priority pool, a tool that is already being harvested
+        is not harvested twice.
+
+        Args:
+            tool_name (:obj:`str`): Tool's Name.
+            callback (:obj:`callable`): Called with the tool name once the
+                tool is resolved. It is called from a worker thread.
+
+        Returns:
+            :obj:`concurrent.futures.Future`: Harvest result, ``None`` if
+            the tool is already resolved.
+        """
+
+        with self.lock:
+            future = self.pending.get(tool_name)
+            if future is not None and future.cancel():
+                future = None
+            if future is None and not self.Is_Resolved(tool_name):
+                if self.priority_pool is None:
+                    self.priority_pool = ThreadPoolExecutor(
+                                                    max_workers=self.workers)
+                future = self.Submit(self.priority_pool, tool_name)
+        if future is None:
+            if callback is not None:
+                callback(tool_name)
+            return None
+        if callback is not None:
+            future.add_done_callback(
+                lambda done: done.cancelled() or callback(tool_name))
+        return future
+
+    def Harvest_Remaining(self, callback=None):
+        """Harvests every tool that is not resolved in the background.
+
+        Args:
+            callback (:obj:`callable`): Called with the tool name each time
+                a tool is resolved. It is called from a worker thread.
+        """
+
+        with self.lock:
+            if self.pool is None:
+                self.pool = ThreadPoolExecutor(max_workers=self.workers)
+            futures = []
+            for tool in self.gnu_tools:
+                if tool in self.pending or self.Is_Resolved(tool):
+                    continue
+                futures.append((tool, self.Submit(self.pool, tool)))
+        if callback is None:
+            return
+        for tool, future in futures:
+            future.add_done_callback(
+                lambda done, tool=tool: done.cancelled() or callback(tool))
+
+    def Submit(self, pool, tool_name):
+        """Submits a tool harvest to a pool, must hold :attr:`lock`.
+
+        Args:
+            pool (:obj:`concurrent.futures.Executor`): Pool to use.
+            tool_name (:obj:`str`): Tool's Name.
+
+        Returns:
+            :obj:`concurrent.futures.Future`: Harvest result.
+        """
+
+        future = pool.submit(GNU_ToolSpec.Harvest_Tool, tool_name)
+        self.pending[tool_name] = future
+        future.add_done_callback(
+            lambda done: self.Tool_Harvested(tool_name, done))
+        return future
+
+    def Tool_Harvested(self, tool_name, future):
+        """Adds a tool harvested in the background.
+
+        A tool whose ``--help`` fails is added without options and
+        arguments, the user interface does not wait for it forever.
+        The :attr:`cache` is saved once no harvest is pending.
+
+        Args:
+            tool_name (:obj:`str`): Tool's Name.
+            future (:obj:`concurrent.futures.Future`): Harvest result.
+        """
+
+        if future.cancelled():
+            return
+        with self.lock:
+            if self.pending.get(tool_name) is future:
+                del self.pending[tool_name]
+            if future.exception() is None:
+                spec = future.result()
+                self.cache.Set(tool_name, spec.To_Dict(),
+                               self.tool_Paths.get(tool_name))
+            else:
+                spec = ToolSpec(tool_name)
+            self.Add_Tool_Spec(spec)
+            if self.pending == {}:
+                self.cache.Save()
+
+    def Harvest_Tools(self, tools):
+        """Harvests the tools given as a parameter using a bounded pool.
+
+        Args:
+            tools (:obj:`list` of ``str``): Tools' names.
+
+        Returns:
+            :obj:`list` of :class:`GNU_ToolSpec.ToolSpec`: Tools' specs in
+            the same order as ``tools``.
+        """
+
+        if len(tools) < 2 or self.workers == 1:
+            return [self.Harvest_Tool(tool) for tool in tools]
+        if self.executor == "process":
+            pool = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            pool = ThreadPoolExecutor(max_workers=self.workers)
+        with pool:
+            return list(pool.map(GNU_ToolSpec.Harvest_Tool, tools))
+
+    def Harvest_Tool(self, tool):
+        """Parses the ``--help`` of a tool into its spec.
+
+        Args:
+            tool (:obj:`str`): Tool's name.
+
+        Returns:
+            :class:`GNU_ToolSpec.ToolSpec`: Tool's spec.
+        """
+
+        return GNU_ToolSpec.Harvest_Tool(tool)
+
+    def Add_Tool_Spec(self, spec):
+        """Adds the spec of a tool to the handler dictionaries.
+
+        The reverse indexes are updated at the same time, looking a tool or
+        an option up by its description never scans the dictionaries.
+
+        Args:
+            spec (:class:`GNU_ToolSpec.ToolSpec`): Tool's spec.
+        """
+
+        old_description = self.ToolName_ToolDescription.get(spec.name)
+        if self.Description_ToolName.get(old_description) == spec.name:
+            del self.Description_ToolName[old_description]
+        self.tool_Specs[spec.name] = spec
+        self.ToolName_ToolDescription[spec.name] = spec.description
+        # Tools sharing a description resolve to the first one added
+        self.Description_ToolName.setdefault(spec.description, spec.name)
+        if spec.options is not None:
+            self.tool_Options[spec.name] = spec.options
+            self.Name_OptionDescription_Option[spec.name] = (
+                                MappingProxyType(spec.option_descriptions))
+            option_description = {}
+            for opt_desc, option in spec.option_descriptions.items():
+                option_description.setdefault(option, opt_desc)
+            self.Name_Option_OptionDescription[spec.name] = (
+                                MappingProxyType(option_description))
+            self.Options_Descriptions_Views[spec.name] = tuple(
+                                                spec.option_descriptions)
 
     def Get_Tool_Description(self, tool_name):
         """Returns the description of the tool given as a parameter
@@ -146,7 +367,7 @@ class GNU_Handler():
             :obj:`str`: Tool's description.
         """        
         
-        return self.ToolName_ToolDescription[tool_name]
+        return self.ToolName_ToolDescription.get(tool_name, "")
 
     def Get_Tool_Name_From_Description(self, desc):
         """Returns the name of the tool using its description given as a parameter.
@@ -155,36 +376,11 @@ class GNU_Handler():
             desc (:obj:`str`): Tool's description
 
         Returns:
-            :obj:`str` : Tool's name
+            :obj:`str` : Tool's name, ``None`` if no tool has this
+            description.
         """        
 
-        for tool in self.ToolName_ToolDescription:
-            if self.ToolName_ToolDescription[tool] == desc:
-                return tool
-
-    def Find_Options(self, tool_name):
-        """Finds the Options of a tool given as a parameter.
-
-        Args:
-            tool_name (:obj:`str`): Tool's Name.
-
-        """
-
-        res = self.Get_Tool_Help(tool_name)
-        srch = re.findall(r"\n\s+-([A-Za-z])[,|\s]", res)
-        self.tool_Options[tool_name] = srch
-        tmp_optDesc_opt = {}
-        for option in srch:
-            REGEX = "-" + option + ",\s\S+\s+(.*)"
-            rslt = re.search(REGEX, res)
-            if rslt is not None:
-                # Record result in a dictionary as
-                #  {"Name":{"Option Description:Option"}}
-                # {"Option Description:Option"}
-                tmp_optDesc_opt[rslt[1]] = option
-        # Assign a copy of temp dict
-        self.Name_OptionDescription_Option[tool_name] = tmp_optDesc_opt.copy()
-        tmp_optDesc_opt.clear()
+        return self.Description_ToolName.get(desc)
 
     def Get_Tool_Options_Descriptions(self, tool_name):
         """Returns the Description of the options that belong to a tool given as a parameter.
@@ -193,13 +389,10 @@ class GNU_Handler():
             tool_name (:obj:`str`): Tool's Name.
 
         Returns:
-            :obj:`list` of ``str``: Descriptions of the tools options.
+            :obj:`tuple` of ``str``: Descriptions of the tools options.
         """        
        
-        option_description_list = []
-        for opt_desc in self.Name_OptionDescription_Option[tool_name]:
-            option_description_list.append(opt_desc)
-        return option_description_list
+        return self.Options_Descriptions_Views[tool_name]
 
     def Get_Tool_Option_From_Description(self, option_description, tool_name):
         """Returns the Option of a using the option description.
@@ -209,12 +402,27 @@ class GNU_Handler():
             tool_name (:obj:`str`): Tool's Name.
 
         Returns:
-            :obj:`str`: Option
+            :obj:`str`: Option, ``None`` if the tool has no option with this
+            description.
         """        
 
-        for optDesc in self.Name_OptionDescription_Option[tool_name]:
-            if option_description == optDesc:
-                return self.Name_OptionDescription_Option[tool_name][optDesc]
+        return self.Name_OptionDescription_Option[tool_name].get(
+                                                        option_description)
+
+    def Get_Option_Description_From_Option(self, tool_name, option):
+        """Returns the description an option is listed under in
+        :meth:`Get_Tool_Options_Descriptions`.
+
+        Args:
+            tool_name (:obj:`str`): Tool's Name.
+            option (:obj:`str`): Option.
+
+        Returns:
+            :obj:`str`: Option's description, ``None`` if the option is not
+            listed.
+        """
+
+        return self.Name_Option_OptionDescription[tool_name].get(option)
 
     def Get_Option_Description(self, tool_name, option):
         """Returns option description using tool's name and option.
@@ -225,18 +433,10 @@ class GNU_Handler():
 
         Returns:
             :obj:`str`: Option's description
-        Note:
-            uses REGEX =rf"  -{option},\s\S+\s+(.*)|  -{option}\s+(.*)" 
         """        
-   
-        tool_help = self.Get_Tool_Help(tool_name)
-        REGEX = rf"  -{option},\s\S+\s+(.*)|  -{option}\s+(.*)"
-        rslt = re.findall(REGEX, tool_help)
-        if rslt[0][0] != "":
-            return rslt[0][0]
-        if rslt[0][1] != "":
-            return rslt[0][1]
-       
+
+        return self.tool_Specs[tool_name].option_tips.get(option)
+
     def Get_Tool_Options(self, tool_name):
         """Returns the options of the tool name given as an argument.
 
@@ -257,39 +457,9 @@ class GNU_Handler():
 
         Returns:
             :obj:`list` of ``str``: Tool's Arguments.
-
-        Note:
-            Uses the following regex 
-            regex = r"\s\[([A-Z]+)\]|([A-Z]+)\.{3}|\.{3}\s([A-Z]+)\d*\s"
         """        
 
-        args_found = []
-        # args - supported args
-        args = []
-        res = self.Get_Tool_Help(tool_name)
-        # Returns a list with all usages
-        regex = r"\s\[([A-Z]+)\]|([A-Z]+)\.{3}|\.{3}\s([A-Z]+)\d*\s"
-        srch = re.findall(regex, res)
-        
-        # findall returns submatches
-        # if capture groups are used it will return None if capture group
-        # does not give a result
-        for group in srch:
-            args_found.extend(list(filter(None, group)))
-        for arg in args_found:
-            # Remove option from args
-            if arg == "OPTION":
-                continue
-            if arg in self.types["Path"]:
-                args.append(arg)
-
-            if arg in self.types["Text"]:
-                args.append(arg)
-
-            if arg in self.types["Digit"]:
-                args.append(arg)
-
-        return args
+        return self.tool_Specs[tool_name].arguments
 
     def Get_Man_Option(self, tool_name, option):
         """ Returns the Man. Options for an option, returns None if none.
@@ -300,20 +470,22 @@ class GNU_Handler():
 
         Returns:
             :obj:`str`: Mandatory Option
-        Note:
-            uses regex regex = ("-" + option + ",.*=(\w+)")
-
         """        
 
-        # stat -c issue
-        tool_help = self.Get_Tool_Help(tool_name)
-        if tool_name == "head" and option == "n":
-            return "NUM"
-        regex = ("-" + option + ",.*=(\w+)")
-        res = re.search(regex, tool_help)
-        print(res)
-        if res is not None:
-            return res[1]
+        return self.tool_Specs[tool_name].man_options.get(option)
+
+    def Get_Tool_Long_Options(self, tool_name):
+        """Returns the long options of the tool name given as an argument.
+
+        Args:
+            tool_name (:obj:`str`): Tool's Name.
+
+        Returns:
+            :obj:`list` of ``str``: Tool's long options without the
+            leading ``--``.
+        """
+
+        return self.tool_Specs[tool_name].long_options
 
     def Has_Options(self, tool_name):
         """Returns True if the tool have options
@@ -326,11 +498,10 @@ class GNU_Handler():
             returns ``False`` otherwise.
         """        
        
-        if (self.Get_Tool_Options(tool_name) == []
-                or self.Get_Tool_Options(tool_name) is None):
-            return False
-        else:
+        if self.tool_Specs[tool_name].options:
             return True
+        else:
+            return False
 
     def Has_Arguments(self, tool_name):
         """Returns True if the tool have arguments.
@@ -343,10 +514,7 @@ class GNU_Handler():
            returns ``False`` otherwise.
         """        
     
-        # Returns a list with all usages
-        # line in list or before (,)
-        args = self.Get_Tool_Argument(tool_name)
-        if args == []:
+        if self.tool_Specs[tool_name].arguments == []:
             return False
         else:
             return True
@@ -1,21 +1,43 @@
 
 from PyQt5 import QtCore, QtGui, QtWidgets
-from PyQt5.QtCore import pyqtSignal, QObject, QProcess, Qt
-from PyQt5 import uic
+from PyQt5.QtCore import pyqtSignal, QObject, Qt
+import UI_Loader
+import Startup_Profiler
 from PyQt5 import QtGui
 from PyQt5.QtWidgets import QFileDialog, QAbstractItemView, QListWidgetItem
 from GNU_Handler import GNU_Handler
+from GNU_Search import GNU_Search
+from GNU_Pipeline import Parse_Stages
+from Output_Buffer import Output_Buffer
+from Output_Spool import Output_Spool
+import Job_Manager
+import Output_Pager
 import Data
 import sys
 import os.path
-import rsrs_rc
+with Startup_Profiler.Phase("rsrs_rc"):
+    import rsrs_rc
 
 CURRENT_DIR = os.path.dirname(os.path.realpath(__file__))
 # PARENT_DIR = os.path.dirname(CURRENT_DIR)
 GUI_DIR = os.path.join(CURRENT_DIR, "GUI")
 
 ui_filename = os.path.join(GUI_DIR, "GNU_Core_Interface.ui")
-baseUIClass, baseUIWidget = uic.loadUiType(ui_filename)
+baseUIClass, baseUIWidget = UI_Loader.Load_Ui_Type(ui_filename)
+
+
+def Contains(items, item):
+    """Checks if a list contains an object, not just an equal one.
+
+    Args:
+        items (:obj:`list`): List searched.
+        item (:obj:`object`): Object searched.
+
+    Returns:
+        :obj:`bool`: ``True`` if ``item`` itself is in ``items``.
+    """
+
+    return any(element is item for element in items)
 
 
 class GNU_Logic(baseUIWidget, baseUIClass):
@@ -37,11 +59,14 @@ class GNU_Logic(baseUIWidget, baseUIClass):
 
         command_change (:obj:`pyqtSignal()`): Emitted when command arguments, 
             options selection have changed. 
-        process (:obj:`QProcess`): Process to execute non ``piped`` commands.
-        process1 (:obj:`QProcess`): Process to execute first command in the 
-            pipe chain, its output is redirected to :attr:`.process2`
-        process2 (:obj:`QProcess`): Process to execute the second command in 
-            the pipe chain.   
+        tool_resolved (:obj:`pyqtSignal(str)`): Emitted from the
+            :attr:`.GNU` worker threads when a tool's options and arguments
+            are loaded. See :meth:`Tool_Resolved`.
+        job_manager (:obj:`Job_Manager`): Runs the commands as jobs of the
+            ``gnu`` page, several commands can run at the same time. A
+            ``piped`` command is one job, the two selected commands
+            followed by the commands typed in ``pipe_stages``.
+            See :meth:`Execute_PIPE_Command`.
         selected_options (:obj:`list` of ``str``): Contains the list of options
             currently selected by the user. It is updated each time the user
             makes a new selection. See :meth:`See_Option_Change`. This list
@@ -62,7 +87,25 @@ class GNU_Logic(baseUIWidget, baseUIClass):
             mandatory arguments see :attr:`.man_args`
 
         GNU(:obj:`GNU_Handler`): Uses GNU Handler API to read the GNU Core 
-            Utilities Options and Arguments   . 
+            Utilities Options and Arguments   . It is created in ``lazy``
+            mode, the tools are listed at once and their options are loaded
+            in the background.
+        tool_items (:obj:`dict`): Contains the tool name and its item in
+            ``shrt_list``.
+        waiting_tools (:obj:`set` of ``str``): Selected tools whose options
+            are still loading.
+        output_buffer (:obj:`Output_Buffer`): Coalesces the output printed
+            on ``terminal_text``, see :meth:`Print_Output`.
+        output_spool (:obj:`Output_Spool`): Keeps the full output of the
+            commands on disk, ``terminal_text`` only keeps the last
+            :attr:`Data.Scrollback_Lines` lines.
+        search (:obj:`GNU_Search`): Index used to search the tools by name,
+            description and options descriptions. See :meth:`Search_Tools`.
+        command_timer (:obj:`QTimer`): Coalesces the :attr:`.command_change`
+            signals, the command tracker is rebuilt at most once per event
+            loop iteration. See :meth:`Schedule_Formed_Command`.
+        formed_text (:obj:`str`): Text displayed by ``formed_command``, the
+            widget is only updated when it changes.
     """    
 
     files = []
@@ -74,9 +117,7 @@ class GNU_Logic(baseUIWidget, baseUIClass):
     output_ready = pyqtSignal(str)
     task = pyqtSignal(str)
     command_change = pyqtSignal()
-    process = QProcess()
-    process1 = QProcess()
-    process2 = QProcess()
+    tool_resolved = pyqtSignal(str)
     selected_options = []
     selected_pipe_options = []
     current_args = [""]
@@ -84,9 +125,10 @@ class GNU_Logic(baseUIWidget, baseUIClass):
     current_pipe_args = [""]
     man_args = [""]
     man_args_pipe = [""]
-    GNU = GNU_Handler()
+    GNU = GNU_Handler(lazy=True)
     types = GNU.Get_Supported_Types()
 
+    @Startup_Profiler.Profiled("GNU_Logic")
     def __init__(self, parent=None):
         super(GNU_Logic, self).__init__(parent)
         self.setupUi(self)
@@ -94,7 +136,6 @@ class GNU_Logic(baseUIWidget, baseUIClass):
                             QtCore.Qt.WindowCloseButtonHint
                             | QtCore.Qt.WindowMinimizeButtonHint
                             )
-        self.process1.setStandardOutputProcess(self.process2)
         self.stacked_args.setCurrentIndex(0)
         self.Hide_Arguments_Widgets()
         self.opt_frame.hide()
@@ -121,14 +162,32 @@ class GNU_Logic(baseUIWidget, baseUIClass):
         self.shrt_opt_list.itemClicked.connect(self.Check_Man_Options)
         self.piped_list.itemClicked.connect(self.Check_Man_Options)
         self.pipe.stateChanged.connect(self.Enable_PIPE)
+        self.pipe_stages.hide()
+        self.command_timer = QtCore.QTimer(self)
+        self.command_timer.setSingleShot(True)
+        self.command_timer.setInterval(0)
+        self.command_timer.timeout.connect(self.Formed_Command)
+        self.formed_text = ""
+        self.pipe_stages.textChanged.connect(self.Schedule_Formed_Command)
         self.gnu_tools = self.GNU.Get_GNU_Tools()
+        self.tool_items = {}
+        self.waiting_tools = set()
         self.Show_GNU_Tools(self.gnu_tools)
+        self.search = GNU_Search(self.GNU)
+        self.tool_search.textChanged.connect(self.Search_Tools)
+        self.tool_resolved.connect(self.Tool_Resolved)
+        self.GNU.Harvest_Remaining(self.tool_resolved.emit)
+        self.terminal_text.setMaximumBlockCount(Data.Scrollback_Lines)
+        self.output_spool = Output_Spool("gnu")
+        self.output_buffer = Output_Buffer(self.terminal_text,
+                                           spool=self.output_spool,
+                                           parent=self)
+        Output_Pager.Add_Pager_Action(self.terminal_text, self.output_spool)
+        self.job_manager = Job_Manager.Get_Manager()
+        self.job_manager.output_ready.connect(self.Job_Output)
+        self.job_manager.error_ready.connect(self.Job_Output_Error)
+        self.job_manager.job_finished.connect(self.Job_Finished)
         self.output_ready.connect(self.Print_Output)
-        self.process.readyReadStandardOutput.connect(self.Process_Output)
-        self.process.readyReadStandardError.connect(self.Process_Output_Error)
-        self.process1.readyReadStandardError.connect(self.Process_Output_Error)
-        self.process2.readyReadStandardOutput.connect(self.Process_Output)
-        self.process2.readyReadStandardError.connect(self.Process_Output_Error)
         self.shrt_list.itemSelectionChanged.connect(self.Enforce_Selection_Size
                                                     )
         self.pipe_file.clicked.connect(self.Open_PIPE_File)
@@ -138,8 +197,9 @@ class GNU_Logic(baseUIWidget, baseUIClass):
         self.man_file.clicked.connect(self.openFileNamesDialog)
         self.man_pipe_file.clicked.connect(self.openFileNamesDialog)
 # ==============================================================================
-        self.command_change.connect(self.Formed_Command)
-        self.shrt_list.itemSelectionChanged.connect(self.Formed_Command)
+        self.command_change.connect(self.Schedule_Formed_Command)
+        self.shrt_list.itemSelectionChanged.connect(
+                                                self.Schedule_Formed_Command)
         self.shrt_opt_list.itemSelectionChanged.connect(self.Show_Option_Change
                                                         )
         self.text_option.textChanged.connect(self.Show_Arg_Change)
@@ -163,14 +223,26 @@ class GNU_Logic(baseUIWidget, baseUIClass):
     def Clear_Terminal(self):
         """Clears the output terminal
         """        
-        self.terminal_text.clear()
+        self.output_buffer.Clear()
         self.command_history.append("clear")
 
+    def Schedule_Formed_Command(self):
+        """
+            Rebuilds the command tracker once the current events are handled.
+
+            Invoked from command_changed signal. A keystroke or a selection
+            can emit it several times, :meth:`.Formed_Command` then only
+            runs once.
+        """
+
+        self.command_timer.start()
+
     def Formed_Command(self):
         """
             Displays the formed command on formed_command widget.
 
-            Invoked from command_changed signal.
+            Invoked from :attr:`.command_timer`, see
+            :meth:`.Schedule_Formed_Command`.
             :meth:`.Show_Option_Change()`
             :meth:`.Show_Arg_Change()`
             :meth:`.Show_File_Change`
@@ -180,6 +252,7 @@ class GNU_Logic(baseUIWidget, baseUIClass):
         """
         
         if self.shrt_list.selectedItems() == []:
+            self.formed_text = ""
             self.formed_command.clear()
             return
         text = self.shrt_list.selectedItems()[0].text() + " "
@@ -206,9 +279,13 @@ class GNU_Logic(baseUIWidget, baseUIClass):
                             text = text + x + " "
                 else:
                     text = text + " ".join(item) + " "
-                
-       
-        self.formed_command.setText(text)
+        if self.pipe.isChecked() and self.pipe_stages.text().strip() != "":
+            text = text + " | " + self.pipe_stages.text().strip()
+
+        # Setting the same text again would lay out the document for nothing
+        if text != self.formed_text:
+            self.formed_text = text
+            self.formed_command.setText(text)
 
     def Set_Current_Task(self, task):
         """Sets the task label.
@@ -249,16 +326,19 @@ class GNU_Logic(baseUIWidget, baseUIClass):
         # If piping is enabled, Allow multiple selection on the command list
         if self.pipe.isChecked():
             self.shrt_list.setSelectionMode(QAbstractItemView.MultiSelection)
+            self.pipe_stages.show()
 
         else:
             self.shrt_list.setSelectionMode(QAbstractItemView.SingleSelection)
+            self.pipe_stages.hide()
 
     def Print_Output(self, str):
         """Appends command output to the terminal widget.
 
         Note:
-            Use ``QPlainTextEdit`` as a terminal. Its :obj:`append` method 
-            is faster than ``QTextBrowser``. 
+            Use ``QPlainTextEdit`` as a terminal. The output is queued in
+            :attr:`.output_buffer` and inserted at most once per frame, a
+            command that prints fast does not freeze the interface.
 
         The signal :attr:`.output_ready` is connected to this method.
 
@@ -267,54 +347,87 @@ class GNU_Logic(baseUIWidget, baseUIClass):
 
         """        
 
-        self.terminal_text.appendPlainText(str)
+        self.output_buffer.Write(str)
 
-    def Process_Output_Error(self):
+    def Job_Output_Error(self, job_id, output, data):
         """
-            Reads the process error output and sends it to the terminal.
+            Prints the error output of a job on the terminal.
 
-            Note:
-                This method is shared between :attr:`process1` and
-                :attr:`process2`
-                If Piping is enabled :attr:`process2` will invoke this method
-                then only :attr:`process2` output should be read.
+            Args:
+                job_id (:obj:`int`): Id of the job, the jobs of the other
+                    pages are ignored.
+                output (:obj:`str`): Decoded error output.
+                data (:obj:`QByteArray`): Raw error output.
         """
 
-        if self.sender() is self.process:
-            data = self.process.readAllStandardError()
-        if self.sender() is self.process1:
-            data = self.process1.readAllStandardError()
-        if self.sender() is self.process2:
-            data = self.process2.readAllStandardError()
-        # Sends Empty Bytes
-        if data.isEmpty():
+        if self.job_manager.jobs[job_id].page != "gnu":
             return
-        # Decodes data to a readable String
-        output = bytes(data).decode("utf8").strip()
         if "/usr/bin/" in output:
             output = output.replace("/usr/bin/", "")
-        self.output_ready.emit(output)
+        self.output_buffer.Write_Stream(output, data)
 
-    def Process_Output(self):
+    def Job_Output(self, job_id, output, data):
         """
-            Reads the process standard output and sends it to the terminal.
+            Prints the standard output of a job on the terminal.
 
-            Note:
-                This method is shared between :attr:`process1` and
-                :attr:`process2`
-                If Piping is enabled :attr:`process2` will invoke this method
-                then only :attr:`process2` output should be read.
+            The output is printed exactly as it was read, blank lines and
+            partial lines included. The spool receives the raw bytes.
+
+            Args:
+                job_id (:obj:`int`): Id of the job, the jobs of the other
+                    pages are ignored.
+                output (:obj:`str`): Decoded output.
+                data (:obj:`QByteArray`): Raw output.
         """
-        if self.sender() is self.process:
-            data = self.process.readAllStandardOutput()
-        if self.sender() is self.process2:
-            data = self.process2.readAllStandardOutput()
-        # Sends Empty Bytes
-        if data.isEmpty():
+
+        if self.job_manager.jobs[job_id].page != "gnu":
             return
-        # Decodes data to a readable String
-        output = bytes(data).decode("utf8", errors="ignore").strip()
-        self.output_ready.emit(output)
+        self.output_buffer.Write_Stream(output, data)
+
+    def Job_Finished(self, job_id):
+        """
+            Adds the exit code and the resources used by a command to the
+            history, prints the exit code of each command when a piped
+            command fails and marks the output replayed from the
+            :mod:`Result_Cache`.
+
+            Args:
+                job_id (:obj:`int`): Id of the job.
+        """
+
+        job = self.job_manager.jobs[job_id]
+        if job.page != "gnu":
+            return
+        if job.exit_code is not None:
+            self.command_history.append(job.Get_Summary())
+        if job.cached:
+            self.output_buffer.Write("[cached]")
+        if not job.exit_code or len(job.stages) < 2:
+            return
+        self.output_buffer.Write("Exit %d (%s)" % (
+            job.exit_code, " | ".join(map(str, job.exit_codes))))
+
+    def Run_Job(self, command_line, stages):
+        """
+            Runs a command as a job of the ``gnu`` page.
+
+            The terminal spool starts a new file unless another command of
+            the page is still running. If ``cache_results`` is checked the
+            output of a read-only command is replayed from the
+            :mod:`Result_Cache` when its files did not change.
+
+            Args:
+                command_line (:obj:`str`): Command added to the history.
+                stages (:obj:`list` of ``tuple``): Program and arguments of
+                    each command of the pipe.
+        """
+
+        if self.job_manager.Get_Jobs("gnu", (Job_Manager.QUEUED,
+                                             Job_Manager.RUNNING)) == []:
+            self.output_spool.Start(command_line)
+        self.command_history.append(command_line)
+        self.job_manager.Submit("gnu", command_line, stages,
+                                self.cache_results.isChecked())
 
     def Check_Man_Options(self):
         """
@@ -501,6 +614,84 @@ class GNU_Logic(baseUIWidget, baseUIClass):
             item_adedd.setTextAlignment(Qt.AlignCenter)
             item_adedd.setToolTip(item_desc)
             self.shrt_list.addItem(item_adedd)
+            self.tool_items[item] = item_adedd
+
+    def Tool_Resolved(self, tool_name):
+        """Updates the user interface when a tool is loaded in the background.
+
+        Sets the tool's ToolTip and displays its options if the user is
+        waiting for them. The signal :attr:`.tool_resolved` is connected to
+        this method.
+
+        Args:
+            tool_name (:obj:`str`): Tool's (command) name.
+        """
+
+        item = self.tool_items.get(tool_name)
+        if item is None:
+            return
+        item.setToolTip(self.GNU.Get_Tool_Description(tool_name))
+        self.search.Add_Tool(tool_name)
+        if self.tool_search.text().strip() != "":
+            self.Search_Tools(self.tool_search.text())
+        if tool_name not in self.waiting_tools:
+            return
+        self.waiting_tools.discard(tool_name)
+        if (self.waiting_tools == set()
+                and item in self.shrt_list.selectedItems()):
+            self.Show_Options()
+
+    def Search_Tools(self, text):
+        """Filters the command list using the search box.
+
+        Only the commands that match the search are shown, selected commands
+        always stay visible. The best matches are displayed on the task label,
+        with the option that matched, e.g. ``nl, cat -n``.
+
+        Args:
+            text (:obj:`str`): Text typed in the search box.
+        """
+
+        query = text.strip()
+        if query == "":
+            for item in self.tool_items.values():
+                item.setHidden(False)
+            self.task.emit("Choose Your Command")
+            return
+        results = self.search.Search(query)
+        found = {tool for tool, _, _ in results}
+        for tool, item in self.tool_items.items():
+            item.setHidden(tool not in found and not item.isSelected())
+        if results == []:
+            self.task.emit("No command matches " + query)
+            return
+        hits = []
+        for tool, option, _ in results[:5]:
+            if option is None:
+                hits.append(tool)
+            else:
+                hits.append(tool + " -" + option)
+        self.task.emit(", ".join(hits))
+
+    def Wait_For_Tools(self, tools):
+        """Shows a loading state until the tools given are resolved.
+
+        Args:
+            tools (:obj:`list` of ``str``): Selected tools' names.
+
+        Returns:
+            :obj:`bool`: Returns ``True`` if some tools are still loading,
+            :meth:`Tool_Resolved` displays the options once they are loaded.
+        """
+
+        loading = [tool for tool in tools if not self.GNU.Is_Resolved(tool)]
+        self.waiting_tools = set(loading)
+        if loading == []:
+            return False
+        self.task.emit("Loading " + ", ".join(loading) + " options...")
+        for tool in loading:
+            self.GNU.Resolve_Async(tool, self.tool_resolved.emit)
+        return True
 
     def Show_Options_PIPED(self):
         """
@@ -528,6 +719,8 @@ class GNU_Logic(baseUIWidget, baseUIClass):
         if tool1_name in ["flock", "test", "expr", "pinky", "expr"]:
             self.task.emit(tool1_name + " Not Implemented")
             return
+        if self.Wait_For_Tools([tool_name, tool1_name]):
+            return
         string = ""
         if self.GNU.Has_Options(tool_name):
             string = " " + string + tool_name + ":" + " have options "
@@ -620,6 +813,8 @@ class GNU_Logic(baseUIWidget, baseUIClass):
         if tool_name in ["flock", "test", "expr", "pinky", "expr"]:
             self.task.emit("Not Implemented")
             return
+        if self.Wait_For_Tools([tool_name]):
+            return
         if self.GNU.No_Options_Arguments(tool_name):
             self.task.emit("No Arguments and Options")
             return
@@ -901,7 +1096,9 @@ class GNU_Logic(baseUIWidget, baseUIClass):
 
         """
 
-        if self.pipe.isChecked() and len(self.shrt_list.selectedItems()) == 2:
+        if self.pipe.isChecked() and (
+                len(self.shrt_list.selectedItems()) == 2
+                or self.pipe_stages.text().strip() != ""):
 
             self.Execute_PIPE_Command()
             return
@@ -925,13 +1122,17 @@ class GNU_Logic(baseUIWidget, baseUIClass):
             if item is self.files:
                 command1.extend(item)
 
-        self.process.start(tool_name, command1)
-        self.command_history.append(tool_name + " " + " ".join(command1))
+        self.Run_Job(tool_name + " " + " ".join(command1),
+                     [(tool_name, command1)])
 
     def Execute_PIPE_Command(self):
         """
             Executes PIPE commands.
             PIPE commands are command that are piped togother.
+
+            The selected commands are followed by the commands typed in
+            ``pipe_stages``, any number of commands can be piped. Each
+            command runs in its own process, see :mod:`GNU_Pipeline`.
         """
 
         tool1_name = self.shrt_list.selectedItems()[0].text()
@@ -940,10 +1141,6 @@ class GNU_Logic(baseUIWidget, baseUIClass):
         else:
             tool2_name = self.shrt_list.selectedItems()[1].text()
 
-        if self.process1.state() == 2 or self.process2.state() == 2:
-            self.terminal_text.appendPlainText(
-                "Process Already Running Please Stop it")
-            return
         command1 = []
         command2 = []
         # command format  [ [OPTIONs, MAN OPTIONS], [MAN ARGS], [FILES] ]
@@ -967,8 +1164,6 @@ class GNU_Logic(baseUIWidget, baseUIClass):
             if item is self.files:
                 command1.extend(item)
 
-        self.process1.start(tool1_name, command1)
-
         for item in self.cmd1:
             if item == [" "]:
                 self.cmd1.remove(item)
@@ -990,24 +1185,27 @@ class GNU_Logic(baseUIWidget, baseUIClass):
             if item is self.pipe_files:
                 command2.extend(item)
 
-        self.process2.start(tool2_name, command2)
-
-        self.command_history.append(
-                                    tool1_name + " " + " ".join(command1)
-                                    + " | "
-                                    + tool2_name + " " + " ".join(command2)
-                                    )
+        stages = [(tool1_name, command1)]
+        command_line = tool1_name + " " + " ".join(command1)
+        if tool2_name != "":
+            stages.append((tool2_name, command2))
+            command_line = (command_line + " | "
+                            + tool2_name + " " + " ".join(command2))
+        try:
+            stages.extend(Parse_Stages(self.pipe_stages.text()))
+        except ValueError as error:
+            self.output_buffer.Write("Invalid Pipe: " + str(error))
+            return
+        if self.pipe_stages.text().strip() != "":
+            command_line = (command_line + " | "
+                            + self.pipe_stages.text().strip())
+        self.Run_Job(command_line, stages)
 
     def Kill_Process(self):
         """
-            Kills any running process.
+            Kills the running and queued commands of the page.
         """
-        if self.process.state() == 2:
-            self.process.kill()
-        if self.process1.state() == 2:
-            self.process1.kill()
-        if self.process2.state() == 2:
-            self.process2.kill()
+        self.job_manager.Kill_Page("gnu")
         self.command_history.append("Keyboard: Ctrl+C")
 
     def Show_Option_Change(self):
@@ -1096,6 +1294,19 @@ class GNU_Logic(baseUIWidget, baseUIClass):
         if len(self.shrt_list.selectedItems()) > 2:
             return
 
+        # Typing in a Man.Option already on the tracker only edits its text
+        if (self.sender() is self.man_text and self.man_text.text() != ""
+                and Contains(self.selected_options, self.man_args)):
+            self.man_args[0] = self.man_text.text()
+            self.command_change.emit()
+            return
+        if (self.sender() is self.man_text_pipe
+                and self.man_text_pipe.text() != ""
+                and Contains(self.selected_pipe_options, self.man_args_pipe)):
+            self.man_args_pipe[0] = self.man_text_pipe.text()
+            self.command_change.emit()
+            return
+
         tool_name = self.shrt_list.selectedItems()[0].text()
         # if list is empty remove it from the options list
         if self.man_args == [""] and self.man_args in self.selected_options:
@@ -1182,6 +1393,18 @@ class GNU_Logic(baseUIWidget, baseUIClass):
         if len(self.shrt_list.selectedItems()) > 2:
             return
 
+        # Typing in an argument already on the tracker only edits its text
+        if (self.sender() is self.text_option and self.text_option.text() != ""
+                and Contains(self.cmd, self.current_args)):
+            self.current_args[0] = self.text_option.text() + " "
+            self.command_change.emit()
+            return
+        if (self.sender() is self.text_pipe and self.text_pipe.text() != ""
+                and Contains(self.cmd1, self.current_pipe_args)):
+            self.current_pipe_args[0] = " " + self.text_pipe.text()
+            self.command_change.emit()
+            return
+
         # If no arguments are selected and current_args in cmd
         # then the args are removed, remove current_args from cmd
         if self.text_option.text() == "" and self.current_args in self.cmd:
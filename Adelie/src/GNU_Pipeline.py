@@ -0,0 +1,243 @@
+"""
+    This module runs commands connected by pipes.
+
+    Each stage of a :class:`GNU_Pipeline` is its own ``QProcess``, the
+    standard output of a stage is connected to the standard input of the
+    next one with ``QProcess.setStandardOutputProcess``. The stages are
+    connected by kernel pipes like in a shell, the data going through the
+    pipeline is never copied by Adelie. Only the standard output of the last
+    stage and the standard error of every stage are read.
+
+    Example:
+        ``sort data | uniq -c | sort -n | head``::
+
+            pipeline = GNU_Pipeline()
+            pipeline.Start([("sort", ["data"]), ("uniq", ["-c"]),
+                            ("sort", ["-n"]), ("head", [])])
+"""
+
+import shlex
+from PyQt5.QtCore import pyqtSignal, QByteArray, QObject, QProcess
+from Stream_Decoder import Stream_Decoder
+
+
+def Parse_Stages(text):
+    """Splits a shell-like pipeline into stages.
+
+    Arguments are split and quoted like in a shell, other shell features
+    (redirections, variables, globs) are not supported.
+
+    Args:
+        text (:obj:`str`): Commands separated by ``|``, for example
+            ``sort -n | head -5``.
+
+    Returns:
+        :obj:`list` of ``tuple``: Program and list of arguments of each
+        stage.
+
+    Raises:
+        ValueError: A quote is not closed or a stage is empty.
+    """
+
+    lexer = shlex.shlex(text, posix=True, punctuation_chars="|")
+    lexer.whitespace_split = True
+    stages = [[]]
+    for token in lexer:
+        if token == "|":
+            stages.append([])
+        elif set(token) == {"|"}:
+            raise ValueError("Empty command in pipeline")
+        else:
+            stages[-1].append(token)
+    if stages == [[]]:
+        return []
+    if [] in stages:
+        raise ValueError("Empty command in pipeline")
+    return [(stage[0], stage[1:]) for stage in stages]
+
+
+class GNU_Pipeline(QObject):
+    """Runs a list of commands, each reading the output of the previous one.
+
+    The exit code of the pipeline follows the ``pipefail`` option of the
+    shells, it is the exit code of the last stage that failed, ``0`` if every
+    stage succeeded. A stage killed by a signal exits with ``128`` plus the
+    signal number, a stage that could not be started with ``127``.
+
+    Args:
+        parent (:obj:`QObject`): Parent object.
+
+    Attributes:
+        output_ready (:obj:`pyqtSignal(str, QByteArray)`): Emitted with the
+            decoded and raw standard output of the last stage.
+        error_ready (:obj:`pyqtSignal(int, str, QByteArray)`): Emitted with
+            the stage index and the decoded and raw standard error of a
+            stage.
+        finished (:obj:`pyqtSignal(int, list)`): Emitted once every stage
+            exited, with the exit code of the pipeline and of each stage.
+        stages (:obj:`list` of ``tuple``): Program and arguments of each
+            stage of the current pipeline.
+        processes (:obj:`list` of ``QProcess``): Process of each stage.
+        exit_codes (:obj:`list` of ``int``): Exit code of each stage,
+            ``None`` while the stage runs.
+        output_decoder (:obj:`Stream_Decoder`): Decoder of the output of the
+            last stage.
+        error_decoders (:obj:`list` of ``Stream_Decoder``): Decoder of the
+            standard error of each stage.
+    """
+
+    output_ready = pyqtSignal(str, QByteArray)
+    error_ready = pyqtSignal(int, str, QByteArray)
+    finished = pyqtSignal(int, list)
+
+    def __init__(self, parent=None):
+        super(GNU_Pipeline, self).__init__(parent)
+        self.stages = []
+        self.processes = []
+        self.exit_codes = []
+        self.output_decoder = Stream_Decoder()
+        self.error_decoders = []
+
+    def Start(self, stages):
+        """Starts a pipeline.
+
+        Args:
+            stages (:obj:`list` of ``tuple``): Program and list of arguments
+                of each stage, in pipe order.
+
+        Raises:
+            RuntimeError: The previous pipeline is still running.
+        """
+
+        if self.Is_Running():
+            raise RuntimeError("Pipeline already running")
+        for process in self.processes:
+            process.deleteLater()
+        self.stages = list(stages)
+        self.processes = []
+        self.exit_codes = [None] * len(self.stages)
+        self.output_decoder = Stream_Decoder()
+        self.error_decoders = []
+        for index in range(len(self.stages)):
+            process = QProcess(self)
+            if self.processes != []:
+                self.processes[-1].setStandardOutputProcess(process)
+            process.readyReadStandardError.connect(
+                lambda index=index: self.Read_Error(index))
+            process.finished.connect(
+                lambda code, status, index=index:
+                self.Stage_Finished(index, code, status))
+            process.errorOccurred.connect(
+                lambda error, index=index: self.Stage_Error(index, error))
+            self.processes.append(process)
+            self.error_decoders.append(Stream_Decoder())
+        # Nothing is typed in the first stage, it reads an empty input
+        self.processes[0].setStandardInputFile(QProcess.nullDevice())
+        self.processes[-1].readyReadStandardOutput.connect(self.Read_Output)
+        for process, (program, arguments) in zip(self.processes, self.stages):
+            process.start(program, arguments)
+
+    def Is_Running(self):
+        """Checks if a stage of the pipeline has not exited yet.
+
+        Returns:
+            :obj:`bool`: ``True`` if the pipeline is running.
+        """
+
+        return None in self.exit_codes
+
+    def Kill(self):
+        """Kills every running stage.
+        """
+
+        for process in self.processes:
+            if process.state() != QProcess.NotRunning:
+                process.kill()
+
+    def Read_Output(self):
+        """Reads the standard output of the last stage.
+        """
+
+        data = self.processes[-1].readAllStandardOutput()
+        if data.isEmpty():
+            return
+        self.output_ready.emit(self.output_decoder.Decode(data), data)
+
+    def Read_Error(self, index):
+        """Reads the standard error of a stage.
+
+        Args:
+            index (:obj:`int`): Index of the stage.
+        """
+
+        data = self.processes[index].readAllStandardError()
+        if data.isEmpty():
+            return
+        self.error_ready.emit(index, self.error_decoders[index].Decode(data),
+                              data)
+
+    def Stage_Error(self, index, error):
+        """Ends a stage that could not be started.
+
+        Like in a shell the other stages keep running, the stage before gets
+        a broken pipe and the stage after reads an empty input.
+
+        Args:
+            index (:obj:`int`): Index of the stage.
+            error (:obj:`QProcess.ProcessError`): Error of the process.
+        """
+
+        if error != QProcess.FailedToStart:
+            return
+        program = self.stages[index][0]
+        message = program + ": command not found\n"
+        self.error_ready.emit(index, message, QByteArray(message.encode()))
+        self.Stage_Done(index, 127)
+
+    def Stage_Finished(self, index, code, status):
+        """Records the exit code of a stage.
+
+        Args:
+            index (:obj:`int`): Index of the stage.
+            code (:obj:`int`): Exit code, or number of the signal that
+                killed the stage.
+            status (:obj:`QProcess.ExitStatus`): Exit status.
+        """
+
+        if status == QProcess.CrashExit:
+            code = 128 + code
+        self.Stage_Done(index, code)
+
+    def Stage_Done(self, index, code):
+        """Emits :attr:`finished` once the last stage exits.
+
+        Args:
+            index (:obj:`int`): Index of the stage.
+            code (:obj:`int`): Exit code of the stage.
+        """
+
+        if self.exit_codes[index] is not None:
+            return
+        self.exit_codes[index] = code
+        text = self.error_decoders[index].Flush()
+        if text != "":
+            self.error_ready.emit(index, text, QByteArray())
+        if self.Is_Running():
+            return
+        text = self.output_decoder.Flush()
+        if text != "":
+            self.output_ready.emit(text, QByteArray())
+        self.finished.emit(self.Get_Exit_Code(), list(self.exit_codes))
+
+    def Get_Exit_Code(self):
+        """Returns the exit code of the pipeline.
+
+        Returns:
+            :obj:`int`: Exit code of the last stage that failed, ``0`` if
+            all stages succeeded.
+        """
+
+        for code in reversed(self.exit_codes):
+            if code:
+                return code
+        return 0
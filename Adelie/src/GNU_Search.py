@@ -0,0 +1,234 @@
+"""
+    This module searches the GNU Core Utilities by name, description and
+    options descriptions.
+
+    The words of every tool name, tool description and option description
+    known by the :mod:`GNU_Handler` are indexed once by their trigrams, a
+    query word then matches every indexed word that shares enough trigrams
+    with it. Typing ``line numbers`` finds ``nl`` (its description) and
+    ``cat -n`` (its option description) even though the words differ.
+"""
+
+import math
+import re
+
+
+class GNU_Search():
+    """Trigram index over the GNU Core Utilities and their options.
+
+    Args:
+        handler (:class:`GNU_Handler.GNU_Handler`): Handler that provides the
+            tools, their descriptions and their options.
+
+    Attributes:
+        handler (:class:`GNU_Handler.GNU_Handler`): See Args.
+        words (:obj:`dict`): Contains each indexed word and its postings
+            {Word: {(Tool, Option): Weight}}, ``Option`` is ``None`` for the
+            tool's name and description.
+        trigrams (:obj:`dict`): Contains each trigram and the set of indexed
+            words that contain it.
+        lengths (:obj:`dict`): Contains ``(Tool, Option)`` and the number of
+            words indexed for it, short texts rank higher.
+        indexed (:obj:`set` of ``str``): Tools whose options are indexed.
+        stop_words (:obj:`set` of ``str``): Words too common to be indexed.
+        min_similarity (:obj:`float`): Minimum trigram similarity between a
+            query word and an indexed word.
+        name_weight (:obj:`float`): Weight of a tool's name.
+        description_weight (:obj:`float`): Weight of a tool's description.
+        option_weight (:obj:`float`): Weight of an option's description.
+    """
+
+    stop_words = {"a", "an", "and", "are", "as", "at", "be", "by", "do",
+                  "each", "for", "from", "if", "in", "is", "it", "its", "not",
+                  "of", "on", "or", "than", "that", "the", "to", "with"}
+    min_similarity = 0.4
+    name_weight = 3.0
+    description_weight = 1.5
+    option_weight = 1.0
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.words = {}
+        self.trigrams = {}
+        self.lengths = {}
+        self.indexed = set()
+        for tool in handler.Get_GNU_Tools():
+            self.Add_Tool(tool)
+
+    def Split_Words(self, text):
+        """Returns the lowercase words of a text without the stop words.
+
+        Plurals and ``-ing`` forms are reduced to the same word, ``lines``
+        and ``numbering`` are indexed as ``line`` and ``number``.
+
+        Args:
+            text (:obj:`str`): Text to split.
+
+        Returns:
+            :obj:`list` of ``str``: Words in the order of the text.
+        """
+
+        words = []
+        for word in re.findall(r"[a-z0-9]+", text.lower()):
+            if word in self.stop_words:
+                continue
+            if len(word) > 5 and word.endswith("ing"):
+                word = word[:-3]
+            elif len(word) > 3 and word[-1] == "s" and word[-2] != "s":
+                word = word[:-1]
+            words.append(word)
+        return words
+
+    def Get_Trigrams(self, word):
+        """Returns the trigrams of a word padded with spaces.
+
+        Args:
+            word (:obj:`str`): Lowercase word.
+
+        Returns:
+            :obj:`set` of ``str``: Word's trigrams.
+        """
+
+        padded = "  " + word + " "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def Index_Text(self, text, key, weight):
+        """Indexes the words of a text.
+
+        Args:
+            text (:obj:`str`): Text to index.
+            key (:obj:`tuple`): ``(Tool, Option)`` the text belongs to.
+            weight (:obj:`float`): Weight of the text's field.
+        """
+
+        words = self.Split_Words(text)
+        self.lengths[key] = self.lengths.get(key, 0) + len(words)
+        for word in words:
+            postings = self.words.get(word)
+            if postings is None:
+                postings = self.words[word] = {}
+                for trigram in self.Get_Trigrams(word):
+                    self.trigrams.setdefault(trigram, set()).add(word)
+            if postings.get(key, 0) < weight:
+                postings[key] = weight
+
+    def Add_Tool(self, tool_name):
+        """Indexes a tool, its description and its options descriptions.
+
+        A tool that is not resolved yet is indexed by its name only, call
+        this method again once it is resolved.
+
+        Args:
+            tool_name (:obj:`str`): Tool's name.
+        """
+
+        if tool_name in self.indexed:
+            return
+        key = (tool_name, None)
+        if key not in self.lengths:
+            self.Index_Text(tool_name, key, self.name_weight)
+        if not self.handler.Is_Resolved(tool_name):
+            return
+        self.indexed.add(tool_name)
+        self.Index_Text(self.handler.Get_Tool_Description(tool_name), key,
+                        self.description_weight)
+        spec = self.handler.tool_Specs[tool_name]
+        for option, description in spec.option_tips.items():
+            self.Index_Text(description, (tool_name, option),
+                            self.option_weight)
+
+    def Find_Words(self, query_word):
+        """Returns the indexed words similar to a query word.
+
+        An indexed word that starts with the query word always matches, so
+        results appear while the user is still typing.
+
+        Args:
+            query_word (:obj:`str`): Lowercase query word.
+
+        Returns:
+            :obj:`dict`: Contains the similar words and their similarity
+            between ``0`` and ``1``.
+        """
+
+        query_trigrams = self.Get_Trigrams(query_word)
+        shared = {}
+        for trigram in query_trigrams:
+            for word in self.trigrams.get(trigram, ()):
+                shared[word] = shared.get(word, 0) + 1
+        similar = {}
+        for word, count in shared.items():
+            similarity = count / (len(query_trigrams) + len(word) + 1 - count)
+            if word.startswith(query_word):
+                similarity = max(similarity, 0.5 + 0.5 * similarity)
+            if similarity >= self.min_similarity:
+                similar[word] = similarity
+        return similar
+
+    def Search(self, query, limit=None):
+        """Returns the tools and options that match a query, best first.
+
+        Each query word adds the best similarity it has with the words of
+        a tool or an option, weighted by the field and by how rare the word
+        is. Matches that contain every query word come first, then shorter
+        texts, partial matches are dropped if any match contains every query
+        word. Only the best match of each tool is returned.
+
+        Args:
+            query (:obj:`str`): Text typed by the user.
+            limit (:obj:`int`): Maximum number of results, all the results
+                are returned if ``None``.
+
+        Returns:
+            :obj:`list` of ``tuple``: ``(Tool, Option, Score)``, ``Option`` is
+            ``None`` if the tool itself matches.
+        """
+
+        query_words = self.Split_Words(query)
+        if query_words == []:
+            return []
+        total = len(self.indexed) or 1
+        scores = {}
+        matched = {}
+        for query_word in query_words:
+            best = {}
+            for word, similarity in self.Find_Words(query_word).items():
+                postings = self.words[word]
+                rarity = math.log(1 + total / len(postings))
+                for key, weight in postings.items():
+                    score = similarity * weight * rarity
+                    if score > best.get(key, 0):
+                        best[key] = score
+            for key, score in best.items():
+                scores[key] = scores.get(key, 0) + score
+                matched[key] = matched.get(key, 0) + 1
+        for key in scores:
+            scores[key] /= 1 + 0.1 * self.lengths[key]
+        ranked = sorted(scores.items(),
+                        key=lambda item: (-matched[item[0]], -item[1],
+                                          item[0][0], item[0][1] or ""))
+        results = []
+        tools = set()
+        complete = ranked != [] and matched[ranked[0][0]] == len(query_words)
+        for (tool, option), score in ranked:
+            if complete and matched[(tool, option)] < len(query_words):
+                break
+            if tool in tools:
+                continue
+            tools.add(tool)
+            results.append((tool, option, score))
+            if limit is not None and len(results) == limit:
+                break
+        return results
+
+    def Find_Tools(self, query):
+        """Returns the tools that match a query.
+
+        Args:
+            query (:obj:`str`): Text typed by the user.
+
+        Returns:
+            :obj:`list` of ``str``: Tools' names, best first.
+        """
+
+        return [tool for tool, _, _ in self.Search(query)]
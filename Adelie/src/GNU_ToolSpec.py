@@ -0,0 +1,255 @@
+"""
+    This module parses the ``--help`` output of a GNU Core Utility.
+
+    The output of ``--help`` is parsed once into a :class:`ToolSpec`, the
+    :mod:`GNU_Handler` then answers every question about the tool from it
+    without invoking the tool again.
+"""
+
+import re
+import subprocess
+import Data
+
+
+def Harvest_Tool(tool_name):
+    """Invokes the ``--help`` of a tool and parses it into its spec.
+
+    This is a module function so it can be sent to a process pool.
+
+    Args:
+        tool_name (:obj:`str`): Tool's name.
+
+    Returns:
+        :class:`ToolSpec`: Tool's spec.
+    """
+
+    res = subprocess.check_output((tool_name, "--help"),
+                                  universal_newlines=True)
+    return ToolSpec.From_Help(tool_name, res)
+
+
+class ToolSpec():
+    """Parsed ``--help`` of a GNU Core Utility.
+
+    Args:
+        name (:obj:`str`): Tool's name.
+
+    Attributes:
+        name (:obj:`str`): Tool's name.
+        description (:obj:`str`): Tool's description.
+        options (:obj:`list` of ``str``): Tool's short options, ``None`` if the
+            tool's options are not parsed (``expr``, ``flock`` and ``test``).
+        long_options (:obj:`list` of ``str``): Tool's long options without
+            the leading ``--``.
+        option_descriptions (:obj:`dict`): Contains the options descriptions
+            and options {Option Description: Option}.
+        option_tips (:obj:`dict`): Contains the options and their ToolTips
+            {Option: Option Description}.
+        arguments (:obj:`list` of ``str``): Tool's supported arguments types,
+            see :attr:`Data.types`.
+        man_options (:obj:`dict`): Contains the options and their Mandatory
+            Options types {Option: Mandatory Option}.
+    """
+
+    __slots__ = ("name", "description", "options", "long_options",
+                 "option_descriptions", "option_tips", "arguments",
+                 "man_options")
+
+    types = Data.types
+
+    # Tools which --help does not follow the usual format
+    # {Tool: (Description, Parse Options)}
+    corner_cases = {
+            # --help --version writter under or (not Description)
+            "expr": ("Print the value of EXPRESSION to standard output",
+                     False),
+            # Description written after arguments
+            "pinky": ("A lightweight 'finger' program;  print user information",
+                      True),
+            # No or after options
+            "flock": ("Manage file locks from shell scripts", False),
+            # Arguments can be any string --help will not work
+            "test": ("Used as part of the conditional"
+                     + " execution of shell commands", False),
+            # Description starts with the tool name
+            "basenc": ("Encode or decode FILE, or standard input,"
+                       + " to standard output", True),
+            }
+
+    def __init__(self, name):
+        self.name = name
+        self.description = ""
+        self.options = None
+        self.long_options = []
+        self.option_descriptions = {}
+        self.option_tips = {}
+        self.arguments = []
+        self.man_options = {}
+
+    @classmethod
+    def From_Help(cls, name, res):
+        """Creates the spec of a tool from its ``--help``.
+
+        Args:
+            name (:obj:`str`): Tool's name.
+            res (:obj:`str`): The output of the tool's ``--help``
+
+        Returns:
+            :class:`ToolSpec`: Tool's spec.
+        """
+
+        spec = cls(name)
+        spec.arguments = spec.Find_Arguments(res)
+        if name in cls.corner_cases:
+            spec.description, parse_options = cls.corner_cases[name]
+            # Do not reach REGEX code (NoneType)
+            if parse_options:
+                spec.Find_Options(res)
+            return spec
+        regex = "Usage:(.*\n\\s+or.+)+\n+(.*)|Usage:.*\n*(([A-Z]).*)"
+        srch = re.search(regex, res)
+        # Unknown --help format, keep the options and arguments
+        if srch is not None and srch[2] is not None:
+            spec.description = srch[2]
+
+        if srch is not None and srch[3] is not None:
+            spec.description = srch[3]
+        spec.Find_Options(res)
+        return spec
+
+    @classmethod
+    def From_Dict(cls, data):
+        """Creates the spec of a tool from a cached dictionary.
+
+        Args:
+            data (:obj:`dict`): See :meth:`To_Dict`.
+
+        Returns:
+            :class:`ToolSpec`: Tool's spec.
+        """
+
+        spec = cls(data["name"])
+        for attribute in cls.__slots__:
+            setattr(spec, attribute, data[attribute])
+        return spec
+
+    def To_Dict(self):
+        """Returns the spec as a dictionary that can be cached.
+
+        Returns:
+            :obj:`dict`: Contains the spec attributes.
+        """
+
+        return {attribute: getattr(self, attribute)
+                for attribute in self.__slots__}
+
+    def Find_Options(self, res):
+        """Finds the Options of the tool, their descriptions and
+        Mandatory Options.
+
+        Args:
+            res (:obj:`str`): The output of the tool's ``--help``
+
+        """
+
+        srch = re.findall(r"\n\s+-([A-Za-z])[,|\s]", res)
+        self.options = srch
+        self.long_options = re.findall(r"\n\s+(?:-\w,\s+)?--(\w[\w-]*)", res)
+        for option in srch:
+            REGEX = "-" + option + ",\\s\\S+\\s+(.*)"
+            rslt = re.search(REGEX, res)
+            if rslt is not None:
+                # Record result in a dictionary as
+                # {"Option Description:Option"}
+                self.option_descriptions[rslt[1]] = option
+            tip = self.Find_Option_Description(res, option)
+            if tip is not None:
+                self.option_tips[option] = tip
+            man_option = self.Find_Man_Option(res, option)
+            if man_option is not None:
+                self.man_options[option] = man_option
+
+    def Find_Option_Description(self, tool_help, option):
+        """Finds option description in the tool's ``--help``.
+
+        Args:
+            tool_help (:obj:`str`): The output of the tool's ``--help``
+            option (:obj:`str`): Option to find its description.
+
+        Returns:
+            :obj:`str`: Option's description
+        Note:
+            uses REGEX =rf"  -{option},\\s\\S+\\s+(.*)|  -{option}\\s+(.*)"
+        """
+
+        REGEX = rf"  -{option},\s\S+\s+(.*)|  -{option}\s+(.*)"
+        rslt = re.findall(REGEX, tool_help)
+        if rslt == []:
+            return None
+        if rslt[0][0] != "":
+            return rslt[0][0]
+        if rslt[0][1] != "":
+            return rslt[0][1]
+
+    def Find_Arguments(self, res):
+        """ Finds the Arguments used by the tool in its ``--help``
+
+        Args:
+            res (:obj:`str`): The output of the tool's ``--help``
+
+        Returns:
+            :obj:`list` of ``str``: Tool's Arguments.
+
+        Note:
+            Uses the following regex
+            regex = r"\\s\\[([A-Z]+)\\]|([A-Z]+)\\.{3}|\\.{3}\\s([A-Z]+)\\d*\\s"
+        """
+
+        args_found = []
+        # args - supported args
+        args = []
+        # Returns a list with all usages
+        regex = r"\s\[([A-Z]+)\]|([A-Z]+)\.{3}|\.{3}\s([A-Z]+)\d*\s"
+        srch = re.findall(regex, res)
+
+        # findall returns submatches
+        # if capture groups are used it will return None if capture group
+        # does not give a result
+        for group in srch:
+            args_found.extend(list(filter(None, group)))
+        for arg in args_found:
+            # Remove option from args
+            if arg == "OPTION":
+                continue
+            if arg in self.types["Path"]:
+                args.append(arg)
+
+            if arg in self.types["Text"]:
+                args.append(arg)
+
+            if arg in self.types["Digit"]:
+                args.append(arg)
+
+        return args
+
+    def Find_Man_Option(self, tool_help, option):
+        """ Finds the Man. Options for an option, returns None if none.
+
+        Args:
+            tool_help (:obj:`str`): The output of the tool's ``--help``
+            option (:obj:`str`): Option to find its Mandatory option.
+
+        Returns:
+            :obj:`str`: Mandatory Option
+        Note:
+            uses regex regex = ("-" + option + ",.*=(\\w+)")
+
+        """
+
+        # stat -c issue
+        if self.name == "head" and option == "n":
+            return "NUM"
+        regex = ("-" + option + ",.*=(\\w+)")
+        res = re.search(regex, tool_help)
+        if res is not None:
+            return res[1]
@@ -0,0 +1,323 @@
+"""
+    This module keeps the command history of every page in SQLite.
+
+    Each command run by a page is an entry with its time, page, tool,
+    command line, the program and arguments of each command of its pipe,
+    and once it exited its exit code and duration. The entries are indexed
+    on time, tool and page and their command line is indexed for full-text
+    search with ``FTS5``, :meth:`History_Store.Get_Rows` reads them one page
+    at a time so the history can hold millions of entries.
+
+    The history is stored in ``$XDG_DATA_HOME/adelie/history.sqlite3``, it
+    survives the ``Clear History`` buttons of the pages which only clear
+    their terminals.
+
+    Example:
+        The pages and the :class:`Job_Manager.Job_Manager` share the store
+        returned by :func:`Get_Store`::
+
+            store = History_Store.Get_Store()
+            entry_id = store.Add("gnu", "sort data", [("sort", ["data"])])
+            store.Finish(entry_id, 0, 0.02)
+            rows = store.Get_Rows(0, 100, text="sort")
+
+    Attributes:
+        HISTORY_DIR (str): Directory that contains Adelie's data files.
+            Follows ``$XDG_DATA_HOME`` and defaults to
+            ``~/.local/share/adelie``.
+        HISTORY_FILE (str): Path of the history database.
+        COLUMNS (list): Columns returned by :meth:`History_Store.Get_Rows`.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+
+HISTORY_DIR = os.path.join(
+                        os.environ.get("XDG_DATA_HOME",
+                                       os.path.expanduser("~/.local/share")),
+                        "adelie")
+HISTORY_FILE = os.path.join(HISTORY_DIR, "history.sqlite3")
+COLUMNS = ["id", "time", "page", "tool", "command", "exit_code", "duration"]
+
+_store = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    page TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    command TEXT NOT NULL,
+    stages TEXT,
+    exit_code INTEGER,
+    duration REAL
+);
+CREATE INDEX IF NOT EXISTS history_time ON history (time);
+CREATE INDEX IF NOT EXISTS history_tool ON history (tool, time);
+CREATE INDEX IF NOT EXISTS history_page ON history (page, time);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+    command, content='history', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS history_insert AFTER INSERT ON history BEGIN
+    INSERT INTO history_fts (rowid, command) VALUES (new.id, new.command);
+END;
+CREATE TRIGGER IF NOT EXISTS history_delete AFTER DELETE ON history BEGIN
+    INSERT INTO history_fts (history_fts, rowid, command)
+        VALUES ('delete', old.id, old.command);
+END;
+"""
+
+
+def Get_Store():
+    """Returns the history store shared by the pages, creates it on first
+    use.
+
+    Returns:
+        :class:`History_Store`: The history store.
+    """
+
+    global _store
+    if _store is None:
+        _store = History_Store()
+    return _store
+
+
+class History_Store():
+    """Command history stored in a SQLite database.
+
+    The database is opened on first use. If ``FTS5`` is not compiled in the
+    SQLite library the search falls back to ``LIKE``, which scans every
+    entry.
+
+    Args:
+        path (:obj:`str`): Database path, defaults to :attr:`HISTORY_FILE`.
+            ``":memory:"`` keeps the history in memory.
+
+    Attributes:
+        path (:obj:`str`): See Args.
+        connection (:obj:`sqlite3.Connection`): Connection to the database,
+            ``None`` until it is opened or if it can not be opened.
+        full_text (:obj:`bool`): ``True`` if the command lines are indexed
+            with ``FTS5``.
+        failed (:obj:`bool`): ``True`` if the database could not be opened.
+
+    Note:
+        A database that can not be opened or written is never an error, the
+        commands are then simply not recorded.
+    """
+
+    def __init__(self, path=HISTORY_FILE):
+        self.path = path
+        self.connection = None
+        self.full_text = False
+        self.failed = False
+
+    def Open(self):
+        """Opens the database and creates its tables if needed.
+
+        Returns:
+            :obj:`bool`: ``True`` if the database is open.
+        """
+
+        if self.connection is not None:
+            return True
+        if self.failed:
+            return False
+        try:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(self.path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+        except (OSError, sqlite3.Error):
+            self.failed = True
+            return False
+        try:
+            connection.executescript(FTS_SCHEMA)
+            self.full_text = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5
+            self.full_text = False
+        self.connection = connection
+        return True
+
+    def Close(self):
+        """Closes the database.
+        """
+
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def Execute(self, query, parameters=()):
+        """Runs a query that changes the database and commits it.
+
+        Args:
+            query (:obj:`str`): SQL query.
+            parameters (:obj:`tuple`): Parameters of the query.
+
+        Returns:
+            :obj:`sqlite3.Cursor`: Cursor of the query, ``None`` if the
+            database is not available.
+        """
+
+        if not self.Open():
+            return None
+        try:
+            with self.connection:
+                return self.connection.execute(query, parameters)
+        except sqlite3.Error:
+            return None
+
+    def Add(self, page, command, stages=None):
+        """Records a command.
+
+        Args:
+            page (:obj:`str`): Name of the page that ran the command.
+            command (:obj:`str`): Command line, as displayed to the user.
+            stages (:obj:`list` of ``tuple``): Program and list of arguments
+                of each command of the pipe, ``None`` if unknown.
+
+        Returns:
+            :obj:`int`: Id of the entry, ``None`` if it was not recorded.
+        """
+
+        if stages:
+            tool = stages[0][0]
+        else:
+            tool = command.split(" ", 1)[0]
+        cursor = self.Execute(
+            "INSERT INTO history (time, page, tool, command, stages) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (time.time(), page, tool, command,
+             json.dumps(stages) if stages else None))
+        return None if cursor is None else cursor.lastrowid
+
+    def Finish(self, entry_id, exit_code, duration):
+        """Records the exit of a command.
+
+        Args:
+            entry_id (:obj:`int`): Id returned by :meth:`Add`, ``None`` is
+                ignored.
+            exit_code (:obj:`int`): Exit code of the command.
+            duration (:obj:`float`): Seconds the command ran.
+        """
+
+        if entry_id is None:
+            return
+        self.Execute("UPDATE history SET exit_code = ?, duration = ? "
+                     "WHERE id = ?", (exit_code, duration, entry_id))
+
+    def Get_Filter(self, text="", page=None):
+        """Returns the ``WHERE`` clause that selects the matching entries.
+
+        Every word of the text must appear in the command line. With
+        ``FTS5`` a word matches the start of the words of the command,
+        ``sort -n`` matches ``sort -nr``, and punctuation is ignored.
+
+        Args:
+            text (:obj:`str`): Words searched in the command lines.
+            page (:obj:`str`): Only the entries of this page, ``None`` for
+                every page.
+
+        Returns:
+            :obj:`tuple`: The clause, empty if every entry matches, and its
+            parameters.
+        """
+
+        conditions = []
+        parameters = []
+        if page is not None:
+            conditions.append("page = ?")
+            parameters.append(page)
+        phrases = []
+        for word in text.split():
+            if self.full_text and any(char.isalnum() for char in word):
+                phrases.append('"%s"*' % word.replace('"', '""'))
+                continue
+            conditions.append("command LIKE ? ESCAPE '\\'")
+            parameters.append("%" + word.replace("\\", "\\\\")
+                                        .replace("%", "\\%")
+                                        .replace("_", "\\_") + "%")
+        if phrases != []:
+            conditions.append("id IN (SELECT rowid FROM history_fts "
+                              "WHERE history_fts MATCH ?)")
+            parameters.append(" ".join(phrases))
+        if conditions == []:
+            return "", ()
+        return " WHERE " + " AND ".join(conditions), tuple(parameters)
+
+    def Count(self, text="", page=None):
+        """Returns the number of matching entries.
+
+        Args:
+            text (:obj:`str`): See :meth:`Get_Filter`.
+            page (:obj:`str`): See :meth:`Get_Filter`.
+
+        Returns:
+            :obj:`int`: Number of entries.
+        """
+
+        if not self.Open():
+            return 0
+        where, parameters = self.Get_Filter(text, page)
+        try:
+            return self.connection.execute(
+                "SELECT count(*) FROM history" + where,
+                parameters).fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def Get_Rows(self, offset, count, text="", page=None):
+        """Returns a page of matching entries, newest first.
+
+        Args:
+            offset (:obj:`int`): Number of newer entries skipped.
+            count (:obj:`int`): Maximum number of entries.
+            text (:obj:`str`): See :meth:`Get_Filter`.
+            page (:obj:`str`): See :meth:`Get_Filter`.
+
+        Returns:
+            :obj:`list` of ``tuple``: The :data:`COLUMNS` of each entry.
+        """
+
+        if not self.Open():
+            return []
+        where, parameters = self.Get_Filter(text, page)
+        try:
+            return self.connection.execute(
+                "SELECT " + ", ".join(COLUMNS) + " FROM history" + where
+                + " ORDER BY time DESC, id DESC LIMIT ? OFFSET ?",
+                parameters + (count, offset)).fetchall()
+        except sqlite3.Error:
+            return []
+
+    def Get_Stages(self, entry_id):
+        """Returns the program and arguments of each command of an entry.
+
+        Args:
+            entry_id (:obj:`int`): Id of the entry.
+
+        Returns:
+            :obj:`list` of ``tuple``: Program and list of arguments of each
+            command of the pipe, ``None`` if they were not recorded.
+        """
+
+        if not self.Open():
+            return None
+        try:
+            row = self.connection.execute(
+                "SELECT stages FROM history WHERE id = ?",
+                (entry_id,)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None or row[0] is None:
+            return None
+        return [(program, arguments)
+                for program, arguments in json.loads(row[0])]
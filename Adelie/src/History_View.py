@@ -0,0 +1,308 @@
+"""
+    This module shows the command history of the :mod:`History_Store`.
+
+    :class:`History_View` lists the commands of every page, newest first,
+    can search their command lines, show the commands of one page and run a
+    command again. It is opened from the ``Jobs`` menu of the main window.
+
+    The list is virtual, :class:`History_Model` only reads the rows that are
+    displayed from the database, a block at a time, so it stays fast with
+    millions of entries.
+"""
+
+import collections
+import time
+from PyQt5 import QtCore, QtWidgets
+from PyQt5.QtCore import Qt
+from GNU_Pipeline import Parse_Stages
+
+
+class History_Model(QtCore.QAbstractTableModel):
+    """Table model that reads the history one block of rows at a time.
+
+    Args:
+        store (:obj:`History_Store`): Store the entries are read from.
+        parent (:obj:`QObject`): Parent object.
+
+    Attributes:
+        columns (:obj:`list` of ``str``): Headers of the columns.
+        block_size (:obj:`int`): Number of rows read at once.
+        cached_blocks (:obj:`int`): Number of blocks kept in memory.
+        store (:obj:`History_Store`): See Args.
+        text (:obj:`str`): Words searched, see
+            :meth:`History_Store.History_Store.Get_Filter`.
+        page (:obj:`str`): Page whose entries are shown, ``None`` for every
+            page.
+        count (:obj:`int`): Number of matching entries.
+        blocks (:obj:`OrderedDict`): Contains the block index and its rows,
+            the least recently used block first.
+    """
+
+    columns = ["Time", "Page", "Tool", "Command", "Exit Code", "Duration"]
+    block_size = 256
+    cached_blocks = 32
+
+    def __init__(self, store, parent=None):
+        super(History_Model, self).__init__(parent)
+        self.store = store
+        self.text = ""
+        self.page = None
+        self.count = 0
+        self.blocks = collections.OrderedDict()
+
+    def Set_Filter(self, text, page):
+        """Shows the entries that match a search.
+
+        Args:
+            text (:obj:`str`): Words searched in the command lines.
+            page (:obj:`str`): Page whose entries are shown, ``None`` for
+                every page.
+        """
+
+        self.text = text
+        self.page = page
+        self.Refresh()
+
+    def Refresh(self):
+        """Reads the entries again, for example after new commands ran.
+        """
+
+        self.beginResetModel()
+        self.blocks.clear()
+        self.count = self.store.Count(self.text, self.page)
+        self.endResetModel()
+
+    def Get_Row(self, row):
+        """Returns an entry, reads its block if needed.
+
+        Args:
+            row (:obj:`int`): Row of the entry.
+
+        Returns:
+            :obj:`tuple`: The :data:`History_Store.COLUMNS` of the entry,
+            ``None`` if the entry was removed.
+        """
+
+        index, offset = divmod(row, self.block_size)
+        if index in self.blocks:
+            self.blocks.move_to_end(index)
+        else:
+            self.blocks[index] = self.store.Get_Rows(
+                index * self.block_size, self.block_size, self.text,
+                self.page)
+            if len(self.blocks) > self.cached_blocks:
+                self.blocks.popitem(last=False)
+        block = self.blocks[index]
+        return block[offset] if offset < len(block) else None
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        """Returns the number of matching entries.
+
+        Args:
+            parent (:obj:`QModelIndex`): Parent index, the model is flat.
+
+        Returns:
+            :obj:`int`: Number of rows.
+        """
+
+        return 0 if parent.isValid() else self.count
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        """Returns the number of columns.
+
+        Args:
+            parent (:obj:`QModelIndex`): Parent index, the model is flat.
+
+        Returns:
+            :obj:`int`: Number of columns.
+        """
+
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        """Returns the header of a column.
+
+        Args:
+            section (:obj:`int`): Column.
+            orientation (:obj:`Qt.Orientation`): Orientation of the header.
+            role (:obj:`Qt.ItemDataRole`): Role of the data.
+
+        Returns:
+            :obj:`str`: Header, ``None`` for other roles.
+        """
+
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        """Returns the text of a cell.
+
+        Args:
+            index (:obj:`QModelIndex`): Cell.
+            role (:obj:`Qt.ItemDataRole`): Role of the data.
+
+        Returns:
+            :obj:`str`: Text of the cell, ``None`` for other roles.
+        """
+
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole) or not index.isValid():
+            return None
+        entry = self.Get_Row(index.row())
+        if entry is None:
+            return None
+        _, when, page, tool, command, exit_code, duration = entry
+        column = index.column()
+        if column == 0:
+            return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(when))
+        if column == 1:
+            return page
+        if column == 2:
+            return tool
+        if column == 3:
+            return command
+        if column == 4:
+            return "" if exit_code is None else str(exit_code)
+        return "" if duration is None else "%.2f s" % duration
+
+
+class History_View(QtWidgets.QDialog):
+    """Searchable list of the commands run by every page.
+
+    Args:
+        store (:obj:`History_Store`): Store of the commands.
+        manager (:obj:`Job_Manager`): Manager that runs the commands again.
+        runners (:obj:`dict`): Contains the pages that run their commands
+            themselves and the method that runs a command, called with the
+            command line and the stages, for example
+            :meth:`GNU_Logic.GNU_Logic.Run_Job`.
+        parent (:obj:`QWidget`): Parent widget.
+
+    Attributes:
+        pages (:obj:`list` of ``str``): Pages that can be selected.
+        store (:obj:`History_Store`): See Args.
+        manager (:obj:`Job_Manager`): See Args.
+        runners (:obj:`dict`): See Args.
+        model (:obj:`History_Model`): Entries shown.
+        search_timer (:obj:`QTimer`): Searches once the user stops typing.
+    """
+
+    pages = ["gnu", "ping", "netstat", "ifconfig", "iwconfig"]
+
+    def __init__(self, store, manager, runners=None, parent=None):
+        super(History_View, self).__init__(parent)
+        self.store = store
+        self.manager = manager
+        self.runners = runners or {}
+        self.setWindowTitle("History")
+        self.resize(860, 480)
+
+        self.search_text = QtWidgets.QLineEdit(self)
+        self.search_text.setPlaceholderText("Search")
+        self.search_text.setClearButtonEnabled(True)
+        self.page_box = QtWidgets.QComboBox(self)
+        self.page_box.addItem("All Pages")
+        self.page_box.addItems(self.pages)
+        self.model = History_Model(self.store, self)
+        self.table = QtWidgets.QTableView(self)
+        self.table.setModel(self.model)
+        # Fixed row heights, the view never measures every row
+        self.table.verticalHeader().setSectionResizeMode(
+            QtWidgets.QHeaderView.Fixed)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setSectionResizeMode(
+            3, QtWidgets.QHeaderView.Stretch)
+        self.table.setColumnWidth(0, 150)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(
+            QtWidgets.QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.doubleClicked.connect(self.Run_Again)
+        self.count_label = QtWidgets.QLabel(self)
+        self.run_button = QtWidgets.QPushButton("Run Again", self)
+        self.run_button.clicked.connect(self.Run_Again)
+
+        search = QtWidgets.QHBoxLayout()
+        search.addWidget(self.search_text)
+        search.addWidget(self.page_box)
+        controls = QtWidgets.QHBoxLayout()
+        controls.addWidget(self.count_label)
+        controls.addStretch()
+        controls.addWidget(self.run_button)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addLayout(search)
+        layout.addWidget(self.table)
+        layout.addLayout(controls)
+
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.Search)
+        self.search_text.textChanged.connect(self.search_timer.start)
+        self.page_box.currentIndexChanged.connect(self.Search)
+        # New entries are shown once their job finished
+        self.manager.job_finished.connect(self.Schedule_Refresh)
+
+    def Search(self):
+        """Shows the entries that match the search text and page.
+        """
+
+        self.search_timer.stop()
+        page = None
+        if self.page_box.currentIndex() > 0:
+            page = self.page_box.currentText()
+        self.model.Set_Filter(self.search_text.text(), page)
+        self.Update_Count()
+
+    def Schedule_Refresh(self):
+        """Reads the entries again soon if the history is shown.
+        """
+
+        if self.isVisible():
+            self.search_timer.start()
+
+    def Update_Count(self):
+        """Displays the number of matching entries.
+        """
+
+        self.count_label.setText("%d commands" % self.model.count)
+
+    def Run_Again(self):
+        """Runs the selected command again as a job of its page.
+
+        The output of the ``gnu`` and ``ping`` commands is printed by their
+        pages, the output of the other commands is shown by the
+        :mod:`Job_Table`. The pages in :attr:`runners` run the command
+        themselves, the ``gnu`` page starts its terminal spool first.
+        """
+
+        rows = self.table.selectionModel().selectedRows()
+        if rows == []:
+            return
+        entry = self.model.Get_Row(rows[0].row())
+        if entry is None:
+            return
+        entry_id, _, page, _, command = entry[:5]
+        stages = self.store.Get_Stages(entry_id)
+        if stages is None:
+            try:
+                stages = Parse_Stages(command)
+            except ValueError as error:
+                QtWidgets.QMessageBox.warning(self, "Run Again", str(error))
+                return
+        if stages == []:
+            return
+        if page in self.runners:
+            self.runners[page](command, stages)
+        else:
+            self.manager.Submit(page, command, stages)
+
+    def showEvent(self, event):
+        """Reads the entries when the history is shown.
+
+        Args:
+            event (:obj:`QShowEvent`): Show event.
+        """
+
+        super(History_View, self).showEvent(event)
+        self.Search()
@@ -0,0 +1,603 @@
+"""
+    This module sends ICMP echo requests from Adelie itself.
+
+    Linux lets users send ICMP echo requests without privileges through
+    datagram sockets, ``socket(AF_INET, SOCK_DGRAM, IPPROTO_ICMP)``, if
+    their group is within ``net.ipv4.ping_group_range``. The kernel fills
+    in the identifier and checksum of each request and only delivers the
+    replies to the requests of the socket.
+
+    One :class:`ICMP_Socket` per address family and time to live is shared
+    by every ping. Each request gets its own sequence number on the socket,
+    the replies are matched to their ping by it, thousands of requests can
+    wait for their reply on the same socket. The socket is watched by a
+    ``QSocketNotifier``, no process or thread is started.
+
+    :class:`ICMP_Ping` runs like ``ping`` with the ``-c``, ``-s``, ``-t``,
+    ``-A``, ``-i`` and ``-W`` options and prints the same lines, the ping
+    page and :mod:`Ping_Stats` read them like the output of ``ping``. ICMP
+    errors, such as an unreachable host, are not reported, the request is
+    counted as lost.
+
+    Example:
+        Pinging the local host three times::
+
+            ping = ICMP_Ping("127.0.0.1", count=3)
+            ping.output_ready.connect(print)
+            ping.Start()
+
+        The module can also be run like ``ping``::
+
+            python ICMP_Engine.py -c 3 127.0.0.1
+
+    Attributes:
+        MAXWAIT (float): Seconds a request waits for its reply by default.
+        ADAPTIVE_INTERVAL (float): Shortest interval between the requests of
+            an adaptive ping, the shortest ``ping`` allows to users.
+        MIN_INTERVAL (float): Shortest interval ``-i`` accepts, the
+            shortest ``ping`` allows to users.
+        ECHO_REQUEST (dict): Contains the address family and the ICMP type
+            of its echo requests.
+        ECHO_REPLY (dict): Contains the address family and the ICMP type of
+            its echo replies.
+        PROTOCOL (dict): Contains the address family and its ICMP protocol.
+        HEADER (Struct): Type, code, checksum, identifier and sequence
+            number of an ICMP echo message.
+        RECEIVE_BUFFER (int): Size of the receive buffer of the sockets, in
+            bytes, the replies to the requests sent at once wait in it.
+"""
+
+import heapq
+import ipaddress
+import signal
+import socket
+import struct
+import sys
+import time
+from PyQt5.QtCore import (pyqtSignal, QCoreApplication, QObject,
+                          QSocketNotifier, Qt, QTimer)
+from PyQt5.QtNetwork import QAbstractSocket, QHostAddress, QHostInfo
+from Ping_Stats import RTT_Stats
+
+
+MAXWAIT = 10.0
+ADAPTIVE_INTERVAL = 0.2
+MIN_INTERVAL = 0.002
+ECHO_REQUEST = {socket.AF_INET: 8, socket.AF_INET6: 128}
+ECHO_REPLY = {socket.AF_INET: 0, socket.AF_INET6: 129}
+PROTOCOL = {socket.AF_INET: socket.IPPROTO_ICMP,
+            socket.AF_INET6: socket.IPPROTO_ICMPV6}
+HEADER = struct.Struct("!BBHHH")
+
+# Not exported by the socket module, see ip(7)
+IP_RECVTTL = getattr(socket, "IP_RECVTTL", 12)
+SEQUENCES = 65536
+RECEIVE_BUFFER = 4 * 1024 * 1024
+
+_sockets = {}
+
+
+def Is_Available(family=socket.AF_INET):
+    """Checks if ICMP datagram sockets can be opened.
+
+    Args:
+        family (:obj:`int`): ``socket.AF_INET`` or ``socket.AF_INET6``.
+
+    Returns:
+        :obj:`bool`: ``False`` if the group of the user is not within
+        ``net.ipv4.ping_group_range`` or the system has no ICMP sockets.
+    """
+
+    try:
+        socket.socket(family, socket.SOCK_DGRAM, PROTOCOL[family]).close()
+    except OSError:
+        return False
+    return True
+
+
+def Get_Socket(family, ttl=None):
+    """Returns the socket shared by the pings of an address family and time
+    to live, opens it on first use.
+
+    Args:
+        family (:obj:`int`): ``socket.AF_INET`` or ``socket.AF_INET6``.
+        ttl (:obj:`int`): Time to live of the requests, ``None`` for the
+            system default.
+
+    Returns:
+        :class:`ICMP_Socket`: The socket.
+
+    Raises:
+        OSError: The socket can not be opened.
+    """
+
+    if (family, ttl) not in _sockets:
+        _sockets[(family, ttl)] = ICMP_Socket(family, ttl)
+    return _sockets[(family, ttl)]
+
+
+def Parse_Arguments(arguments):
+    """Reads the arguments of a ping, as passed to ``ping``.
+
+    Args:
+        arguments (:obj:`list` of ``str``): For example
+            ``["-c", "3", "-s", "100", "127.0.0.1"]``.
+
+    Returns:
+        :obj:`tuple`: The target and a :obj:`dict` of the keyword arguments
+        of :class:`ICMP_Ping`.
+
+    Raises:
+        ValueError: An option is not supported, a value is invalid or the
+            target is missing.
+    """
+
+    options = {}
+    names = {"-c": ("count", int), "-s": ("size", int), "-t": ("ttl", int),
+             "-i": ("interval", float), "-W": ("timeout", float)}
+    target = None
+    arguments = list(arguments)
+    while arguments != []:
+        argument = arguments.pop(0)
+        if argument == "-A":
+            options["adaptive"] = True
+        elif argument in names:
+            if arguments == []:
+                raise ValueError("ping: option requires an argument -- '%s'"
+                                 % argument[1])
+            name, kind = names[argument]
+            options[name] = kind(arguments.pop(0))
+        elif argument.startswith("-"):
+            raise ValueError("ping: invalid option -- '%s'" % argument[1:])
+        else:
+            target = argument
+    if target is None:
+        raise ValueError("ping: usage error: Destination address required")
+    if options.get("count", 1) < 1:
+        raise ValueError("ping: invalid argument: '%d': out of range: "
+                         "1 <= value <= 9223372036854775807"
+                         % options["count"])
+    if options.get("interval", MIN_INTERVAL) < MIN_INTERVAL:
+        raise ValueError("ping: cannot flood, minimal interval for user "
+                         "must be >= 2 ms, use -i 0.002 (or higher)")
+    if not 0 <= options.get("size", 0) <= 65507:
+        raise ValueError("ping: invalid packet size")
+    if not 1 <= options.get("ttl", 1) <= 255:
+        raise ValueError("ping: invalid ttl")
+    return target, options
+
+
+def Format_Time(rtt):
+    """Formats a round-trip time like ``ping``.
+
+    Args:
+        rtt (:obj:`float`): Round-trip time in milliseconds.
+
+    Returns:
+        :obj:`str`: ``"0.045"``, ``"1.23"``, ``"10.3"`` or ``"113"``.
+    """
+
+    if rtt >= 100:
+        return "%.0f" % rtt
+    if rtt >= 10:
+        return "%.1f" % rtt
+    if rtt >= 1:
+        return "%.2f" % rtt
+    return "%.3f" % rtt
+
+
+class ICMP_Socket(QObject):
+    """ICMP datagram socket shared by many pings.
+
+    Args:
+        family (:obj:`int`): ``socket.AF_INET`` or ``socket.AF_INET6``.
+        ttl (:obj:`int`): Time to live of the requests, ``None`` for the
+            system default.
+        parent (:obj:`QObject`): Parent object.
+
+    Attributes:
+        family (:obj:`int`): See Args.
+        socket (:obj:`socket.socket`): Non-blocking ICMP socket.
+        probes (:obj:`dict`): Contains the sequence number of each request
+            waiting for its reply, and its ping, the sequence number of the
+            request in its ping, the time it was sent and its deadline.
+        deadlines (:obj:`list`): Heap of the deadline and sequence number
+            of the requests.
+        next_seq (:obj:`int`): Sequence number of the next request.
+        notifier (:obj:`QSocketNotifier`): Reads the replies once they
+            arrive.
+        timer (:obj:`QTimer`): Drops the requests past their deadline.
+
+    Raises:
+        OSError: The socket can not be opened.
+    """
+
+    def __init__(self, family, ttl=None, parent=None):
+        super(ICMP_Socket, self).__init__(parent)
+        self.family = family
+        self.socket = socket.socket(family, socket.SOCK_DGRAM,
+                                    PROTOCOL[family])
+        self.socket.setblocking(False)
+        # Replies to many requests sent at once arrive together, the
+        # kernel caps the buffer at net.core.rmem_max
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF,
+                               RECEIVE_BUFFER)
+        if family == socket.AF_INET:
+            if ttl is not None:
+                self.socket.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+            self.socket.setsockopt(socket.IPPROTO_IP, IP_RECVTTL, 1)
+        else:
+            if ttl is not None:
+                self.socket.setsockopt(socket.IPPROTO_IPV6,
+                                       socket.IPV6_UNICAST_HOPS, ttl)
+            self.socket.setsockopt(socket.IPPROTO_IPV6,
+                                   socket.IPV6_RECVHOPLIMIT, 1)
+        self.probes = {}
+        self.deadlines = []
+        self.next_seq = 0
+        self.notifier = QSocketNotifier(self.socket.fileno(),
+                                        QSocketNotifier.Read, self)
+        self.notifier.activated.connect(self.Read_Replies)
+        self.timer = QTimer(self)
+        self.timer.setInterval(100)
+        self.timer.timeout.connect(self.Expire_Probes)
+
+    def Send(self, ping, ping_seq, address, payload, timeout):
+        """Sends an echo request.
+
+        Args:
+            ping (:obj:`ICMP_Ping`): Ping of the request, it is told of the
+                reply or of its loss.
+            ping_seq (:obj:`int`): Sequence number of the request in its
+                ping.
+            address (:obj:`str`): Address of the target.
+            payload (:obj:`bytes`): Data of the request.
+            timeout (:obj:`float`): Seconds the request waits for its reply.
+
+        Returns:
+            :obj:`int`: Sequence number of the request on the socket.
+
+        Raises:
+            OSError: The request can not be sent.
+        """
+
+        if len(self.probes) >= SEQUENCES:
+            raise BlockingIOError("Too many requests waiting for a reply")
+        while self.next_seq in self.probes:
+            self.next_seq = (self.next_seq + 1) % SEQUENCES
+        seq = self.next_seq
+        packet = HEADER.pack(ECHO_REQUEST[self.family], 0, 0, 0, seq) + payload
+        sent = time.perf_counter()
+        self.socket.sendto(packet, (address, 0))
+        self.next_seq = (seq + 1) % SEQUENCES
+        self.probes[seq] = (ping, ping_seq, sent, sent + timeout)
+        heapq.heappush(self.deadlines, (sent + timeout, seq))
+        if not self.timer.isActive():
+            self.timer.start()
+        return seq
+
+    def Forget(self, seq):
+        """Stops waiting for the reply of a request.
+
+        Args:
+            seq (:obj:`int`): Sequence number returned by :meth:`Send`.
+        """
+
+        self.probes.pop(seq, None)
+
+    def Read_Replies(self):
+        """Reads the replies received and passes them to their ping.
+        """
+
+        while True:
+            try:
+                data, ancdata, _, source = self.socket.recvmsg(65536, 64)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                # An ICMP error queued on the socket, the request is lost
+                continue
+            received = time.perf_counter()
+            if len(data) < HEADER.size:
+                continue
+            kind, _, _, _, seq = HEADER.unpack_from(data)
+            if kind != ECHO_REPLY[self.family] or seq not in self.probes:
+                continue
+            ping, ping_seq, sent, _ = self.probes.pop(seq)
+            ttl = None
+            for level, message, value in ancdata:
+                if ((level, message) in ((socket.IPPROTO_IP, socket.IP_TTL),
+                                         (socket.IPPROTO_IPV6,
+                                          socket.IPV6_HOPLIMIT))
+                        and len(value) >= 4):
+                    ttl = int.from_bytes(value[:4], sys.byteorder)
+            ping.Reply_Received(ping_seq, (received - sent) * 1000,
+                                len(data), ttl, source[0])
+        if self.probes == {}:
+            self.Stop_Timer()
+
+    def Expire_Probes(self):
+        """Drops the requests past their deadline, their ping counts them as
+        lost.
+        """
+
+        now = time.perf_counter()
+        while self.deadlines != [] and self.deadlines[0][0] <= now:
+            deadline, seq = heapq.heappop(self.deadlines)
+            probe = self.probes.get(seq)
+            # The number may have been used again by a later request
+            if probe is not None and probe[3] == deadline:
+                del self.probes[seq]
+                probe[0].Reply_Lost(probe[1])
+        if self.probes == {}:
+            self.Stop_Timer()
+
+    def Stop_Timer(self):
+        """Stops checking the deadlines once no request waits.
+        """
+
+        self.timer.stop()
+        self.deadlines = []
+
+
+class ICMP_Ping(QObject):
+    """Pings a target through an :class:`ICMP_Socket`, like ``ping``.
+
+    Args:
+        target (:obj:`str`): Host name or address.
+        count (:obj:`int`): Number of requests, ``None`` until stopped.
+        size (:obj:`int`): Number of data bytes of each request.
+        ttl (:obj:`int`): Time to live, ``None`` for the system default.
+        adaptive (:obj:`bool`): ``True`` to send the next request as soon as
+            the reply arrives, at most every :attr:`ADAPTIVE_INTERVAL`.
+        interval (:obj:`float`): Seconds between two requests.
+        timeout (:obj:`float`): Seconds a request waits for its reply.
+        parent (:obj:`QObject`): Parent object.
+
+    Attributes:
+        output_ready (:obj:`pyqtSignal(str)`): Emits each line of output,
+            without new line.
+        ping_finished (:obj:`pyqtSignal(int)`): Emits the exit code of the
+            ping, ``0`` if a reply was received, ``1`` if not and ``2`` on
+            errors.
+        target (:obj:`str`): See Args.
+        count (:obj:`int`): See Args.
+        size (:obj:`int`): See Args.
+        ttl (:obj:`int`): See Args.
+        adaptive (:obj:`bool`): See Args.
+        interval (:obj:`float`): See Args.
+        timeout (:obj:`float`): See Args.
+        address (:obj:`str`): Address of the target, ``None`` until it is
+            resolved.
+        socket (:obj:`ICMP_Socket`): Socket of the requests.
+        sent (:obj:`int`): Number of requests sent.
+        received (:obj:`int`): Number of replies.
+        waiting (:obj:`dict`): Contains the sequence number of each request
+            waiting for its reply and its sequence number on the socket.
+        rtt (:obj:`Ping_Stats.RTT_Stats`): Statistics of the replies.
+        start_time (:obj:`float`): Time the first request was sent.
+        last_send (:obj:`float`): Time the last request was sent.
+        finished (:obj:`bool`): ``True`` once the ping finished.
+        send_timer (:obj:`QTimer`): Sends the next request.
+    """
+
+    output_ready = pyqtSignal(str)
+    ping_finished = pyqtSignal(int)
+
+    def __init__(self, target, count=None, size=56, ttl=None, adaptive=False,
+                 interval=1.0, timeout=MAXWAIT, parent=None):
+        super(ICMP_Ping, self).__init__(parent)
+        self.target = target
+        self.count = count
+        self.size = size
+        self.ttl = ttl
+        self.adaptive = adaptive
+        self.interval = interval
+        self.timeout = timeout
+        self.address = None
+        self.socket = None
+        self.sent = 0
+        self.received = 0
+        self.waiting = {}
+        self.rtt = RTT_Stats()
+        self.start_time = None
+        self.last_send = None
+        self.finished = False
+        self.payload = (bytes(range(256)) * (size // 256 + 1))[:size]
+        self.send_timer = QTimer(self)
+        self.send_timer.setSingleShot(True)
+        # A coarse timer may fire 5% early, ping keeps its interval
+        self.send_timer.setTimerType(Qt.PreciseTimer)
+        self.send_timer.timeout.connect(self.Send_Next)
+
+    def Start(self):
+        """Resolves the target, the requests are sent once it is resolved.
+
+        An address is used as is, Qt would look up its host name first,
+        ``ping -n`` never does.
+        """
+
+        try:
+            ipaddress.ip_address(self.target)
+        except ValueError:
+            QHostInfo.lookupHost(self.target, self.Host_Found)
+            return
+        info = QHostInfo()
+        info.setAddresses([QHostAddress(self.target)])
+        self.Host_Found(info)
+
+    def Host_Found(self, info):
+        """Opens the socket and sends the first request.
+
+        Args:
+            info (:obj:`QHostInfo`): Addresses of the target.
+        """
+
+        if self.finished:
+            return
+        addresses = info.addresses()
+        if info.error() != QHostInfo.NoError or addresses == []:
+            self.Write("ping: %s: %s" % (self.target, info.errorString()))
+            self.Finish(2)
+            return
+        # IPv4 first, like ping
+        addresses.sort(key=lambda address: address.protocol()
+                       != QAbstractSocket.IPv4Protocol)
+        self.address = addresses[0].toString()
+        if addresses[0].protocol() == QAbstractSocket.IPv4Protocol:
+            family, header = socket.AF_INET, 28
+        else:
+            family, header = socket.AF_INET6, 48
+        try:
+            self.socket = Get_Socket(family, self.ttl)
+        except OSError as error:
+            self.Write("ping: socket: %s" % error.strerror)
+            self.Finish(2)
+            return
+        self.Write("PING %s (%s) %d(%d) bytes of data." % (
+            self.target, self.address, self.size, self.size + header))
+        self.start_time = time.monotonic()
+        self.Send_Next()
+
+    def Send_Next(self):
+        """Sends the next request and schedules the one after.
+        """
+
+        if self.finished or (self.count is not None
+                             and self.sent >= self.count):
+            return
+        self.sent += 1
+        try:
+            self.waiting[self.sent] = self.socket.Send(
+                self, self.sent, self.address, self.payload, self.timeout)
+        except OSError as error:
+            self.Write("ping: sendmsg: %s" % error.strerror)
+        self.last_send = time.monotonic()
+        if self.count is None or self.sent < self.count:
+            self.send_timer.start(int(self.interval * 1000))
+        self.Check_Done()
+
+    def Reply_Received(self, ping_seq, rtt, length, ttl, source):
+        """Prints a reply.
+
+        Args:
+            ping_seq (:obj:`int`): Sequence number of the request.
+            rtt (:obj:`float`): Round-trip time in milliseconds.
+            length (:obj:`int`): Size of the reply in bytes.
+            ttl (:obj:`int`): Time to live of the reply, ``None`` if
+                unknown.
+            source (:obj:`str`): Address of the reply.
+        """
+
+        self.waiting.pop(ping_seq, None)
+        self.received += 1
+        self.rtt.Add(rtt)
+        self.Write("%d bytes from %s: icmp_seq=%d%s time=%s ms" % (
+            length, source, ping_seq, "" if ttl is None else " ttl=%d" % ttl,
+            Format_Time(rtt)))
+        if self.adaptive and self.send_timer.isActive():
+            wait = ADAPTIVE_INTERVAL - (time.monotonic() - self.last_send)
+            self.send_timer.start(max(0, int(wait * 1000)))
+        self.Check_Done()
+
+    def Reply_Lost(self, ping_seq):
+        """Forgets a request without reply.
+
+        Args:
+            ping_seq (:obj:`int`): Sequence number of the request.
+        """
+
+        self.waiting.pop(ping_seq, None)
+        self.Check_Done()
+
+    def Check_Done(self):
+        """Finishes once every request was sent and answered or lost.
+        """
+
+        if (self.count is not None and self.sent >= self.count
+                and self.waiting == {}):
+            self.Finish()
+
+    def Stop(self):
+        """Stops sending and prints the statistics, like ``Ctrl+C``.
+        """
+
+        if self.finished:
+            return
+        for seq in self.waiting.values():
+            self.socket.Forget(seq)
+        self.waiting.clear()
+        self.Finish()
+
+    def Finish(self, exit_code=None):
+        """Prints the statistics and emits :attr:`ping_finished`.
+
+        Args:
+            exit_code (:obj:`int`): Exit code, ``None`` to print the
+                statistics and exit with ``0`` or ``1``.
+        """
+
+        if self.finished:
+            return
+        self.finished = True
+        self.send_timer.stop()
+        if exit_code is None and self.address is None:
+            exit_code = 1
+        if exit_code is None:
+            loss = 0 if self.sent == 0 else (
+                100.0 * (self.sent - self.received) / self.sent)
+            elapsed = (self.last_send or self.start_time) - self.start_time
+            self.Write("")
+            self.Write("--- %s ping statistics ---" % self.target)
+            self.Write("%d packets transmitted, %d received, %g%% packet "
+                       "loss, time %dms" % (self.sent, self.received, loss,
+                                            elapsed * 1000))
+            if self.rtt.count > 0:
+                self.Write("rtt min/avg/max/mdev = %.3f/%.3f/%.3f/%.3f ms" % (
+                    self.rtt.minimum, self.rtt.mean, self.rtt.maximum,
+                    self.rtt.Get_Mdev()))
+            exit_code = 0 if self.received > 0 else 1
+        self.ping_finished.emit(exit_code)
+
+    def Write(self, line):
+        """Emits a line of output.
+
+        Args:
+            line (:obj:`str`): Line, without new line.
+        """
+
+        self.output_ready.emit(line)
+
+
+def Main(argv):
+    """Pings a target from a terminal.
+
+    Args:
+        argv (:obj:`list` of ``str``): Arguments, see
+            :func:`Parse_Arguments`.
+
+    Returns:
+        :obj:`int`: Exit code of the ping.
+    """
+
+    try:
+        target, options = Parse_Arguments(argv)
+    except ValueError as error:
+        sys.stderr.write(str(error) + "\n")
+        return 2
+    app = QCoreApplication([sys.argv[0]])
+    ping = ICMP_Ping(target, **options)
+    ping.output_ready.connect(print)
+    ping.ping_finished.connect(app.exit)
+    signal.signal(signal.SIGINT, lambda signum, frame: ping.Stop())
+    # Python signal handlers only run between two Qt events
+    wake_timer = QTimer()
+    wake_timer.timeout.connect(lambda: None)
+    wake_timer.start(200)
+    # An address starts at once and may fail before the loop runs
+    QTimer.singleShot(0, ping.Start)
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(Main(sys.argv[1:]))
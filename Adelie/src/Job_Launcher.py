@@ -0,0 +1,334 @@
+"""
+    This module measures the resources used by each command of a job.
+
+    ``QProcess`` waits for its process itself, the resource usage of the
+    command is lost. Each command is therefore started through this module
+    run as a small launcher: it spawns the command with the same standard
+    input, output and error, waits for it and writes a JSON report:
+
+    * ``wall``: seconds between the start and the exit of the command.
+    * ``user`` and ``sys``: CPU seconds, from ``wait4``.
+    * ``max_rss_kb``: peak resident memory in KiB. Linux counts the
+      memory of the launcher the command was forked from in the
+      ``ru_maxrss`` of ``wait4``, and a zombie has no ``VmHWM`` left in
+      ``/proc/<pid>/status``. The launcher therefore reads the ``VmHWM`` of
+      the command every :data:`SAMPLE_INTERVAL` while it runs, and only
+      keeps ``ru_maxrss`` when it is above the memory of the launcher.
+      ``0`` when the command exited before it could be read.
+    * ``rchar`` and ``wchar``: bytes read and written by the command,
+      ``read_bytes`` and ``write_bytes``: bytes read from and written to
+      storage. They come from ``/proc/<pid>/io``, read after the command
+      exited but before it is reaped (``waitid`` with ``WNOWAIT``).
+
+    The launcher exits like the command, with its exit code or killed by
+    the same signal. If the launcher is killed the command is killed too.
+
+    Run as ``python Job_Launcher.py --report PATH -- COMMAND ARGS``, or as
+    ``Adelie --adelie-launch --report PATH -- COMMAND ARGS`` in frozen
+    builds. :func:`Get_Command` returns the right command line.
+
+    Attributes:
+        SAMPLE_INTERVAL (float): Seconds between two reads of the peak
+            resident memory of the command.
+        RESOURCES (list): Keys of a report that are summed for a job, see
+            :func:`Sum_Reports`.
+"""
+
+import json
+import os
+import select
+import signal
+import subprocess
+import sys
+import time
+
+
+SAMPLE_INTERVAL = 0.01
+RESOURCES = ["wall", "user", "sys", "rchar", "wchar",
+             "read_bytes", "write_bytes"]
+
+
+def Get_Command(program, arguments, report):
+    """Returns the command line that runs a command through the launcher.
+
+    Args:
+        program (:obj:`str`): Program of the command.
+        arguments (:obj:`list` of ``str``): Arguments of the command.
+        report (:obj:`str`): Path of the JSON report.
+
+    Returns:
+        :obj:`tuple`: Program and list of arguments for ``QProcess``.
+    """
+
+    if getattr(sys, "frozen", False):
+        launcher = ["--adelie-launch"]
+    else:
+        # -S skips the site module, the launcher only needs the stdlib
+        launcher = ["-S", os.path.abspath(__file__)]
+    return (sys.executable,
+            launcher + ["--report", report, "--", program] + list(arguments))
+
+
+def Kill_With_Parent():
+    """Kills the command if the launcher dies, Linux only.
+
+    Runs in the child between ``fork`` and ``exec``.
+    """
+
+    try:
+        import ctypes
+        # PR_SET_PDEATHSIG
+        ctypes.CDLL(None).prctl(1, signal.SIGKILL)
+    except (ImportError, OSError, AttributeError):
+        pass
+
+
+def Read_Proc_IO(pid):
+    """Reads the I/O counters of a process.
+
+    Args:
+        pid (:obj:`int`): Process id, the process may be a zombie.
+
+    Returns:
+        :obj:`dict`: ``rchar``, ``wchar``, ``read_bytes`` and
+        ``write_bytes``, empty if ``/proc/<pid>/io`` can not be read.
+    """
+
+    counters = {}
+    try:
+        with open("/proc/%d/io" % pid) as io_file:
+            for line in io_file:
+                name, _, value = line.partition(":")
+                if name in RESOURCES:
+                    counters[name] = int(value)
+    except (OSError, ValueError):
+        return {}
+    return counters
+
+
+def Read_Peak_RSS(pid="self"):
+    """Returns the peak resident memory of a process.
+
+    Args:
+        pid (:obj:`int`): Process id, the launcher itself by default.
+
+    Returns:
+        :obj:`int`: ``VmHWM`` in KiB, ``0`` if it can not be read, for
+        example once the process exited.
+    """
+
+    try:
+        with open("/proc/%s/status" % pid) as status_file:
+            for line in status_file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def Wait_Exit(pid):
+    """Waits for a command to exit, without reaping it, and reads its peak
+    resident memory meanwhile.
+
+    A ``pidfd`` wakes the launcher as soon as the command exits, without
+    it the launcher polls every :data:`SAMPLE_INTERVAL`.
+
+    Args:
+        pid (:obj:`int`): Process id of the command.
+
+    Returns:
+        :obj:`int`: Largest ``VmHWM`` read, in KiB.
+    """
+
+    peak = 0
+    try:
+        pidfd = os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        pidfd = None
+    try:
+        while True:
+            peak = max(peak, Read_Peak_RSS(pid))
+            if pidfd is not None:
+                ready, _, _ = select.select([pidfd], [], [], SAMPLE_INTERVAL)
+                if ready == []:
+                    continue
+            try:
+                exited = os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT
+                                   | os.WNOHANG)
+            except InterruptedError:
+                continue
+            if exited is not None:
+                return peak
+            if pidfd is None:
+                time.sleep(SAMPLE_INTERVAL)
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
+
+
+def Main(argv):
+    """Runs a command and writes its report.
+
+    Args:
+        argv (:obj:`list` of ``str``): ``--report PATH -- COMMAND ARGS``.
+
+    Returns:
+        :obj:`int`: Exit code of the command, ``127`` if it was not found,
+        ``126`` if it could not be executed.
+    """
+
+    report = argv[1]
+    command = argv[3:]
+    start = time.monotonic()
+    try:
+        child = subprocess.Popen(command, preexec_fn=Kill_With_Parent)
+    except FileNotFoundError:
+        sys.stderr.write(command[0] + ": command not found\n")
+        return 127
+    except OSError as error:
+        sys.stderr.write(command[0] + ": " + error.strerror + "\n")
+        return 126
+    launcher_rss = Read_Peak_RSS()
+    # Only the command keeps the pipes open, the stage after sees the end
+    # of the stream and the stage before a broken pipe as soon as it exits
+    null = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(null, fd)
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signum,
+                      lambda signum, frame: child.send_signal(signum))
+
+    counters = {}
+    peak = 0
+    if hasattr(os, "waitid"):
+        peak = Wait_Exit(child.pid)
+        counters = Read_Proc_IO(child.pid)
+    _, status, usage = os.wait4(child.pid, 0)
+    # Below the launcher, ru_maxrss is the launcher and not the command
+    if usage.ru_maxrss > launcher_rss:
+        peak = max(peak, usage.ru_maxrss)
+    counters.update({
+            "wall": time.monotonic() - start,
+            "user": usage.ru_utime,
+            "sys": usage.ru_stime,
+            "max_rss_kb": peak,
+            "exit_code": os.WEXITSTATUS(status),
+            "signal": os.WTERMSIG(status) if os.WIFSIGNALED(status) else 0
+            })
+    try:
+        with open(report, "w") as report_file:
+            json.dump(counters, report_file)
+    except OSError:
+        pass
+
+    if counters["signal"]:
+        signal.signal(counters["signal"], signal.SIG_DFL)
+        os.kill(os.getpid(), counters["signal"])
+    return counters["exit_code"]
+
+
+def Read_Report(path):
+    """Reads and deletes a report.
+
+    Args:
+        path (:obj:`str`): Path of the report.
+
+    Returns:
+        :obj:`dict`: The report, ``None`` if the launcher did not write it.
+    """
+
+    try:
+        with open(path) as report_file:
+            report = json.load(report_file)
+        os.unlink(path)
+    except (OSError, ValueError):
+        return None
+    return report
+
+
+def Sum_Reports(reports):
+    """Adds up the reports of the commands of a job.
+
+    Args:
+        reports (:obj:`list` of ``dict``): Report of each command, ``None``
+            for a command without report.
+
+    Returns:
+        :obj:`dict`: Sum of the :data:`RESOURCES`, the largest
+        ``max_rss_kb`` and ``wall``, the time of the longest command. Empty
+        if no command has a report.
+    """
+
+    reports = [report for report in reports if report is not None]
+    if reports == []:
+        return {}
+    total = {}
+    for name in RESOURCES:
+        values = [report[name] for report in reports if name in report]
+        if values != []:
+            total[name] = sum(values)
+    total["wall"] = max(report["wall"] for report in reports)
+    total["max_rss_kb"] = max(report.get("max_rss_kb", 0)
+                               for report in reports)
+    return total
+
+
+def Format_Bytes(count):
+    """Formats a number of bytes.
+
+    Args:
+        count (:obj:`int`): Number of bytes.
+
+    Returns:
+        :obj:`str`: ``"512 B"``, ``"1.5 KiB"``, ``"3.2 MiB"``...
+    """
+
+    if count < 1024:
+        return "%d B" % count
+    for unit in ("KiB", "MiB", "GiB"):
+        count /= 1024
+        if count < 1024 or unit == "GiB":
+            return "%.1f %s" % (count, unit)
+
+
+def Format_RSS(resources):
+    """Formats the peak resident memory of a job.
+
+    Args:
+        resources (:obj:`dict`): See :func:`Sum_Reports`.
+
+    Returns:
+        :obj:`str`: For example ``"3.1 MiB"``, ``"n/a"`` when the
+        commands exited too fast to be measured.
+    """
+
+    if resources["max_rss_kb"] == 0:
+        return "n/a"
+    return Format_Bytes(resources["max_rss_kb"] * 1024)
+
+
+def Format_Resources(resources):
+    """Formats the resources used by a job.
+
+    Args:
+        resources (:obj:`dict`): See :func:`Sum_Reports`.
+
+    Returns:
+        :obj:`str`: For example ``"1.02 s, user 0.50 s, sys 0.01 s,
+        max RSS 3.1 MiB, read 1.2 KiB, written 0 B"``.
+    """
+
+    if not resources:
+        return ""
+    text = "%.2f s, user %.2f s, sys %.2f s, max RSS %s" % (
+        resources["wall"], resources["user"], resources["sys"],
+        Format_RSS(resources))
+    if "rchar" in resources:
+        text += ", read %s, written %s" % (
+            Format_Bytes(resources["rchar"]), Format_Bytes(resources["wchar"]))
+    return text
+
+
+if __name__ == "__main__":
+    sys.exit(Main(sys.argv[1:]))
@@ -0,0 +1,561 @@
+"""
+    This module runs the commands of every page as jobs.
+
+    A job is a command line started by a page, for example a GNU command
+    with its pipes or a ping. The :class:`Job_Manager` runs up to
+    :attr:`Job_Manager.limit` jobs at the same time, the other jobs wait in
+    a queue. Each job gets its own id, :class:`GNU_Pipeline.GNU_Pipeline`
+    and spool file, the pages print the output of their jobs and the
+    :mod:`Job_Table` lists every job and can kill them.
+
+    Every command of a job is started through :mod:`Job_Launcher`, which
+    measures its wall time, CPU time, peak memory and I/O. The sum is kept
+    in :attr:`Job.resources` and can be exported with
+    :meth:`Job_Manager.Export_Resources`. Every job is also recorded in the
+    :mod:`History_Store` with its exit code and duration.
+
+    A job submitted with ``cache=True`` whose commands only read files is
+    looked up in the :mod:`Result_Cache`, a cached result is replayed at
+    once instead of running the commands again.
+
+    The module only uses ``QtCore``, it does not need a display.
+
+    Example:
+        The pages share the manager returned by :func:`Get_Manager`::
+
+            manager = Job_Manager.Get_Manager()
+            manager.output_ready.connect(self.Job_Output)
+            job_id = manager.Submit("gnu", "sort data | uniq -c",
+                                    [("sort", ["data"]), ("uniq", ["-c"])])
+
+    Attributes:
+        QUEUED (str): State of a job waiting for a free slot.
+        RUNNING (str): State of a running job.
+        FINISHED (str): State of a job that exited.
+        KILLED (str): State of a job killed by the user.
+"""
+
+import csv
+import os
+import time
+from PyQt5.QtCore import pyqtSignal, QByteArray, QObject, QTimer
+from GNU_Pipeline import GNU_Pipeline
+from Output_Spool import Output_Spool, SPOOL_DIR
+from Stream_Decoder import Stream_Decoder
+import Data
+import History_Store
+import Job_Launcher
+import Result_Cache
+
+
+QUEUED = "Queued"
+RUNNING = "Running"
+FINISHED = "Finished"
+KILLED = "Killed"
+
+_manager = None
+
+
+def Get_Manager():
+    """Returns the job manager shared by the pages, creates it on first use.
+
+    Returns:
+        :class:`Job_Manager`: The job manager.
+    """
+
+    global _manager
+    if _manager is None:
+        _manager = Job_Manager()
+    return _manager
+
+
+class Job():
+    """A command line run by the :class:`Job_Manager`.
+
+    Args:
+        job_id (:obj:`int`): Id of the job.
+        page (:obj:`str`): Name of the page that submitted the job.
+        command (:obj:`str`): Command line, as displayed to the user.
+        stages (:obj:`list` of ``tuple``): Program and arguments of each
+            command of the pipeline.
+
+    Attributes:
+        job_id (:obj:`int`): See Args.
+        page (:obj:`str`): See Args.
+        command (:obj:`str`): See Args.
+        stages (:obj:`list` of ``tuple``): See Args.
+        state (:obj:`str`): :data:`QUEUED`, :data:`RUNNING`,
+            :data:`FINISHED` or :data:`KILLED`.
+        exit_code (:obj:`int`): Exit code of the pipeline, ``None`` until
+            the job exits.
+        exit_codes (:obj:`list` of ``int``): Exit code of each stage.
+        submit_time (:obj:`float`): Time the job was submitted.
+        start_time (:obj:`float`): Time the job started, ``None`` while
+            queued.
+        end_time (:obj:`float`): Time the job exited, ``None`` before.
+        pipeline (:obj:`GNU_Pipeline`): Processes of the job, ``None``
+            while queued.
+        spool (:obj:`Output_Spool`): Full output of the job.
+        reports (:obj:`list` of ``str``): Path of the
+            :mod:`Job_Launcher` report of each stage.
+        resources (:obj:`dict`): Resources used by the job, see
+            :func:`Job_Launcher.Sum_Reports`, empty until the job exits.
+        history_id (:obj:`int`): Id of the job in the
+            :class:`History_Store.History_Store`, ``None`` if it is not
+            recorded.
+        use_cache (:obj:`bool`): ``True`` if the result of the job may be
+            replayed from or kept in the :class:`Result_Cache.Result_Cache`.
+        cache_key (:obj:`tuple`): Key of the job in the
+            :class:`Result_Cache.Result_Cache`, set when the job starts,
+            ``None`` if its result is not cached.
+        chunks (:obj:`list` of ``tuple``): Output read while the job runs,
+            kept for the :class:`Result_Cache.Result_Cache`.
+        chunks_size (:obj:`int`): Size of the :attr:`chunks` in bytes.
+        cached (:obj:`bool`): ``True`` if the output was replayed from the
+            :class:`Result_Cache.Result_Cache`.
+        timeout (:obj:`float`): Seconds the job may run before it is
+            killed, ``None`` for no limit.
+        timed_out (:obj:`bool`): ``True`` if the job was killed because it
+            ran longer than :attr:`timeout`.
+    """
+
+    def __init__(self, job_id, page, command, stages):
+        self.job_id = job_id
+        self.page = page
+        self.command = command
+        self.stages = stages
+        self.state = QUEUED
+        self.exit_code = None
+        self.exit_codes = []
+        self.submit_time = time.time()
+        self.start_time = None
+        self.end_time = None
+        self.pipeline = None
+        self.spool = Output_Spool("job-%d" % job_id, keep=1)
+        self.reports = []
+        self.resources = {}
+        self.history_id = None
+        self.use_cache = False
+        self.cache_key = None
+        self.chunks = []
+        self.chunks_size = 0
+        self.cached = False
+        self.timeout = None
+        self.timed_out = False
+
+    def Get_Duration(self):
+        """Returns how long the job ran.
+
+        Returns:
+            :obj:`float`: Seconds since the job started, until it exited if
+            it did, ``None`` while queued.
+        """
+
+        if self.start_time is None:
+            return None
+        end = self.end_time if self.end_time is not None else time.time()
+        return end - self.start_time
+
+    def Get_Summary(self):
+        """Returns the command with its exit code and the resources it used.
+
+        Returns:
+            :obj:`str`: For example ``"sort data -> exit 0, 0.02 s, user
+            0.01 s, sys 0.00 s, max RSS 3.1 MiB, read 1.2 KiB, written
+            0 B"``.
+        """
+
+        text = "%s -> %s" % (self.command, self.state.lower())
+        if self.exit_code is not None:
+            text = "%s -> exit %d" % (self.command, self.exit_code)
+        if self.resources:
+            text += ", " + Job_Launcher.Format_Resources(self.resources)
+        if self.cached:
+            text += ", cached"
+        if self.timed_out:
+            text += ", timed out"
+        return text
+
+
+class Job_Manager(QObject):
+    """Runs jobs concurrently, up to a limit.
+
+    Args:
+        limit (:obj:`int`): Maximum number of running jobs. Defaults to
+            :attr:`Data.Job_Limit`.
+        history (:obj:`int`): Number of exited jobs kept. Defaults to
+            :attr:`Data.Job_History`.
+        parent (:obj:`QObject`): Parent object.
+        store (:obj:`History_Store`): Store the jobs are recorded in.
+            Defaults to the store returned by
+            :func:`History_Store.Get_Store`.
+        cache (:obj:`Result_Cache`): Cache of the results of the jobs.
+            Defaults to the cache returned by
+            :func:`Result_Cache.Get_Cache`.
+
+    Attributes:
+        job_added (:obj:`pyqtSignal(int)`): Emitted with the id of a new
+            job.
+        job_changed (:obj:`pyqtSignal(int)`): Emitted when a job starts,
+            exits or is removed.
+        job_finished (:obj:`pyqtSignal(int)`): Emitted when a job exits.
+        output_ready (:obj:`pyqtSignal(int, str, QByteArray)`): Emitted with
+            the job id and the decoded and raw standard output of the job.
+        error_ready (:obj:`pyqtSignal(int, str, QByteArray)`): Emitted with
+            the job id and the decoded and raw standard error of a stage.
+        limit (:obj:`int`): See Args.
+        history (:obj:`int`): See Args.
+        jobs (:obj:`dict`): Contains the job id and the :class:`Job`, in
+            submission order.
+        queue (:obj:`list` of ``int``): Ids of the queued jobs.
+        running (:obj:`set` of ``int``): Ids of the running jobs.
+        next_id (:obj:`int`): Id of the next job.
+        store (:obj:`History_Store`): See Args.
+        cache (:obj:`Result_Cache`): See Args.
+    """
+
+    job_added = pyqtSignal(int)
+    job_changed = pyqtSignal(int)
+    job_finished = pyqtSignal(int)
+    output_ready = pyqtSignal(int, str, QByteArray)
+    error_ready = pyqtSignal(int, str, QByteArray)
+
+    def __init__(self, limit=None, history=None, parent=None, store=None,
+                 cache=None):
+        super(Job_Manager, self).__init__(parent)
+        self.limit = limit if limit is not None else Data.Job_Limit
+        self.history = history if history is not None else Data.Job_History
+        self.jobs = {}
+        self.queue = []
+        self.running = set()
+        self.next_id = 1
+        self.store = store if store is not None else History_Store.Get_Store()
+        self.cache = cache if cache is not None else Result_Cache.Get_Cache()
+
+    def Submit(self, page, command, stages, cache=False, timeout=None):
+        """Adds a job, it starts at once if a slot is free.
+
+        Args:
+            page (:obj:`str`): Name of the page that submits the job.
+            command (:obj:`str`): Command line, as displayed to the user.
+            stages (:obj:`list` of ``tuple``): Program and list of
+                arguments of each command of the pipeline.
+            cache (:obj:`bool`): ``True`` to replay the cached result of
+                the job, or cache it, if its commands only read files. See
+                :mod:`Result_Cache`.
+            timeout (:obj:`float`): Seconds the job may run before it is
+                killed, ``None`` for no limit. The time in the queue is not
+                counted.
+
+        Returns:
+            :obj:`int`: Id of the job.
+        """
+
+        job = Job(self.next_id, page, command, stages)
+        job.use_cache = cache
+        job.timeout = timeout
+        self.next_id += 1
+        self.jobs[job.job_id] = job
+        job.history_id = self.store.Add(page, command, stages)
+        self.queue.append(job.job_id)
+        self.job_added.emit(job.job_id)
+        self.Start_Next()
+        return job.job_id
+
+    def Replay_Job(self, job, result):
+        """Finishes a job with a cached result, without running it.
+
+        Args:
+            job (:class:`Job`): Job leaving the queue.
+            result (:class:`Result_Cache.Result`): Cached result of the job.
+        """
+
+        job_id = job.job_id
+        job.state = FINISHED
+        job.cached = True
+        job.start_time = time.time()
+        job.spool.Start(job.command)
+        output_decoder = Stream_Decoder()
+        error_decoder = Stream_Decoder()
+        for error, data in result.chunks:
+            job.spool.Write_Bytes(data)
+            if error:
+                self.error_ready.emit(job_id, error_decoder.Decode(data),
+                                      QByteArray(data))
+            else:
+                self.output_ready.emit(job_id, output_decoder.Decode(data),
+                                       QByteArray(data))
+        text = error_decoder.Flush()
+        if text != "":
+            self.error_ready.emit(job_id, text, QByteArray())
+        text = output_decoder.Flush()
+        if text != "":
+            self.output_ready.emit(job_id, text, QByteArray())
+        job.exit_code = result.exit_code
+        job.exit_codes = list(result.exit_codes)
+        job.end_time = time.time()
+        self.store.Finish(job.history_id, job.exit_code, job.Get_Duration())
+        job.spool.Close()
+        self.job_changed.emit(job_id)
+        self.job_finished.emit(job_id)
+        self.Remove_Old_Jobs()
+
+    def Set_Limit(self, limit):
+        """Changes the number of jobs run at the same time.
+
+        Args:
+            limit (:obj:`int`): Maximum number of running jobs, the running
+                jobs above it are not stopped.
+        """
+
+        self.limit = max(1, limit)
+        self.Start_Next()
+
+    def Start_Next(self):
+        """Starts queued jobs while slots are free.
+        """
+
+        while self.queue != [] and len(self.running) < self.limit:
+            self.Start_Job(self.jobs[self.queue.pop(0)])
+
+    def Start_Job(self, job):
+        """Starts the pipeline of a job, or replays its cached result.
+
+        The result is looked up when the job leaves the queue, a job queued
+        behind the same command replays its result.
+
+        Args:
+            job (:class:`Job`): Queued job.
+        """
+
+        if job.use_cache:
+            job.cache_key = Result_Cache.Make_Key(job.stages)
+            result = self.cache.Get(job.cache_key)
+            if result is not None:
+                self.Replay_Job(job, result)
+                return
+        job_id = job.job_id
+        job.state = RUNNING
+        job.start_time = time.time()
+        job.pipeline = GNU_Pipeline(self)
+        job.pipeline.output_ready.connect(
+            lambda text, data: self.Job_Output(job_id, text, data))
+        job.pipeline.error_ready.connect(
+            lambda stage, text, data: self.Job_Error(job_id, text, data))
+        job.pipeline.finished.connect(
+            lambda code, codes: self.Job_Done(job_id, code, codes))
+        job.spool.Start(job.command)
+        self.running.add(job_id)
+        self.job_changed.emit(job_id)
+        if job.timeout is not None:
+            QTimer.singleShot(int(job.timeout * 1000),
+                              lambda: self.Time_Out(job_id))
+        job.pipeline.Start(self.Get_Launch_Stages(job))
+
+    def Time_Out(self, job_id):
+        """Kills a job that ran longer than its timeout.
+
+        Args:
+            job_id (:obj:`int`): Id of the job, it may have exited since.
+        """
+
+        job = self.jobs.get(job_id)
+        if job is None or job.state != RUNNING:
+            return
+        job.timed_out = True
+        self.Kill(job_id)
+
+    def Get_Launch_Stages(self, job):
+        """Returns the stages of a job run through :mod:`Job_Launcher`.
+
+        Args:
+            job (:class:`Job`): Job about to start, its :attr:`Job.reports`
+                are set.
+
+        Returns:
+            :obj:`list` of ``tuple``: Program and list of arguments of each
+            stage. The stages are returned unchanged if the reports can not
+            be written.
+        """
+
+        try:
+            os.makedirs(SPOOL_DIR, mode=0o700, exist_ok=True)
+        except OSError:
+            job.reports = []
+            return job.stages
+        job.reports = [os.path.join(SPOOL_DIR, "job-%d-%d-%d.json"
+                                    % (os.getpid(), job.job_id, index))
+                       for index in range(len(job.stages))]
+        return [Job_Launcher.Get_Command(program, arguments, report)
+                for (program, arguments), report
+                in zip(job.stages, job.reports)]
+
+    def Job_Output(self, job_id, text, data):
+        """Spools and forwards the standard output of a job.
+
+        Args:
+            job_id (:obj:`int`): Id of the job.
+            text (:obj:`str`): Decoded output.
+            data (:obj:`QByteArray`): Raw output.
+        """
+
+        self.jobs[job_id].spool.Write_Bytes(data)
+        self.Keep_Chunk(self.jobs[job_id], False, data)
+        self.output_ready.emit(job_id, text, data)
+
+    def Job_Error(self, job_id, text, data):
+        """Spools and forwards the standard error of a job.
+
+        Args:
+            job_id (:obj:`int`): Id of the job.
+            text (:obj:`str`): Decoded error output.
+            data (:obj:`QByteArray`): Raw error output.
+        """
+
+        self.jobs[job_id].spool.Write_Bytes(data)
+        self.Keep_Chunk(self.jobs[job_id], True, data)
+        self.error_ready.emit(job_id, text, data)
+
+    def Keep_Chunk(self, job, error, data):
+        """Keeps the output of a job whose result will be cached.
+
+        The result is not cached once the output exceeds the size of the
+        cache.
+
+        Args:
+            job (:class:`Job`): Running job.
+            error (:obj:`bool`): ``True`` for the standard error.
+            data (:obj:`QByteArray`): Raw output.
+        """
+
+        if job.cache_key is None or data.isEmpty():
+            return
+        job.chunks.append((error, bytes(data)))
+        job.chunks_size += data.size()
+        if job.chunks_size > self.cache.limit:
+            job.cache_key = None
+            job.chunks = []
+
+    def Job_Done(self, job_id, exit_code, exit_codes):
+        """Records the exit of a job and starts the next queued job.
+
+        Args:
+            job_id (:obj:`int`): Id of the job.
+            exit_code (:obj:`int`): Exit code of the pipeline.
+            exit_codes (:obj:`list` of ``int``): Exit code of each stage.
+        """
+
+        job = self.jobs[job_id]
+        if job.state != KILLED:
+            job.state = FINISHED
+        job.exit_code = exit_code
+        job.exit_codes = exit_codes
+        job.end_time = time.time()
+        job.resources = Job_Launcher.Sum_Reports(
+            [Job_Launcher.Read_Report(report) for report in job.reports])
+        self.store.Finish(job.history_id, exit_code, job.Get_Duration())
+        # A result is only cached if the files did not change while the job
+        # ran and no command crashed or was killed
+        if (job.cache_key is not None and job.state == FINISHED
+                and max(exit_codes, default=0) < 126
+                and Result_Cache.Make_Key(job.stages) == job.cache_key):
+            self.cache.Put(job.cache_key, Result_Cache.Result(
+                exit_code, exit_codes, job.chunks))
+        job.chunks = []
+        job.spool.Close()
+        job.pipeline.deleteLater()
+        job.pipeline = None
+        self.running.discard(job_id)
+        self.job_changed.emit(job_id)
+        self.job_finished.emit(job_id)
+        self.Remove_Old_Jobs()
+        self.Start_Next()
+
+    def Kill(self, job_id):
+        """Kills a running job or removes a queued job from the queue.
+
+        Args:
+            job_id (:obj:`int`): Id of the job.
+        """
+
+        job = self.jobs.get(job_id)
+        if job is None or job.state not in (QUEUED, RUNNING):
+            return
+        if job.state == QUEUED:
+            self.queue.remove(job_id)
+            job.state = KILLED
+            job.end_time = time.time()
+            self.job_changed.emit(job_id)
+            self.job_finished.emit(job_id)
+            self.Remove_Old_Jobs()
+            return
+        job.state = KILLED
+        job.pipeline.Kill()
+
+    def Kill_Page(self, page):
+        """Kills every running or queued job of a page.
+
+        Args:
+            page (:obj:`str`): Name of the page.
+        """
+
+        for job in list(self.jobs.values()):
+            if job.page == page:
+                self.Kill(job.job_id)
+
+    def Get_Jobs(self, page=None, states=None):
+        """Returns the jobs, oldest first.
+
+        Args:
+            page (:obj:`str`): Only the jobs of this page, ``None`` for
+                every page.
+            states (:obj:`tuple` of ``str``): Only the jobs in these states,
+                ``None`` for every state.
+
+        Returns:
+            :obj:`list` of :class:`Job`: Jobs.
+        """
+
+        return [job for job in self.jobs.values()
+                if (page is None or job.page == page)
+                and (states is None or job.state in states)]
+
+    def Export_Resources(self, path):
+        """Writes the resources used by the exited jobs to a CSV file.
+
+        Args:
+            path (:obj:`str`): Path of the CSV file.
+
+        Raises:
+            OSError: The file can not be written.
+        """
+
+        fields = (["job_id", "page", "command", "exit_code", "start_time"]
+                  + Job_Launcher.RESOURCES
+                  + ["max_rss_kb"])
+        with open(path, "w", newline="") as csv_file:
+            writer = csv.DictWriter(csv_file, fields, extrasaction="ignore")
+            writer.writeheader()
+            for job in self.Get_Jobs(states=(FINISHED, KILLED)):
+                if not job.resources:
+                    continue
+                row = dict(job.resources, job_id=job.job_id, page=job.page,
+                           command=job.command, exit_code=job.exit_code,
+                           start_time=time.strftime(
+                               "%Y-%m-%d %H:%M:%S",
+                               time.localtime(job.start_time)))
+                writer.writerow(row)
+
+    def Remove_Old_Jobs(self):
+        """Forgets the oldest exited jobs beyond :attr:`history`.
+
+        Their spool files are deleted.
+        """
+
+        # A killed job is only done once its processes exited
+        done = [job for job in self.Get_Jobs(states=(FINISHED, KILLED))
+                if job.end_time is not None]
+        for job in done[:max(0, len(done) - self.history)]:
+            job.spool.Remove_All()
+            del self.jobs[job.job_id]
+            self.job_changed.emit(job.job_id)
@@ -0,0 +1,212 @@
+"""
+    This module lists the jobs of the :class:`Job_Manager.Job_Manager`.
+
+    :class:`Job_Table` shows the state, exit code, duration and resources
+    of every job and can kill the selected jobs, open their full output with
+    :class:`Output_Pager.Output_Pager`, export the resources used by the
+    jobs and change the number of jobs run at the same time. It is opened
+    from the ``Jobs`` menu of the main window.
+"""
+
+from PyQt5 import QtCore, QtWidgets
+from PyQt5.QtCore import Qt
+from Output_Pager import Output_Pager
+import Job_Launcher
+
+
+class Job_Table(QtWidgets.QDialog):
+    """Table of the running, queued and finished jobs.
+
+    Args:
+        manager (:obj:`Job_Manager`): Manager whose jobs are listed.
+        parent (:obj:`QWidget`): Parent widget.
+
+    Attributes:
+        manager (:obj:`Job_Manager`): See Args.
+        columns (:obj:`list` of ``str``): Headers of the table columns.
+        rows (:obj:`dict`): Contains the job id and the item of its first
+            column, the item knows its row.
+        timer (:obj:`QTimer`): Updates the duration of the running jobs
+            while the table is shown.
+    """
+
+    columns = ["Id", "Page", "Command", "State", "Exit Code", "Duration",
+               "CPU", "Max RSS", "Read", "Written"]
+
+    def __init__(self, manager, parent=None):
+        super(Job_Table, self).__init__(parent)
+        self.manager = manager
+        self.rows = {}
+        self.setWindowTitle("Jobs")
+        self.resize(960, 420)
+
+        self.table = QtWidgets.QTableWidget(0, len(self.columns), self)
+        self.table.setHorizontalHeaderLabels(self.columns)
+        self.table.horizontalHeader().setSectionResizeMode(
+            2, QtWidgets.QHeaderView.Stretch)
+        self.table.verticalHeader().hide()
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.table.doubleClicked.connect(self.Open_Output)
+        self.kill_button = QtWidgets.QPushButton("Kill", self)
+        self.kill_button.clicked.connect(self.Kill_Selected)
+        self.output_button = QtWidgets.QPushButton("Open Output", self)
+        self.output_button.clicked.connect(self.Open_Output)
+        self.export_button = QtWidgets.QPushButton("Export", self)
+        self.export_button.setToolTip("Save the resources used by the jobs "
+                                      "as CSV")
+        self.export_button.clicked.connect(self.Export_Resources)
+        self.limit_box = QtWidgets.QSpinBox(self)
+        self.limit_box.setRange(1, 64)
+        self.limit_box.setPrefix("Run at once: ")
+        self.limit_box.setValue(self.manager.limit)
+        self.limit_box.valueChanged.connect(self.manager.Set_Limit)
+
+        controls = QtWidgets.QHBoxLayout()
+        controls.addWidget(self.limit_box)
+        controls.addStretch()
+        controls.addWidget(self.export_button)
+        controls.addWidget(self.output_button)
+        controls.addWidget(self.kill_button)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.table)
+        layout.addLayout(controls)
+
+        for job in self.manager.Get_Jobs():
+            self.Update_Job(job.job_id)
+        self.manager.job_added.connect(self.Update_Job)
+        self.manager.job_changed.connect(self.Update_Job)
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.Update_Durations)
+
+    def Update_Job(self, job_id):
+        """Adds, updates or removes the row of a job.
+
+        Args:
+            job_id (:obj:`int`): Id of the job.
+        """
+
+        job = self.manager.jobs.get(job_id)
+        if job is None:
+            if job_id in self.rows:
+                self.table.removeRow(self.rows.pop(job_id).row())
+            return
+        if job_id not in self.rows:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+            self.rows[job_id] = QtWidgets.QTableWidgetItem()
+            self.rows[job_id].setData(Qt.DisplayRole, job_id)
+            self.table.setItem(row, 0, self.rows[job_id])
+            self.table.setItem(row, 1, QtWidgets.QTableWidgetItem(job.page))
+            self.table.setItem(row, 2,
+                               QtWidgets.QTableWidgetItem(job.command))
+        row = self.rows[job_id].row()
+        exit_code = "" if job.exit_code is None else str(job.exit_code)
+        state = job.state + " (cached)" if job.cached else job.state
+        self.table.setItem(row, 3, QtWidgets.QTableWidgetItem(state))
+        self.table.setItem(row, 4, QtWidgets.QTableWidgetItem(exit_code))
+        self.Update_Duration(job)
+        self.Update_Resources(job)
+
+    def Update_Resources(self, job):
+        """Displays the resources used by a job once it exited.
+
+        Args:
+            job (:class:`Job_Manager.Job`): Job.
+        """
+
+        resources = job.resources
+        texts = ["", "", "", ""]
+        if resources:
+            texts[0] = "%.2f s" % (resources["user"] + resources["sys"])
+            texts[1] = Job_Launcher.Format_RSS(resources)
+            if "rchar" in resources:
+                texts[2] = Job_Launcher.Format_Bytes(resources["rchar"])
+                texts[3] = Job_Launcher.Format_Bytes(resources["wchar"])
+        row = self.rows[job.job_id].row()
+        for column, text in enumerate(texts, 6):
+            self.table.setItem(row, column, QtWidgets.QTableWidgetItem(text))
+
+    def Update_Duration(self, job):
+        """Displays the duration of a job.
+
+        Args:
+            job (:class:`Job_Manager.Job`): Job.
+        """
+
+        duration = job.Get_Duration()
+        text = "" if duration is None else "%.1f s" % duration
+        self.table.setItem(self.rows[job.job_id].row(), 5,
+                           QtWidgets.QTableWidgetItem(text))
+
+    def Update_Durations(self):
+        """Displays the duration of the running jobs.
+        """
+
+        for job_id in self.manager.running:
+            if job_id in self.rows:
+                self.Update_Duration(self.manager.jobs[job_id])
+
+    def Get_Selected_Jobs(self):
+        """Returns the ids of the selected jobs.
+
+        Returns:
+            :obj:`list` of ``int``: Job ids.
+        """
+
+        rows = {index.row() for index in self.table.selectedIndexes()}
+        return [int(self.table.item(row, 0).data(Qt.DisplayRole))
+                for row in sorted(rows)]
+
+    def Kill_Selected(self):
+        """Kills the selected jobs.
+        """
+
+        for job_id in self.Get_Selected_Jobs():
+            self.manager.Kill(job_id)
+
+    def Open_Output(self):
+        """Opens the full output of the selected jobs.
+        """
+
+        for job_id in self.Get_Selected_Jobs():
+            job = self.manager.jobs.get(job_id)
+            if job is None or job.spool.path is None:
+                continue
+            job.spool.Flush()
+            Output_Pager(job.spool.path, job.command, self).show()
+
+    def Export_Resources(self):
+        """Asks for a file and saves the resources used by the jobs in it.
+        """
+
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Export Resources", "jobs.csv", "CSV Files (*.csv)")
+        if path == "":
+            return
+        try:
+            self.manager.Export_Resources(path)
+        except OSError as error:
+            QtWidgets.QMessageBox.warning(self, "Export Resources",
+                                          str(error))
+
+    def showEvent(self, event):
+        """Starts updating the durations when the table is shown.
+
+        Args:
+            event (:obj:`QShowEvent`): Show event.
+        """
+
+        super(Job_Table, self).showEvent(event)
+        self.timer.start()
+
+    def hideEvent(self, event):
+        """Stops updating the durations when the table is hidden.
+
+        Args:
+            event (:obj:`QHideEvent`): Hide event.
+        """
+
+        self.timer.stop()
+        super(Job_Table, self).hideEvent(event)
@@ -0,0 +1,252 @@
+"""
+    This module buffers the output printed on a terminal widget.
+
+    Appending every chunk read from a process to a ``QPlainTextEdit`` lays
+    the document out once per chunk, a command that prints fast (``cat`` on
+    a large file, ``yes | head``) then freezes the user interface. The
+    chunks are instead accumulated and inserted together at most once per
+    frame, with a single cursor edit.
+
+    A flush is bounded in lines and characters so it always fits in a
+    frame, output arriving faster than that is dropped and a notice is
+    printed in its place. Dropped output is still written to the spool
+    file, see :mod:`Output_Spool`. The number of chunks coalesced and of
+    characters dropped is shown as the tooltip of the terminal.
+"""
+
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtGui import QTextCursor
+
+
+class Output_Buffer(QObject):
+    """Coalesces the output written to a terminal and flushes it on a timer.
+
+    Each :meth:`Write` is printed as its own paragraph, like
+    ``QPlainTextEdit.appendPlainText``. :meth:`Write_Stream` prints the
+    output of a process exactly as it was read, new lines and partial lines
+    included.
+
+    Args:
+        terminal (:obj:`QPlainTextEdit`): Terminal the output is printed on.
+        interval (:obj:`int`): Milliseconds between two flushes.
+        max_pending (:obj:`int`): Maximum number of characters waiting to be
+            flushed, the oldest output is dropped beyond it.
+        max_lines (:obj:`int`): Maximum number of lines waiting to be
+            flushed, the oldest output is dropped beyond it.
+        spool (:class:`Output_Spool.Output_Spool`): Spool the full output is
+            written to, ``None`` if it is not kept.
+        parent (:obj:`QObject`): Parent object.
+
+    Attributes:
+        terminal (:obj:`QPlainTextEdit`): See Args.
+        max_pending (:obj:`int`): See Args.
+        max_lines (:obj:`int`): See Args.
+        spool (:class:`Output_Spool.Output_Spool`): See Args.
+        chunks (:obj:`list` of ``str``): Chunks waiting to be flushed.
+        pending (:obj:`int`): Number of characters in :attr:`chunks`.
+        pending_lines (:obj:`int`): Number of lines in :attr:`chunks`.
+        timer (:obj:`QTimer`): Flush timer, it only runs while chunks are
+            waiting.
+        writes (:obj:`int`): Number of chunks written.
+        flushes (:obj:`int`): Number of bulk inserts in the terminal.
+        coalesced (:obj:`int`): Number of chunks inserted together with an
+            earlier chunk instead of on their own.
+        dropped (:obj:`int`): Number of characters dropped because the
+            terminal could not keep up.
+        unreported (:obj:`int`): Characters dropped since the last flush,
+            a notice is printed in their place.
+        line_open (:obj:`bool`): ``True`` if the last queued text did not
+            end with a new line.
+        paragraph (:obj:`bool`): ``True`` if the last queued text was a
+            paragraph, the output that follows starts on a new line.
+    """
+
+    def __init__(self, terminal, interval=33, max_pending=1 << 20,
+                 max_lines=10000, spool=None, parent=None):
+        super(Output_Buffer, self).__init__(parent)
+        self.terminal = terminal
+        self.spool = spool
+        self.max_pending = max_pending
+        self.max_lines = max_lines
+        self.chunks = []
+        self.pending = 0
+        self.pending_lines = 0
+        self.writes = 0
+        self.flushes = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.unreported = 0
+        self.line_open = False
+        self.paragraph = False
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.Flush)
+
+    def Write(self, text):
+        """Queues text to be printed on the terminal.
+
+        Args:
+            text (:obj:`str`): Text printed as a new paragraph.
+        """
+
+        if self.spool is not None:
+            self.spool.Write(text)
+        if self.line_open:
+            text = "\n" + text
+        self.line_open = True
+        self.paragraph = True
+        self.Queue(text)
+
+    def Write_Stream(self, text, data=None):
+        """Queues process output to be printed on the terminal as it is.
+
+        Args:
+            text (:obj:`str`): Decoded output, see :mod:`Stream_Decoder`.
+            data (:obj:`QByteArray`): Raw output written to the spool,
+                ``None`` to write ``text``.
+        """
+
+        if self.spool is not None:
+            if data is not None:
+                self.spool.Write_Bytes(data)
+            else:
+                self.spool.Write_Bytes(text.encode("utf8", "surrogateescape"))
+        if text == "":
+            return
+        if self.paragraph:
+            text = "\n" + text
+        self.line_open = text[-1] != "\n"
+        self.paragraph = False
+        self.Queue(text)
+
+    def Queue(self, text):
+        """Adds text to the chunks waiting to be flushed.
+
+        Args:
+            text (:obj:`str`): Text inserted as it is.
+        """
+
+        self.chunks.append(text)
+        self.pending += len(text)
+        self.pending_lines += text.count("\n") + 1
+        self.writes += 1
+        # Keep the newest output, the oldest is scrolled away anyway
+        while ((self.pending > self.max_pending
+                or self.pending_lines > self.max_lines)
+               and len(self.chunks) > 1):
+            chunk = self.chunks.pop(0)
+            self.pending -= len(chunk)
+            self.pending_lines -= chunk.count("\n") + 1
+            self.Drop(len(chunk))
+        if (self.pending > self.max_pending
+                or self.pending_lines > self.max_lines):
+            self.Trim_Chunk()
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def Trim_Chunk(self):
+        """Keeps the last lines of the only queued chunk within the limits.
+        """
+
+        chunk = self.chunks[0]
+        lines = chunk.rsplit("\n", self.max_lines - 1)
+        if len(lines) == self.max_lines:
+            kept = len(chunk) - len(lines[0]) - 1
+        else:
+            kept = len(chunk)
+        kept = min(kept, self.max_pending)
+        self.Drop(len(chunk) - kept)
+        self.chunks[0] = chunk[len(chunk) - kept:]
+        self.pending = kept
+        self.pending_lines = self.chunks[0].count("\n") + 1
+
+    def Drop(self, count):
+        """Counts characters dropped before they were printed.
+
+        Args:
+            count (:obj:`int`): Number of characters dropped.
+        """
+
+        self.dropped += count
+        self.unreported += count
+
+    def Flush(self):
+        """Inserts the queued chunks in the terminal with one cursor edit.
+
+        The terminal keeps following the output only if it was scrolled to
+        the bottom. Once the output stops, the counters of the buffer are
+        shown as the tooltip of the terminal, see :meth:`Format_Stats`.
+        """
+
+        if self.chunks == []:
+            self.timer.stop()
+            self.terminal.setToolTip(self.Format_Stats())
+            return
+        document = self.terminal.document()
+        if self.unreported:
+            notice = "[Adelie: %d characters dropped]" % self.unreported
+            if self.spool is not None and self.spool.path is not None:
+                notice = notice[:-1] + ", right click Open Full Output]"
+            # The notice is a line of its own
+            if document.lastBlock().length() > 1:
+                notice = "\n" + notice
+            if not self.chunks[0].startswith("\n"):
+                notice = notice + "\n"
+            self.chunks.insert(0, notice)
+            self.unreported = 0
+        text = "".join(self.chunks)
+        self.coalesced += len(self.chunks) - 1
+        self.flushes += 1
+        self.chunks = []
+        self.pending = 0
+        self.pending_lines = 0
+
+        scrollbar = self.terminal.verticalScrollBar()
+        at_bottom = scrollbar.value() == scrollbar.maximum()
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        cursor.insertText(text)
+        cursor.endEditBlock()
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def Clear(self):
+        """Clears the terminal and discards the queued chunks.
+        """
+
+        self.chunks = []
+        self.pending = 0
+        self.pending_lines = 0
+        self.unreported = 0
+        self.line_open = False
+        self.paragraph = False
+        self.timer.stop()
+        self.terminal.clear()
+
+    def Get_Stats(self):
+        """Returns the buffer counters.
+
+        Returns:
+            :obj:`dict`: ``writes``, ``flushes``, ``coalesced`` and
+            ``dropped`` counts.
+        """
+
+        return {
+                "writes": self.writes,
+                "flushes": self.flushes,
+                "coalesced": self.coalesced,
+                "dropped": self.dropped
+                }
+
+    def Format_Stats(self):
+        """Formats the buffer counters.
+
+        Returns:
+            :obj:`str`: Chunks written, bulk inserts, chunks coalesced and
+            characters dropped.
+        """
+
+        return ("%(writes)d chunks printed in %(flushes)d inserts, "
+                "%(coalesced)d coalesced, %(dropped)d characters dropped"
+                % self.Get_Stats())
@@ -0,0 +1,151 @@
+"""
+    This module displays the full output of a command kept in a spool file.
+
+    The terminals only keep their last lines, right clicking a terminal
+    offers ``Open Full Output`` which opens :class:`Output_Pager` on the
+    spool file of the last command, see :func:`Add_Pager_Action`. The pager
+    reads one page at a time from a memory map, the size of the output does
+    not matter.
+"""
+
+from PyQt5 import QtWidgets
+from PyQt5.QtCore import Qt
+from Output_Spool import Spool_Reader
+
+
+def Add_Pager_Action(terminal, spool):
+    """Adds ``Open Full Output`` to the context menu of a terminal.
+
+    Args:
+        terminal (:obj:`QPlainTextEdit`): Output terminal.
+        spool (:class:`Output_Spool.Output_Spool`): Spool of the terminal's
+            output.
+    """
+
+    terminal.setContextMenuPolicy(Qt.CustomContextMenu)
+    terminal.customContextMenuRequested.connect(
+        lambda position: Show_Context_Menu(terminal, spool, position))
+
+
+def Show_Context_Menu(terminal, spool, position):
+    """Shows the standard context menu of a terminal and the pager action.
+
+    Args:
+        terminal (:obj:`QPlainTextEdit`): Output terminal.
+        spool (:class:`Output_Spool.Output_Spool`): Spool of the terminal's
+            output.
+        position (:obj:`QPoint`): Position of the click in the terminal.
+    """
+
+    menu = terminal.createStandardContextMenu()
+    menu.addSeparator()
+    action = menu.addAction("Open Full Output")
+    action.setEnabled(spool.path is not None)
+    if menu.exec_(terminal.mapToGlobal(position)) is action:
+        spool.Flush()
+        pager = Output_Pager(spool.path, spool.command, terminal.window())
+        pager.show()
+    menu.deleteLater()
+
+
+class Output_Pager(QtWidgets.QDialog):
+    """Pages through a spool file.
+
+    The scroll bar moves through the whole file, the text view holds
+    :attr:`page_lines` lines starting at the scroll bar position.
+
+    Args:
+        path (:obj:`str`): Spool file path.
+        command (:obj:`str`): Command whose output is displayed.
+        parent (:obj:`QWidget`): Parent widget.
+
+    Attributes:
+        reader (:class:`Output_Spool.Spool_Reader`): Reader of the file.
+        unit (:obj:`int`): Bytes per scroll bar step, large files do not fit
+            in the scroll bar range otherwise.
+        page_lines (:obj:`int`): Number of lines displayed at once.
+    """
+
+    page_lines = 500
+
+    def __init__(self, path, command, parent=None):
+        super(Output_Pager, self).__init__(parent)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.setWindowTitle("Output of " + command)
+        self.resize(800, 600)
+        self.reader = Spool_Reader(path)
+        self.unit = max(1, self.reader.size // 1000000)
+
+        self.text = QtWidgets.QPlainTextEdit(self)
+        self.text.setReadOnly(True)
+        self.text.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+        self.scrollbar = QtWidgets.QScrollBar(Qt.Vertical, self)
+        self.scrollbar.setRange(0, self.reader.size // self.unit)
+        self.scrollbar.setPageStep(max(1, self.scrollbar.maximum() // 100))
+        self.scrollbar.valueChanged.connect(
+            lambda value: self.Show_Offset(value * self.unit))
+        self.line_box = QtWidgets.QSpinBox(self)
+        self.line_box.setRange(1, 2 ** 31 - 1)
+        self.line_box.setPrefix("Line ")
+        self.go_button = QtWidgets.QPushButton("Go", self)
+        self.go_button.clicked.connect(self.Go_To_Line)
+        self.size_label = QtWidgets.QLabel(
+            "%.1f MiB" % (self.reader.size / (1 << 20)), self)
+
+        view = QtWidgets.QHBoxLayout()
+        view.addWidget(self.text)
+        view.addWidget(self.scrollbar)
+        controls = QtWidgets.QHBoxLayout()
+        controls.addWidget(self.size_label)
+        controls.addStretch()
+        controls.addWidget(self.line_box)
+        controls.addWidget(self.go_button)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addLayout(view)
+        layout.addLayout(controls)
+        self.Show_Offset(0)
+
+    def Show_Offset(self, offset):
+        """Displays the page that starts at the line containing a byte.
+
+        The end of the file always displays a full page.
+
+        Args:
+            offset (:obj:`int`): Offset of the byte in the file.
+        """
+
+        start = self.reader.Line_Start(offset)
+        text, end = self.reader.Read_Lines(start, self.page_lines)
+        if end >= self.reader.size and start > 0:
+            start = min(start, self.reader.Tail_Offset(self.page_lines))
+            text, _ = self.reader.Read_Lines(start, self.page_lines)
+        self.text.setPlainText(text)
+
+    def Go_To_Line(self):
+        """Displays the page that starts at the line in ``line_box``.
+
+        The lines of the file are counted the first time.
+        """
+
+        QtWidgets.QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            count = self.reader.Line_Count()
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+        line = min(self.line_box.value(), max(count, 1))
+        self.line_box.setValue(line)
+        offset = self.reader.Line_Offset(line - 1)
+        self.scrollbar.blockSignals(True)
+        self.scrollbar.setValue(offset // self.unit)
+        self.scrollbar.blockSignals(False)
+        self.Show_Offset(offset)
+
+    def closeEvent(self, event):
+        """Unmaps the file when the pager is closed.
+
+        Args:
+            event (:obj:`QCloseEvent`): Close event.
+        """
+
+        self.reader.Close()
+        super(Output_Pager, self).closeEvent(event)
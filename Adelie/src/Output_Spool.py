@@ -0,0 +1,329 @@
+"""
+    This module keeps the full output of the commands on disk.
+
+    The terminal widgets only keep the last :attr:`Data.Scrollback_Lines`
+    lines, every line printed is also written to a per-command temporary
+    file by :class:`Output_Spool`. :class:`Spool_Reader` maps that file in
+    memory so the :mod:`Output_Pager` can display any part of gigabytes of
+    output without loading it.
+
+    Attributes:
+        SPOOL_DIR (str): Directory of the spool files, private to the user.
+"""
+
+import atexit
+import bisect
+import mmap
+import os
+import tempfile
+import weakref
+import Data
+
+
+SPOOL_DIR = os.path.join(tempfile.gettempdir(),
+                         "adelie-%d" % os.getuid())
+_spools = weakref.WeakSet()
+
+
+def Remove_Spools():
+    """Deletes the files of every spool still alive, when Adelie exits.
+
+    A spool dropped before, like the spool of a job removed from the
+    :mod:`Job_Manager`, is not kept alive until then.
+    """
+
+    for spool in list(_spools):
+        spool.Remove_All()
+
+
+atexit.register(Remove_Spools)
+
+
+class Output_Spool():
+    """Writes the output of each command to its own temporary file.
+
+    Args:
+        name (:obj:`str`): Name of the terminal, used in the files names.
+        keep (:obj:`int`): Number of spool files kept, the oldest files are
+            deleted. Defaults to :attr:`Data.Spool_Files`.
+
+    Attributes:
+        name (:obj:`str`): See Args.
+        keep (:obj:`int`): See Args.
+        files (:obj:`list` of ``str``): Spool files, oldest first.
+        spool_file (:obj:`file`): File of the current command, ``None``
+            before the first command.
+        path (:obj:`str`): Path of the current spool file.
+        command (:obj:`str`): Current command.
+        line_open (:obj:`bool`): ``True`` if the raw output written last did
+            not end with a new line.
+
+    Note:
+        The spool files are deleted when Adelie exits.
+    """
+
+    def __init__(self, name, keep=None):
+        self.name = name
+        self.keep = keep if keep is not None else Data.Spool_Files
+        self.files = []
+        self.spool_file = None
+        self.path = None
+        self.command = ""
+        self.line_open = False
+        _spools.add(self)
+
+    def Start(self, command):
+        """Starts the spool file of a new command.
+
+        If the file can not be created the output is only shown on the
+        terminal.
+
+        Args:
+            command (:obj:`str`): Command whose output is spooled.
+        """
+
+        self.Close()
+        self.command = command
+        self.line_open = False
+        try:
+            os.makedirs(SPOOL_DIR, mode=0o700, exist_ok=True)
+            fd, self.path = tempfile.mkstemp(dir=SPOOL_DIR, suffix=".log",
+                                             prefix=self.name + "-")
+        except OSError:
+            self.path = None
+            return
+        self.spool_file = os.fdopen(fd, "wb")
+        self.files.append(self.path)
+        while len(self.files) > self.keep:
+            self.Remove(self.files.pop(0))
+
+    def Write(self, text):
+        """Writes a paragraph of output to the current spool file.
+
+        Args:
+            text (:obj:`str`): Output printed on the terminal.
+        """
+
+        if self.spool_file is None:
+            return
+        try:
+            if self.line_open:
+                self.spool_file.write(b"\n")
+                self.line_open = False
+            self.spool_file.write(text.encode("utf8", "surrogateescape"))
+            self.spool_file.write(b"\n")
+        except OSError:
+            # Full disk, stop spooling this command
+            self.Close()
+
+    def Write_Bytes(self, data):
+        """Writes raw output to the current spool file, exactly as read.
+
+        Args:
+            data (:obj:`QByteArray`): Output read from the process, any
+                object supporting the buffer protocol.
+        """
+
+        if self.spool_file is None:
+            return
+        data = memoryview(data)
+        if len(data) == 0:
+            return
+        try:
+            self.spool_file.write(data)
+        except OSError:
+            self.Close()
+            return
+        self.line_open = data[-1:] != b"\n"
+
+    def Flush(self):
+        """Flushes the current spool file so it can be read.
+        """
+
+        if self.spool_file is not None:
+            self.spool_file.flush()
+
+    def Close(self):
+        """Closes the current spool file, the file is kept.
+        """
+
+        if self.spool_file is not None:
+            try:
+                self.spool_file.close()
+            except OSError:
+                pass
+            self.spool_file = None
+
+    def Remove(self, path):
+        """Deletes a spool file.
+
+        Args:
+            path (:obj:`str`): Spool file path.
+        """
+
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def Remove_All(self):
+        """Deletes every spool file.
+        """
+
+        self.Close()
+        for path in self.files:
+            self.Remove(path)
+        self.files = []
+        self.path = None
+
+
+class Spool_Reader():
+    """Reads a spool file through a memory map.
+
+    The lines are found using a sparse index, the number of lines in each
+    block of :attr:`block_size` bytes. The index is built the first time a
+    line number is needed.
+
+    Args:
+        path (:obj:`str`): Spool file path.
+
+    Attributes:
+        path (:obj:`str`): See Args.
+        size (:obj:`int`): File size in bytes.
+        mm (:obj:`mmap.mmap`): Memory map of the file, ``None`` if the file
+            is empty.
+        block_size (:obj:`int`): Size of the index blocks in bytes.
+        block_lines (:obj:`list` of ``int``): Number of lines before each
+            block, ``None`` until the index is built.
+    """
+
+    block_size = 1 << 20
+
+    def __init__(self, path):
+        self.path = path
+        self.block_lines = None
+        with open(path, "rb") as spool_file:
+            self.size = os.fstat(spool_file.fileno()).st_size
+            self.mm = None
+            if self.size > 0:
+                self.mm = mmap.mmap(spool_file.fileno(), 0,
+                                    access=mmap.ACCESS_READ)
+
+    def Close(self):
+        """Unmaps the file.
+        """
+
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+
+    def Build_Index(self):
+        """Counts the lines of each block of the file.
+        """
+
+        if self.block_lines is not None:
+            return
+        self.block_lines = [0]
+        total = 0
+        for start in range(0, self.size, self.block_size):
+            total += self.mm[start:start + self.block_size].count(b"\n")
+            self.block_lines.append(total)
+
+    def Line_Count(self):
+        """Returns the number of lines in the file.
+
+        Returns:
+            :obj:`int`: Number of lines.
+        """
+
+        if self.mm is None:
+            return 0
+        self.Build_Index()
+        count = self.block_lines[-1]
+        # Output that does not end with a new line
+        if self.mm[self.size - 1:self.size] != b"\n":
+            count += 1
+        return count
+
+    def Line_Offset(self, line):
+        """Returns the offset of a line.
+
+        Args:
+            line (:obj:`int`): Line number, starting at ``0``.
+
+        Returns:
+            :obj:`int`: Offset of the first byte of the line.
+        """
+
+        if self.mm is None or line <= 0:
+            return 0
+        self.Build_Index()
+        if line > self.block_lines[-1]:
+            return self.size
+        # Block that contains the new line ending the previous line
+        block = bisect.bisect_left(self.block_lines, line) - 1
+        start = block * self.block_size
+        skip = line - self.block_lines[block]
+        data = self.mm[start:start + self.block_size]
+        rest = data.split(b"\n", skip)[-1]
+        return start + len(data) - len(rest)
+
+    def Line_Start(self, offset):
+        """Returns the offset of the line that contains a byte.
+
+        Args:
+            offset (:obj:`int`): Offset of the byte.
+
+        Returns:
+            :obj:`int`: Offset of the first byte of the line.
+        """
+
+        if self.mm is None or offset <= 0:
+            return 0
+        return self.mm.rfind(b"\n", 0, min(offset, self.size)) + 1
+
+    def Tail_Offset(self, count):
+        """Returns the offset of the last lines of the file.
+
+        Args:
+            count (:obj:`int`): Number of lines.
+
+        Returns:
+            :obj:`int`: Offset of the first of the last ``count`` lines.
+        """
+
+        if self.mm is None:
+            return 0
+        end = self.size
+        # The new line ending the last line does not start a line
+        if self.mm[end - 1:end] == b"\n":
+            end -= 1
+        for _ in range(count):
+            end = self.mm.rfind(b"\n", 0, end)
+            if end == -1:
+                return 0
+        return end + 1
+
+    def Read_Lines(self, offset, count):
+        """Returns lines starting at an offset.
+
+        Args:
+            offset (:obj:`int`): Offset of the first line.
+            count (:obj:`int`): Maximum number of lines.
+
+        Returns:
+            :obj:`tuple`: The text of the lines and the offset that follows
+            them.
+        """
+
+        if self.mm is None:
+            return "", 0
+        end = offset
+        for _ in range(count):
+            end = self.mm.find(b"\n", end, self.size)
+            if end == -1:
+                end = self.size
+                break
+            end += 1
+        text = self.mm[offset:end].decode("utf8", "replace")
+        return text.rstrip("\n"), end
@@ -0,0 +1,539 @@
+"""
+    This module computes the statistics of a ping while it runs.
+
+    ``ping`` only prints its min/avg/max/mdev once it exits, an endless ping
+    never does. :class:`Ping_Stats` parses the output of ``ping`` line by
+    line as it is read and keeps:
+
+    * the last replies in a :class:`Sample_Buffer`, preallocated arrays
+      used as a ring buffer,
+    * the minimum, average, maximum and mean deviation of the round-trip
+      times, updated for each reply with Welford's algorithm,
+    * the jitter, the mean difference between consecutive round-trip
+      times smoothed as in RFC 3550,
+    * the packets sent and received and the loss,
+    * a :class:`RTT_Histogram` of logarithmic buckets for the approximate
+      50th, 95th and 99th percentiles,
+    * every round-trip time in a :class:`RTT_Series`, with the minimum and
+      maximum of each block of times for the :mod:`RTT_Chart`.
+
+    Each reply takes the same time however long the ping runs, only the
+    series grows, by about 5 bytes per reply.
+
+    Example:
+        The ping page feeds the complete lines of each ping::
+
+            stats = Ping_Stats()
+            stats.Feed("64 bytes from 1.1.1.1: icmp_seq=1 ttl=57 "
+                       "time=10.3 ms\\n")
+            print(stats.Format())
+
+    Attributes:
+        REPLY (Pattern): Matches the replies, ``icmp_seq``, ``ttl`` and
+            ``time`` groups.
+        NO_REPLY (Pattern): Matches the lines of the lost requests, errors
+            and ``no answer yet`` (``ping -O``).
+        SUMMARY (Pattern): Matches the summary printed when ``ping`` exits.
+        SEQUENCES (int): Number of ICMP sequence numbers, they wrap around.
+        HISTOGRAM_LOWEST (float): Lowest round-trip time of the histogram,
+            in milliseconds.
+        BUCKETS_PER_DECADE (int): Buckets of the histogram between a
+            round-trip time and ten times it, the percentiles are within
+            about 6% of their exact value.
+        HISTOGRAM_DECADES (int): Decades covered by the histogram, from
+            :attr:`HISTOGRAM_LOWEST` to 100 s.
+        SERIES_BLOCK (int): Number of entries of a level of a
+            :class:`RTT_Series` summarized by one entry of the next level.
+"""
+
+import array
+import math
+import re
+import Data
+
+
+REPLY = re.compile(r"\b(?:icmp_)?seq=(?P<seq>\d+)"
+                   r"(?:.*?\bttl=(?P<ttl>\d+))?"
+                   r".*?\btime[=<](?P<time>\d+(?:\.\d+)?) ?(?P<unit>[mu]?s)")
+NO_REPLY = re.compile(r"\b(?:icmp_)?seq=(?P<seq>\d+)")
+SUMMARY = re.compile(r"(?P<sent>\d+) packets transmitted, "
+                     r"(?P<received>\d+) (?:packets )?received")
+SEQUENCES = 65536
+HISTOGRAM_LOWEST = 0.001
+BUCKETS_PER_DECADE = 20
+HISTOGRAM_DECADES = 8
+SERIES_BLOCK = 8
+
+UNITS = {"ms": 1.0, "us": 0.001, "s": 1000.0}
+
+
+class Sample_Buffer():
+    """Last replies of a ping, in arrays allocated once.
+
+    Once full, each new reply replaces the oldest.
+
+    Args:
+        capacity (:obj:`int`): Number of replies kept. Defaults to
+            :attr:`Data.Ping_Samples`.
+
+    Attributes:
+        capacity (:obj:`int`): See Args.
+        seqs (:obj:`array`): Sequence number of each reply.
+        ttls (:obj:`array`): Time to live of each reply, ``-1`` if unknown.
+        rtts (:obj:`array`): Round-trip time of each reply, in
+            milliseconds.
+        start (:obj:`int`): Index of the oldest reply.
+        count (:obj:`int`): Number of replies kept.
+    """
+
+    def __init__(self, capacity=None):
+        self.capacity = capacity if capacity is not None else Data.Ping_Samples
+        self.seqs = array.array("l", [0]) * self.capacity
+        self.ttls = array.array("i", [0]) * self.capacity
+        self.rtts = array.array("d", [0.0]) * self.capacity
+        self.start = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def Append(self, seq, ttl, rtt):
+        """Keeps a reply, drops the oldest once full.
+
+        Args:
+            seq (:obj:`int`): Sequence number.
+            ttl (:obj:`int`): Time to live, ``-1`` if unknown.
+            rtt (:obj:`float`): Round-trip time in milliseconds.
+        """
+
+        index = (self.start + self.count) % self.capacity
+        self.seqs[index] = seq
+        self.ttls[index] = ttl
+        self.rtts[index] = rtt
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def Get_Samples(self, count=None):
+        """Returns the last replies, oldest first.
+
+        Args:
+            count (:obj:`int`): Number of replies, ``None`` for all of them.
+
+        Returns:
+            :obj:`list` of ``tuple``: Sequence number, time to live and
+            round-trip time of each reply.
+        """
+
+        if count is None or count > self.count:
+            count = self.count
+        first = self.start + self.count - count
+        return [(self.seqs[index % self.capacity],
+                 self.ttls[index % self.capacity],
+                 self.rtts[index % self.capacity])
+                for index in range(first, first + count)]
+
+    def Clear(self):
+        """Forgets every reply.
+        """
+
+        self.start = 0
+        self.count = 0
+
+
+class RTT_Series():
+    """Every round-trip time of a ping and their minimum and maximum by
+    block.
+
+    Level ``0`` holds the minimum and maximum of each block of
+    :attr:`SERIES_BLOCK` times, level ``1`` of each block of level ``0``
+    entries and so on. A level entry is added once its block is complete,
+    adding a time costs a constant time on average however many times the
+    series holds.
+
+    :meth:`Get_Columns` reads the coarsest level that still has an entry
+    per column, drawing costs about :attr:`SERIES_BLOCK` entries per column
+    whatever the length of the ping.
+
+    Attributes:
+        values (:obj:`array`): Every round-trip time in milliseconds,
+            single precision.
+        levels (:obj:`list` of ``tuple``): Arrays of the minimums and
+            maximums of each level.
+    """
+
+    def __init__(self):
+        self.values = array.array("f")
+        self.levels = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def Append(self, rtt):
+        """Adds a round-trip time and completes the blocks it ends.
+
+        Args:
+            rtt (:obj:`float`): Round-trip time in milliseconds.
+        """
+
+        self.values.append(rtt)
+        minimums = maximums = self.values
+        count = len(self.values)
+        level = 0
+        while count % SERIES_BLOCK == 0:
+            if level == len(self.levels):
+                self.levels.append((array.array("f"), array.array("f")))
+            block_minimums, block_maximums = self.levels[level]
+            block_minimums.append(min(minimums[count - SERIES_BLOCK:count]))
+            block_maximums.append(max(maximums[count - SERIES_BLOCK:count]))
+            minimums, maximums = block_minimums, block_maximums
+            count = len(block_minimums)
+            level += 1
+
+    def Get_Columns(self, width):
+        """Returns the minimum and maximum round-trip time of each column of
+        a chart of the whole series.
+
+        Args:
+            width (:obj:`int`): Number of columns.
+
+        Returns:
+            :obj:`list` of ``tuple``: Minimum and maximum of each column,
+            fewer columns than ``width`` if the series holds fewer times.
+        """
+
+        total = len(self.values)
+        if total == 0 or width <= 0:
+            return []
+        width = min(width, total)
+        # Coarsest level with an entry per column, None for the times
+        level = None
+        for index, (minimums, _) in enumerate(self.levels):
+            if len(minimums) >= width:
+                level = index
+        columns = [None] * width
+        start = 0
+        # The blocks of the level, then the blocks of the finer levels and
+        # the times after its last complete block
+        while True:
+            if level is None:
+                minimums = maximums = self.values
+                size = 1
+            else:
+                minimums, maximums = self.levels[level]
+                size = SERIES_BLOCK ** (level + 1)
+            for index in range(start // size, len(minimums)):
+                column = index * size * width // total
+                if columns[column] is None:
+                    columns[column] = (minimums[index], maximums[index])
+                else:
+                    low, high = columns[column]
+                    columns[column] = (min(low, minimums[index]),
+                                       max(high, maximums[index]))
+            start = len(minimums) * size
+            if level is None:
+                break
+            level = level - 1 if level > 0 else None
+        # A column narrower than a block stays empty, it continues the last
+        for index in range(1, width):
+            if columns[index] is None:
+                columns[index] = columns[index - 1]
+        return columns
+
+
+class RTT_Histogram():
+    """Counts the round-trip times in logarithmic buckets.
+
+    Each bucket spans the same ratio between its bounds, the first and last
+    buckets hold the times below and above the covered range.
+
+    Attributes:
+        counts (:obj:`array`): Number of times in each bucket.
+        total (:obj:`int`): Number of times counted.
+    """
+
+    def __init__(self):
+        self.counts = array.array(
+            "L", [0]) * (BUCKETS_PER_DECADE * HISTOGRAM_DECADES + 2)
+        self.total = 0
+
+    def Add(self, rtt):
+        """Counts a round-trip time.
+
+        Args:
+            rtt (:obj:`float`): Round-trip time in milliseconds.
+        """
+
+        if rtt < HISTOGRAM_LOWEST:
+            index = 0
+        else:
+            index = min(int(math.log10(rtt / HISTOGRAM_LOWEST)
+                            * BUCKETS_PER_DECADE) + 1,
+                        len(self.counts) - 1)
+        self.counts[index] += 1
+        self.total += 1
+
+    def Get_Percentile(self, percent):
+        """Returns an approximate percentile.
+
+        Args:
+            percent (:obj:`float`): Percentile, between ``0`` and ``100``.
+
+        Returns:
+            :obj:`float`: Geometric middle of the bucket that holds the
+            percentile, in milliseconds. ``None`` if no time was counted.
+        """
+
+        if self.total == 0:
+            return None
+        rank = max(1, math.ceil(self.total * percent / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                break
+        if index == 0:
+            return HISTOGRAM_LOWEST
+        return HISTOGRAM_LOWEST * 10 ** ((index - 0.5) / BUCKETS_PER_DECADE)
+
+    def Clear(self):
+        """Forgets every time.
+        """
+
+        for index in range(len(self.counts)):
+            self.counts[index] = 0
+        self.total = 0
+
+
+class RTT_Stats():
+    """Running statistics of round-trip times.
+
+    Attributes:
+        count (:obj:`int`): Number of times added.
+        minimum (:obj:`float`): Shortest time, ``None`` until a time is
+            added.
+        maximum (:obj:`float`): Longest time, ``None`` until a time is
+            added.
+        mean (:obj:`float`): Average time.
+        squares (:obj:`float`): Sum of the squared differences to the
+            mean, see :meth:`Get_Mdev`.
+        jitter (:obj:`float`): Smoothed difference between consecutive
+            times.
+        last (:obj:`float`): Last time added.
+        histogram (:obj:`RTT_Histogram`): Times for the percentiles.
+    """
+
+    def __init__(self):
+        self.histogram = RTT_Histogram()
+        self.Clear()
+
+    def Clear(self):
+        """Forgets every time.
+        """
+
+        self.count = 0
+        self.minimum = None
+        self.maximum = None
+        self.mean = 0.0
+        self.squares = 0.0
+        self.jitter = 0.0
+        self.last = None
+        self.histogram.Clear()
+
+    def Add(self, rtt):
+        """Adds a round-trip time.
+
+        Args:
+            rtt (:obj:`float`): Round-trip time in milliseconds.
+        """
+
+        self.count += 1
+        if self.minimum is None or rtt < self.minimum:
+            self.minimum = rtt
+        if self.maximum is None or rtt > self.maximum:
+            self.maximum = rtt
+        # Welford's algorithm, the sums never grow with the count
+        delta = rtt - self.mean
+        self.mean += delta / self.count
+        self.squares += delta * (rtt - self.mean)
+        if self.last is not None:
+            self.jitter += (abs(rtt - self.last) - self.jitter) / 16
+        self.last = rtt
+        self.histogram.Add(rtt)
+
+    def Get_Mdev(self):
+        """Returns the mean deviation, the standard deviation printed by
+        ``ping`` as ``mdev``.
+
+        Returns:
+            :obj:`float`: Deviation in milliseconds, ``None`` until a time
+            is added.
+        """
+
+        if self.count == 0:
+            return None
+        return math.sqrt(self.squares / self.count)
+
+    def Get_Percentile(self, percent):
+        """Returns an approximate percentile, see
+        :meth:`RTT_Histogram.Get_Percentile`.
+
+        Args:
+            percent (:obj:`float`): Percentile, between ``0`` and ``100``.
+
+        Returns:
+            :obj:`float`: The percentile in milliseconds, within the
+            shortest and longest times. ``None`` until a time is added.
+        """
+
+        value = self.histogram.Get_Percentile(percent)
+        if value is None:
+            return None
+        return min(max(value, self.minimum), self.maximum)
+
+    def Format(self):
+        """Formats the statistics, one per line.
+
+        Returns:
+            :obj:`str`: Min, avg, max, mdev, jitter and percentiles.
+        """
+
+        values = [("Min", self.minimum), ("Avg", self.mean),
+                  ("Max", self.maximum), ("Mdev", self.Get_Mdev()),
+                  ("Jitter", self.jitter)]
+        values += [("p%d" % percent, self.Get_Percentile(percent))
+                   for percent in (50, 95, 99)]
+        if self.count == 0:
+            return "\n".join("%-8s%10s" % (name, "-") for name, _ in values)
+        return "\n".join("%-8s%7.3f ms" % (name, value)
+                         for name, value in values)
+
+
+class Ping_Stats():
+    """Parses the output of a ping and keeps its statistics.
+
+    The packets sent are counted from the sequence numbers of the replies
+    and of the lost requests that ``ping`` reports, a request still
+    waiting for its reply is only counted once a later one is seen. The
+    summary printed when ``ping`` exits replaces the counts.
+
+    Args:
+        capacity (:obj:`int`): Number of replies kept, see
+            :class:`Sample_Buffer`.
+
+    Attributes:
+        samples (:obj:`Sample_Buffer`): Last replies.
+        series (:obj:`RTT_Series`): Round-trip time of every reply.
+        rtt (:obj:`RTT_Stats`): Statistics of the round-trip times.
+        sent (:obj:`int`): Number of requests sent.
+        received (:obj:`int`): Number of replies, duplicates excluded.
+        duplicates (:obj:`int`): Number of duplicate replies.
+        last_seq (:obj:`int`): Highest sequence number seen, ``None``
+            before the first.
+    """
+
+    def __init__(self, capacity=None):
+        self.samples = Sample_Buffer(capacity)
+        self.series = RTT_Series()
+        self.rtt = RTT_Stats()
+        self.sent = 0
+        self.received = 0
+        self.duplicates = 0
+        self.last_seq = None
+
+    def Feed(self, text):
+        """Parses complete lines of output.
+
+        Args:
+            text (:obj:`str`): Lines read from ``ping``.
+
+        Returns:
+            :obj:`int`: Number of replies parsed.
+        """
+
+        replies = 0
+        for line in text.splitlines():
+            if self.Parse_Line(line):
+                replies += 1
+        return replies
+
+    def Parse_Line(self, line):
+        """Parses a line of output.
+
+        Args:
+            line (:obj:`str`): Line read from ``ping``.
+
+        Returns:
+            :obj:`bool`: ``True`` if the line is a reply.
+        """
+
+        if "seq=" not in line:
+            summary = SUMMARY.search(line)
+            if summary is not None:
+                self.sent = int(summary.group("sent"))
+                self.received = int(summary.group("received"))
+            return False
+        reply = REPLY.search(line)
+        if reply is None:
+            lost = NO_REPLY.search(line)
+            if lost is not None:
+                self.Count_Sequence(int(lost.group("seq")))
+            return False
+        seq = int(reply.group("seq"))
+        self.Count_Sequence(seq)
+        if "DUP!" in line:
+            self.duplicates += 1
+            return False
+        rtt = float(reply.group("time")) * UNITS[reply.group("unit")]
+        ttl = reply.group("ttl")
+        self.received += 1
+        self.rtt.Add(rtt)
+        self.samples.Append(seq, -1 if ttl is None else int(ttl), rtt)
+        self.series.Append(rtt)
+        return True
+
+    def Count_Sequence(self, seq):
+        """Counts the requests sent up to a sequence number.
+
+        Args:
+            seq (:obj:`int`): Sequence number of a reply or lost request.
+        """
+
+        if self.last_seq is None:
+            self.sent += 1
+            self.last_seq = seq
+            return
+        # Sequence numbers wrap around, an older one changes nothing
+        delta = (seq - self.last_seq) % SEQUENCES
+        if 0 < delta < SEQUENCES // 2:
+            self.sent += delta
+            self.last_seq = seq
+
+    def Get_Loss(self):
+        """Returns the share of requests without reply.
+
+        Returns:
+            :obj:`float`: Loss in percent, ``None`` before the first
+            request.
+        """
+
+        if self.sent == 0:
+            return None
+        return max(0.0, 100.0 * (self.sent - self.received) / self.sent)
+
+    def Format(self):
+        """Formats the counts and statistics, one per line.
+
+        Returns:
+            :obj:`str`: Text shown next to the ping terminal.
+        """
+
+        loss = self.Get_Loss()
+        lines = ["%-8s%10d" % ("Sent", self.sent),
+                 "%-8s%10d" % ("Received", self.received),
+                 "%-8s%10s" % ("Loss",
+                               "-" if loss is None else "%.1f %%" % loss)]
+        if self.duplicates:
+            lines.append("%-8s%10d" % ("Dups", self.duplicates))
+        return "\n".join(lines) + "\n" + self.rtt.Format()
@@ -0,0 +1,357 @@
+"""
+    This module pings many targets at once.
+
+    A sweep pings each target of a list a few times, up to
+    :attr:`Ping_Sweep.limit` targets at the same time, the others wait in
+    a queue. The targets are host names, addresses or CIDR ranges,
+    ``192.168.1.0/24`` is expanded to its 254 hosts. The output of each
+    ``ping`` is parsed by :class:`Ping_Stats.Ping_Stats` once it exits, the
+    sweep keeps the loss and round-trip statistics of every target. Given a
+    port, the sweep connects to it with :class:`TCP_Probe.TCP_Ping` instead
+    of starting ``ping``, for the networks that drop ICMP.
+
+    Each ``ping`` only waits one second for a reply and sends its requests
+    every 200 ms, the shortest interval allowed to users, a sweep of a
+    ``/24`` with 3 requests per target and 64 pings at once takes a few
+    seconds.
+
+    The module only uses ``QtCore``, it does not need a display.
+
+    Example:
+        The :mod:`Ping_Sweep_View` starts the sweeps of the ping page::
+
+            sweep = Ping_Sweep(Parse_Targets("10.0.0.0/24 example.com"))
+            sweep.target_changed.connect(self.Show_Target)
+            sweep.Start()
+
+    Attributes:
+        QUEUED (str): State of a target waiting for a free slot.
+        RUNNING (str): State of a target being pinged.
+        REACHABLE (str): State of a target that replied.
+        UNREACHABLE (str): State of a target that never replied.
+        FAILED (str): State of a target ``ping`` could not ping, for example
+            an unknown host.
+        STOPPED (str): State of a target whose ping was stopped.
+"""
+
+import ipaddress
+import re
+from PyQt5.QtCore import pyqtSignal, QObject, QProcess
+from Ping_Stats import Ping_Stats
+from TCP_Probe import TCP_Ping
+import Data
+
+
+QUEUED = "Queued"
+RUNNING = "Running"
+REACHABLE = "Reachable"
+UNREACHABLE = "Unreachable"
+FAILED = "Failed"
+STOPPED = "Stopped"
+
+
+def Parse_Targets(text):
+    """Reads the targets of a sweep.
+
+    Targets are separated by spaces, commas or new lines, ``#`` starts a
+    comment until the end of the line. A CIDR range is replaced by its
+    hosts, duplicate targets are only kept once.
+
+    Args:
+        text (:obj:`str`): Host names, addresses and CIDR ranges.
+
+    Returns:
+        :obj:`list` of ``str``: Targets, in the order they are given.
+
+    Raises:
+        ValueError: A range is invalid or the sweep has more than
+            :attr:`Data.Sweep_Max_Targets` targets.
+    """
+
+    targets = {}
+    for line in text.splitlines():
+        for word in re.split(r"[\s,]+", line.split("#", 1)[0]):
+            if word == "":
+                continue
+            if "/" not in word:
+                targets[word] = None
+                continue
+            network = ipaddress.ip_network(word, strict=False)
+            if network.num_addresses > Data.Sweep_Max_Targets + 2:
+                raise ValueError("%s has more than %d hosts"
+                                 % (word, Data.Sweep_Max_Targets))
+            hosts = list(network.hosts())
+            # hosts() is empty for /32 and /128
+            for host in hosts if hosts != [] else [network.network_address]:
+                targets[str(host)] = None
+            if len(targets) > Data.Sweep_Max_Targets:
+                break
+    if len(targets) > Data.Sweep_Max_Targets:
+        raise ValueError("A sweep has at most %d targets"
+                         % Data.Sweep_Max_Targets)
+    return list(targets)
+
+
+def Read_Targets(path):
+    """Reads the targets of a sweep from a file.
+
+    Args:
+        path (:obj:`str`): Path of a file of targets, see
+            :func:`Parse_Targets`.
+
+    Returns:
+        :obj:`list` of ``str``: Targets.
+
+    Raises:
+        OSError: The file can not be read.
+        ValueError: See :func:`Parse_Targets`.
+    """
+
+    with open(path, encoding="utf8", errors="replace") as targets_file:
+        return Parse_Targets(targets_file.read())
+
+
+class Ping_Sweep(QObject):
+    """Pings a list of targets, up to :attr:`limit` at once.
+
+    Args:
+        targets (:obj:`list` of ``str``): Targets, see
+            :func:`Parse_Targets`.
+        count (:obj:`int`): Number of requests sent to each target.
+        limit (:obj:`int`): Number of targets pinged at once. Defaults to
+            :attr:`Data.Sweep_Limit`.
+        parent (:obj:`QObject`): Parent object.
+        port (:obj:`int`): TCP port connected to instead of sending ICMP
+            requests, ``None`` to start ``ping``.
+
+    Attributes:
+        target_changed (:obj:`pyqtSignal(int)`): Emits the index of a target
+            whose state changed.
+        sweep_finished (:obj:`pyqtSignal()`): Emitted once every target was
+            pinged or the sweep was stopped.
+        targets (:obj:`list` of ``str``): See Args.
+        count (:obj:`int`): See Args.
+        limit (:obj:`int`): See Args.
+        port (:obj:`int`): See Args.
+        states (:obj:`list` of ``str``): State of each target.
+        stats (:obj:`list` of ``Ping_Stats``): Statistics of each target,
+            ``None`` until it was pinged.
+        errors (:obj:`list` of ``str``): Error printed by ``ping`` for each
+            target, empty if none.
+        processes (:obj:`dict`): Contains the index of each target being
+            pinged and its ``QProcess``, or its ``TCP_Ping``.
+        next_target (:obj:`int`): Index of the first target not started.
+        finished (:obj:`int`): Number of targets done.
+        starting (:obj:`bool`): ``True`` while :meth:`Start_Next` starts
+            targets.
+    """
+
+    target_changed = pyqtSignal(int)
+    sweep_finished = pyqtSignal()
+
+    def __init__(self, targets, count=3, limit=None, parent=None,
+                 port=None):
+        super(Ping_Sweep, self).__init__(parent)
+        self.targets = list(targets)
+        self.count = count
+        self.limit = limit if limit is not None else Data.Sweep_Limit
+        self.port = port
+        self.states = [QUEUED] * len(self.targets)
+        self.stats = [None] * len(self.targets)
+        self.errors = [""] * len(self.targets)
+        self.processes = {}
+        self.next_target = 0
+        self.finished = 0
+        self.starting = False
+
+    def Get_Arguments(self, target):
+        """Returns the arguments of the ping of a target.
+
+        Args:
+            target (:obj:`str`): Host name or address.
+
+        Returns:
+            :obj:`list` of ``str``: Arguments of ``ping``.
+        """
+
+        return ["-n", "-c", str(self.count), "-i", "0.2", "-W", "1", target]
+
+    def Start(self):
+        """Starts pinging the targets.
+        """
+
+        self.Start_Next()
+        if self.targets == []:
+            self.sweep_finished.emit()
+
+    def Start_Next(self):
+        """Starts the queued targets while fewer than :attr:`limit` are
+        pinged.
+        """
+
+        # A ping that fails to start is done at once, it does not start
+        # the next target itself
+        self.starting = True
+        while (len(self.processes) < self.limit
+               and self.next_target < len(self.targets)):
+            self.next_target += 1
+            self.Start_Target(self.next_target - 1)
+        self.starting = False
+
+    def Start_Target(self, index):
+        """Starts the ping of a target.
+
+        Args:
+            index (:obj:`int`): Index of the target.
+        """
+
+        if self.port is not None:
+            self.Start_TCP_Target(index)
+            return
+        process = QProcess(self)
+        process.finished.connect(
+            lambda exit_code, exit_status: self.Target_Done(index))
+        process.errorOccurred.connect(
+            lambda error: self.Target_Error(index, error))
+        self.processes[index] = process
+        self.states[index] = RUNNING
+        process.start("ping", self.Get_Arguments(self.targets[index]))
+        self.target_changed.emit(index)
+
+    def Start_TCP_Target(self, index):
+        """Starts connecting to the port of a target, with the timings of
+        :meth:`Get_Arguments`.
+
+        Args:
+            index (:obj:`int`): Index of the target.
+        """
+
+        stats = Ping_Stats()
+        ping = TCP_Ping(self.targets[index], self.port, self.count,
+                        interval=0.2, timeout=1.0, parent=self)
+        ping.output_ready.connect(
+            lambda line: self.Read_TCP_Line(index, stats, line))
+        ping.ping_finished.connect(
+            lambda exit_code: self.TCP_Target_Done(index, stats, exit_code))
+        self.processes[index] = ping
+        self.states[index] = RUNNING
+        self.target_changed.emit(index)
+        ping.Start()
+
+    def Read_TCP_Line(self, index, stats, line):
+        """Parses a line printed by the TCP ping of a target.
+
+        Args:
+            index (:obj:`int`): Index of the target.
+            stats (:obj:`Ping_Stats`): Statistics of the target.
+            line (:obj:`str`): Line of output.
+        """
+
+        if line.startswith("tcp ping:"):
+            self.errors[index] = line
+        else:
+            stats.Parse_Line(line)
+
+    def TCP_Target_Done(self, index, stats, exit_code):
+        """Keeps the statistics of a TCP ping and starts the next target.
+
+        Args:
+            index (:obj:`int`): Index of the target.
+            stats (:obj:`Ping_Stats`): Statistics of the target.
+            exit_code (:obj:`int`): Exit code of the ping.
+        """
+
+        ping = self.processes.pop(index, None)
+        if ping is None:
+            return
+        ping.deleteLater()
+        self.Set_Result(index, stats, exit_code)
+
+    def Target_Error(self, index, error):
+        """Ends a target whose ping could not start.
+
+        Args:
+            index (:obj:`int`): Index of the target.
+            error (:obj:`QProcess.ProcessError`): Error of the process.
+        """
+
+        if error == QProcess.FailedToStart and index in self.processes:
+            self.errors[index] = self.processes[index].errorString()
+            self.Target_Done(index)
+
+    def Target_Done(self, index):
+        """Parses the output of a ping and starts the next target.
+
+        Args:
+            index (:obj:`int`): Index of the target.
+        """
+
+        process = self.processes.pop(index, None)
+        if process is None:
+            return
+        stats = Ping_Stats()
+        stats.Feed(bytes(process.readAllStandardOutput()).decode(
+            "utf8", "replace"))
+        error = bytes(process.readAllStandardError()).decode(
+            "utf8", "replace").strip()
+        if error != "":
+            self.errors[index] = error.splitlines()[-1]
+        process.deleteLater()
+        self.Set_Result(index, stats, process.exitCode())
+
+    def Set_Result(self, index, stats, exit_code):
+        """Keeps the statistics of a target done and starts the next one.
+
+        Args:
+            index (:obj:`int`): Index of the target.
+            stats (:obj:`Ping_Stats`): Statistics of the target.
+            exit_code (:obj:`int`): Exit code of its ping.
+        """
+
+        self.stats[index] = stats
+        if self.states[index] != STOPPED:
+            if stats.received > 0:
+                self.states[index] = REACHABLE
+            elif stats.sent > 0 or exit_code == 1:
+                self.states[index] = UNREACHABLE
+            else:
+                self.states[index] = FAILED
+        self.finished += 1
+        self.target_changed.emit(index)
+        if not self.starting:
+            self.Start_Next()
+        if self.finished == len(self.targets):
+            self.sweep_finished.emit()
+
+    def Stop(self):
+        """Kills the pings and drops the queued targets.
+
+        A TCP ping stops at once, a ``ping`` once its process exits.
+        """
+
+        if not self.Is_Running():
+            return
+        for index in range(self.next_target, len(self.targets)):
+            self.states[index] = STOPPED
+            self.target_changed.emit(index)
+        self.finished += len(self.targets) - self.next_target
+        self.next_target = len(self.targets)
+        running = list(self.processes.items())
+        for index, process in running:
+            self.states[index] = STOPPED
+        for index, process in running:
+            if self.port is not None:
+                process.Stop()
+            else:
+                process.kill()
+        if running == []:
+            self.sweep_finished.emit()
+
+    def Is_Running(self):
+        """Checks if targets are still pinged or queued.
+
+        Returns:
+            :obj:`bool`: ``True`` until every target is done.
+        """
+
+        return self.finished < len(self.targets)
@@ -0,0 +1,249 @@
+"""
+    This module shows the sweeps of the ping page.
+
+    :class:`Ping_Sweep_View` reads the targets of a :mod:`Ping_Sweep` from
+    a list, CIDR ranges or a file, starts the sweep and fills a table with
+    the state, loss and round-trip times of each target as soon as its
+    ping exits. A sweep sends ICMP requests or connects to a TCP port.
+    Clicking a header sorts the table, the targets by address, the
+    statistics by value.
+"""
+
+import ipaddress
+from PyQt5 import QtWidgets
+from PyQt5.QtCore import Qt
+import Data
+import Ping_Sweep
+
+
+class Target_Item(QtWidgets.QTableWidgetItem):
+    """Item of a target, sorted by address then by host name.
+
+    Args:
+        target (:obj:`str`): Host name or address.
+    """
+
+    def __init__(self, target):
+        super(Target_Item, self).__init__(target)
+        try:
+            address = ipaddress.ip_address(target)
+            self.key = (address.version, int(address), "")
+        except ValueError:
+            self.key = (7, 0, target)
+
+    def __lt__(self, other):
+        if isinstance(other, Target_Item):
+            return self.key < other.key
+        return super(Target_Item, self).__lt__(other)
+
+
+class Ping_Sweep_View(QtWidgets.QDialog):
+    """Starts sweeps and shows the statistics of their targets.
+
+    Args:
+        parent (:obj:`QWidget`): Parent widget.
+
+    Attributes:
+        columns (:obj:`list` of ``str``): Headers of the table columns.
+        sweep (:obj:`Ping_Sweep.Ping_Sweep`): Sweep shown, ``None`` before
+            the first.
+        rows (:obj:`list` of ``Target_Item``): Item of the first column of
+            each target, the item knows its row.
+    """
+
+    columns = ["Target", "State", "Sent", "Received", "Loss %",
+               "Min ms", "Avg ms", "Max ms", "Mdev ms"]
+
+    def __init__(self, parent=None):
+        super(Ping_Sweep_View, self).__init__(parent)
+        self.sweep = None
+        self.rows = []
+        self.setWindowTitle("Ping Sweep")
+        self.resize(860, 560)
+
+        self.targets_text = QtWidgets.QPlainTextEdit(self)
+        self.targets_text.setPlaceholderText(
+            "Host names, addresses or CIDR ranges, for example "
+            "192.168.1.0/24")
+        self.targets_text.setMaximumHeight(80)
+        self.file_button = QtWidgets.QPushButton("Open File...", self)
+        self.file_button.setToolTip("Read the targets from a file, one or "
+                                    "more per line")
+        self.file_button.clicked.connect(self.Open_File)
+        self.count_box = QtWidgets.QSpinBox(self)
+        self.count_box.setRange(1, 100)
+        self.count_box.setPrefix("Requests: ")
+        self.count_box.setValue(3)
+        self.limit_box = QtWidgets.QSpinBox(self)
+        self.limit_box.setRange(1, 256)
+        self.limit_box.setPrefix("Run at once: ")
+        self.limit_box.setValue(Data.Sweep_Limit)
+        self.port_box = QtWidgets.QSpinBox(self)
+        self.port_box.setRange(0, 65535)
+        self.port_box.setPrefix("TCP port: ")
+        self.port_box.setSpecialValueText("ICMP")
+        self.port_box.setToolTip("Connect to a TCP port instead of sending "
+                                 "ICMP requests, for hosts that filter ICMP")
+        self.start_button = QtWidgets.QPushButton("Sweep", self)
+        self.start_button.clicked.connect(self.Start_Sweep)
+        self.stop_button = QtWidgets.QPushButton("Stop", self)
+        self.stop_button.clicked.connect(self.Stop_Sweep)
+        self.stop_button.setEnabled(False)
+        self.progress_label = QtWidgets.QLabel(self)
+
+        self.table = QtWidgets.QTableWidget(0, len(self.columns), self)
+        self.table.setHorizontalHeaderLabels(self.columns)
+        self.table.horizontalHeader().setSectionResizeMode(
+            0, QtWidgets.QHeaderView.Stretch)
+        self.table.setColumnWidth(1, 110)
+        for column in range(2, len(self.columns)):
+            self.table.setColumnWidth(column, 80)
+        self.table.verticalHeader().hide()
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.table.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
+
+        controls = QtWidgets.QHBoxLayout()
+        controls.addWidget(self.file_button)
+        controls.addWidget(self.count_box)
+        controls.addWidget(self.limit_box)
+        controls.addWidget(self.port_box)
+        controls.addStretch()
+        controls.addWidget(self.start_button)
+        controls.addWidget(self.stop_button)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.targets_text)
+        layout.addLayout(controls)
+        layout.addWidget(self.table)
+        layout.addWidget(self.progress_label)
+
+    def Set_Targets(self, text):
+        """Fills the targets, for example with the address of the ping page.
+
+        Args:
+            text (:obj:`str`): Targets, see
+                :func:`Ping_Sweep.Parse_Targets`.
+        """
+
+        self.targets_text.setPlainText(text)
+
+    def Open_File(self):
+        """Asks for a file of targets and shows its targets.
+        """
+
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Open Targets", "", "Text Files (*.txt);;All Files (*)")
+        if path == "":
+            return
+        try:
+            targets = Ping_Sweep.Read_Targets(path)
+        except (OSError, ValueError) as error:
+            QtWidgets.QMessageBox.warning(self, "Open Targets", str(error))
+            return
+        self.targets_text.setPlainText("\n".join(targets))
+
+    def Start_Sweep(self):
+        """Pings the targets, the previous sweep is replaced.
+        """
+
+        try:
+            targets = Ping_Sweep.Parse_Targets(self.targets_text.toPlainText())
+        except ValueError as error:
+            QtWidgets.QMessageBox.warning(self, "Ping Sweep", str(error))
+            return
+        if targets == []:
+            return
+        if self.sweep is not None:
+            self.sweep.deleteLater()
+        self.sweep = Ping_Sweep.Ping_Sweep(
+            targets, self.count_box.value(), self.limit_box.value(), self,
+            self.port_box.value() or None)
+        self.sweep.target_changed.connect(self.Update_Target)
+        self.sweep.sweep_finished.connect(self.Sweep_Finished)
+
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(0)
+        self.table.setRowCount(len(targets))
+        self.rows = []
+        for row, target in enumerate(targets):
+            self.rows.append(Target_Item(target))
+            self.table.setItem(row, 0, self.rows[row])
+            self.table.setItem(
+                row, 1, QtWidgets.QTableWidgetItem(Ping_Sweep.QUEUED))
+        self.table.setSortingEnabled(True)
+        self.start_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        self.sweep.Start()
+        self.Update_Progress()
+
+    def Stop_Sweep(self):
+        """Stops the current sweep, the pings already done stay shown.
+        """
+
+        if self.sweep is not None:
+            self.sweep.Stop()
+
+    def Update_Target(self, index):
+        """Displays the state and statistics of a target.
+
+        Args:
+            index (:obj:`int`): Index of the target in the sweep.
+        """
+
+        if self.sender() is not self.sweep:
+            return
+        state = self.sweep.states[index]
+        if self.sweep.errors[index] != "":
+            state += ": " + self.sweep.errors[index]
+        values = [QtWidgets.QTableWidgetItem(state)]
+        stats = self.sweep.stats[index]
+        if stats is not None:
+            loss = stats.Get_Loss()
+            rtt = stats.rtt
+            numbers = [stats.sent, stats.received,
+                       None if loss is None else round(loss, 1)]
+            if rtt.count > 0:
+                numbers += [round(rtt.minimum, 3), round(rtt.mean, 3),
+                            round(rtt.maximum, 3), round(rtt.Get_Mdev(), 3)]
+            for number in numbers:
+                values.append(QtWidgets.QTableWidgetItem())
+                if number is not None:
+                    values[-1].setData(Qt.DisplayRole, number)
+        # The row moves when the table is sorted on a changed column
+        self.table.setSortingEnabled(False)
+        row = self.rows[index].row()
+        for column, item in enumerate(values, 1):
+            self.table.setItem(row, column, item)
+        self.table.setSortingEnabled(True)
+        if stats is not None:
+            self.Update_Progress()
+
+    def Update_Progress(self):
+        """Displays the number of targets done and reachable.
+        """
+
+        reachable = self.sweep.states.count(Ping_Sweep.REACHABLE)
+        self.progress_label.setText(
+            "%d of %d targets done, %d reachable"
+            % (self.sweep.finished, len(self.sweep.targets), reachable))
+
+    def Sweep_Finished(self):
+        """Enables a new sweep once the current one is done.
+        """
+
+        if self.sender() is not self.sweep:
+            return
+        self.Update_Progress()
+        self.start_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+
+    def closeEvent(self, event):
+        """Stops the sweep when the window is closed.
+
+        Args:
+            event (:obj:`QCloseEvent`): Close event.
+        """
+
+        self.Stop_Sweep()
+        super(Ping_Sweep_View, self).closeEvent(event)
@@ -1,17 +1,30 @@
 
 from PyQt5 import QtCore, QtGui, QtWidgets, QtWidgets
-from PyQt5.QtCore import pyqtSignal, pyqtSlot, QObject, QProcess, Qt
-from PyQt5 import uic
+from PyQt5.QtCore import pyqtSignal, pyqtSlot, QObject, Qt
+import UI_Loader
+import Startup_Profiler
 from PyQt5 import QtGui
 from CronTab_Options_Logic import CronTab_Options_Logic
+from Output_Spool import Output_Spool
+from Ping_Stats import Ping_Stats
+from Ping_Sweep_View import Ping_Sweep_View
+from RTT_Chart import RTT_Chart
+from Stream_Decoder import Stream_Decoder
+import History_Store
+import ICMP_Engine
+import TCP_Probe
+import Job_Manager
+import Output_Pager
+import Data
 import sys
 import os.path
+import time
 
 CURRENT_DIR = os.path.dirname(os.path.realpath(__file__))
 PARENT_DIR = os.path.dirname(CURRENT_DIR)
 GUI_DIR = os.path.join(CURRENT_DIR, "GUI")
 ui_filename = os.path.join(GUI_DIR, "Ping.ui")
-baseUIClass, baseUIWidget = uic.loadUiType(ui_filename)
+baseUIClass, baseUIWidget = UI_Loader.Load_Ui_Type(ui_filename)
 
 
 class Ping_UI_Logic(baseUIWidget, baseUIClass):
@@ -32,12 +45,34 @@ class Ping_UI_Logic(baseUIWidget, baseUIClass):
             has an available output to be read.
         send_command (:obj:`pyqtSignal(str)`): Emits a signal that is connected 
             to the ``command_history``, the signal contains the command formed.
-        process (:obj:`QProcess`): QProcess object that is used to execute the 
-            ``ping`` processes.
+        job_manager (:obj:`Job_Manager`): Runs the ``ping`` processes, each
+            ping is a job of the ``ping`` page. Several pings can run at the
+            same time.
         ping_count (:obj:`int`): counts the current ping request count.
             Enabled through the GUI.        
         crontab_options (:mod:`.CronTab_Options_Logic`): Used to schedule
             and show the ``Crontab``.
+        sweep_view (:obj:`Ping_Sweep_View`): Pings many targets at once,
+            ``None`` until it is first shown.
+        ping_spool (:obj:`Output_Spool`): Keeps the full output of each
+            ping on disk, ``ping_terminal_text`` only keeps the last
+            :attr:`Data.Scrollback_Lines` lines.
+        decoders (:obj:`dict`): Contains the id of each running ping job
+            and the :obj:`Stream_Decoder` of its standard output and error,
+            they assemble the lines of the output.
+        native_pings (:obj:`dict`): Contains each running ping sent by
+            :mod:`ICMP_Engine` instead of ``ping``, when ``native_ping`` is
+            checked, or by :mod:`TCP_Probe`, when ``tcp_ping`` is checked,
+            its id in the :mod:`History_Store` and its start time.
+        stats (:obj:`dict`): Contains the id of each running ping job, or
+            the running native ping, and the :obj:`Ping_Stats` parsed from
+            its output.
+        shown_stats (:obj:`Ping_Stats`): Statistics shown in
+            ``ping_stats_text``, those of the last ping started.
+        rtt_chart (:obj:`RTT_Chart`): Chart of the round-trip times of the
+            last ping started, between the terminal and the statistics.
+        stats_timer (:obj:`QTimer`): Shows the statistics at most every
+            250 ms, an adaptive ping prints hundreds of replies per second.
 
     Note:
         This is an educational tool and does not use the use ping utility at
@@ -50,10 +85,9 @@ class Ping_UI_Logic(baseUIWidget, baseUIClass):
     #  Sends signal when ping executes and there is an output
     ping_output_ready = pyqtSignal(str)
     send_command = pyqtSignal(str)
-    # Ping process
-    process = QProcess()
     ping_count = 0
 
+    @Startup_Profiler.Profiled("Ping_UI_Logic")
     def __init__(self, parent=None):
         super(Ping_UI_Logic, self).__init__(parent)
         self.setupUi(self)
@@ -62,6 +96,23 @@ class Ping_UI_Logic(baseUIWidget, baseUIClass):
                             | QtCore.Qt.WindowMinimizeButtonHint
                             )
         self.crontab_options = None
+        self.sweep_view = None
+        self.ping_terminal_text.setMaximumBlockCount(Data.Scrollback_Lines)
+        self.ping_spool = Output_Spool("ping")
+        Output_Pager.Add_Pager_Action(self.ping_terminal_text, self.ping_spool)
+        self.job_manager = Job_Manager.Get_Manager()
+        self.decoders = {}
+        self.native_pings = {}
+        self.stats = {}
+        self.shown_stats = None
+        self.stats_timer = QtCore.QTimer(self)
+        self.stats_timer.setSingleShot(True)
+        self.stats_timer.setInterval(250)
+        self.rtt_chart = RTT_Chart(self)
+        self.ping_terminal_layout.insertWidget(1, self.rtt_chart)
+        self.ping_terminal_layout.setStretch(0, 3)
+        self.ping_terminal_layout.setStretch(1, 2)
+        self.Show_Stats()
         self.label_error.hide()
         self.ping_stop_button.hide()
 # ==============================================================================
@@ -71,18 +122,27 @@ class Ping_UI_Logic(baseUIWidget, baseUIClass):
 #  ping_stop_button CLICKED --> Stop_Ping()
 #  ping_clear_terminal_button CLICKED --> ()
 #  ping_clear_history_button CLICKED --> Clear_Ping_Terminal()
+#  ping_sweep_button CLICKED --> Show_Ping_Sweep()
 
 # bytes_check.TOGGLED --> Check_Bytes_Count()
 # ttl_check TOGGLED --> Check_Status()
 # inf_count_radioButton TOGGLED --> Check_Count()
+# tcp_ping TOGGLED --> Check_TCP_Port()
 
 # Signals below are defined by the code writer
 # ping_output_ready --> Print_Ping_Terminal()
 # ping_finished --> Print_Terminated()
+# stats_timer TIMEOUT --> Show_Stats()
 
-# Signals below are part of Qprocess and are not defined by the code writer
-# readyReadStandardOutput --> Set_Ping_Output()
-# readyReadStandardError --> Ping_Erorr()
+# Signals below are part of the native pings (ICMP_Engine)
+# output_ready --> Set_Native_Output()
+# ping_finished --> Native_Ping_Finished()
+
+# Signals below are part of the Job_Manager
+# job_added --> Add_Ping_Job()
+# output_ready --> Set_Ping_Output()
+# error_ready --> Ping_Erorr()
+# job_finished --> Flush_Ping_Output()
 # ==============================================================================
         self.pingButton.clicked.connect(self.Network_Tools_Ping_Execute)
         self.ping_stop_button.clicked.connect(self.Stop_Ping)
@@ -94,16 +154,20 @@ class Ping_UI_Logic(baseUIWidget, baseUIClass):
         self.send_command.connect(self.Print_Command)
         self.ping_output_ready.connect(self.Print_Ping_Terminal)
         self.ping_finished.connect(self.Print_Terminated)
+        self.stats_timer.timeout.connect(self.Show_Stats)
 
         self.bytes_check.stateChanged.connect(self.Check_Bytes_Count)
         self.ttl_check.stateChanged.connect(self.Check_Status)
         self.inf_count.stateChanged.connect(self.Check_Count)
+        self.tcp_ping.stateChanged.connect(self.Check_TCP_Port)
 
-        self.process.readyReadStandardOutput.connect(self.Set_Ping_Output)
-        self.process.readyReadStandardError.connect(self.Ping_Error)
-        self.process.finished.connect(lambda: self.ping_stop_button.hide())
+        self.job_manager.job_added.connect(self.Add_Ping_Job)
+        self.job_manager.output_ready.connect(self.Set_Ping_Output)
+        self.job_manager.error_ready.connect(self.Ping_Error)
+        self.job_manager.job_finished.connect(self.Flush_Ping_Output)
         self.crontab_options_button.clicked.connect(
         self.Show_CronTab_Options)
+        self.ping_sweep_button.clicked.connect(self.Show_Ping_Sweep)
 
 # ==============================================================================
 
@@ -118,6 +182,19 @@ class Ping_UI_Logic(baseUIWidget, baseUIClass):
             self.crontab_options = CronTab_Options_Logic()
         self.crontab_options.show()
 
+    def Show_Ping_Sweep(self):
+        """
+            Shows the sweep window, filled with the address to ping if no
+            target was entered yet.
+        """
+
+        if self.sweep_view is None:
+            self.sweep_view = Ping_Sweep_View(self)
+        if self.sweep_view.targets_text.toPlainText() == "":
+            self.sweep_view.Set_Targets(self.ping_address.text())
+        self.sweep_view.show()
+        self.sweep_view.raise_()
+
     def Print_Terminated(self, str):
         """When Ping process is killed, this methods prints (Terminated)
         on the GUI Terminal.
@@ -195,6 +272,17 @@ class Ping_UI_Logic(baseUIWidget, baseUIClass):
             # If checked enable Byte Count
             self.bytes_count_spinBox.setEnabled(False)
 
+    def Check_TCP_Port(self):
+
+        """This method checks if the TCP ping is enabled.
+                It is enabled when the user checks ``tcp_ping``.
+                Then ``tcp_port_spinBox`` is enabled and the user can
+                choose the port connected to instead of sending ICMP
+                requests.
+        """
+
+        self.tcp_port_spinBox.setEnabled(self.tcp_ping.isChecked())
+
     def Clear_Ping_Command_History(self):
         """
             Clears the command history when Clear History button is clicked.
@@ -214,23 +302,30 @@ class Ping_UI_Logic(baseUIWidget, baseUIClass):
         self.ping_terminal_text.clear()
         self.send_command.emit("clear")
 
-    def Set_Ping_Output(self):
+    def Set_Ping_Output(self, job_id, text, data):
 
         """
             This methods reads the standard output from the process
             then sends the result to ``ping_terminal_text`` by emiting the singal
             :obj:`.ping_output_ready`. that is connected to
             :meth:`.Print_Ping_Terminal()` method.
+
+            Args:
+                job_id (:obj:`int`): Id of the job, the output of the other
+                    pages jobs is ignored.
+                text (:obj:`str`): Decoded output, unused, the lines are
+                    assembled from ``data``.
+                data (:obj:`QByteArray`): Output of the job.
         """
-        # Read process standard output
-        data = self.process.readAllStandardOutput()
-        # Sends Empty Bytes
-        if data.isEmpty():
+        if job_id not in self.decoders:
             return
-        # Decodes data to a readable String
-        output = bytes(data).decode("utf8").strip()
+        # Decodes the complete lines, a partial line waits for the next read
+        output = self.decoders[job_id][0].Read_Lines(data)
+        if output == "":
+            return
+        self.Update_Stats(job_id, output)
         # Emits a signal to Print_Ping_Terminal()
-        self.ping_output_ready.emit(output)
+        self.ping_output_ready.emit(output[:-1])
 
     def Stop_Ping(self):
 
@@ -249,10 +344,12 @@ class Ping_UI_Logic(baseUIWidget, baseUIClass):
         # CTRL+C kills the process on keyboard (shell)
         self.send_command.emit("Keyboard: CTRL+C")
         self.ping_finished.emit("Terminated")
-        # Kill Ping Process
-        self.process.kill()
+        # Kill Ping Processes
+        self.job_manager.Kill_Page("ping")
+        for ping in list(self.native_pings):
+            ping.Stop()
 
-    def Ping_Error(self):
+    def Ping_Error(self, job_id, text, data):
         """
             This methods reads the standard Error from the process
             then sends the result to ``ping_terminal_text`` by emiting the
@@ -260,16 +357,203 @@ class Ping_UI_Logic(baseUIWidget, baseUIClass):
 
             :obj:`.ping_output_ready` is connected to
             :meth:`.Print_Ping_Terminal()` method.
+
+            Args:
+                job_id (:obj:`int`): Id of the job.
+                text (:obj:`str`): Decoded error output, unused.
+                data (:obj:`QByteArray`): Error output of the job.
+        """
+        if job_id not in self.decoders:
+            return
+        # Decodes the complete lines, a partial line waits for the next read
+        error = self.decoders[job_id][1].Read_Lines(data)
+        if error == "":
+            return
+        self.ping_output_ready.emit(error[:-1])
+
+    def Flush_Ping_Output(self, job_id):
+        """
+            Prints the last line of the ping output and error when the
+            process finishes, if they did not end with a new line, and adds
+            the resources used by the ping to the history. The final
+            statistics of the ping are shown.
+
+            The stop button is hidden once no ping is running.
+
+            Args:
+                job_id (:obj:`int`): Id of the finished job.
+        """
+
+        if job_id not in self.decoders:
+            return
+        job = self.job_manager.jobs[job_id]
+        if job.exit_code is not None:
+            self.ping_command_history.append(job.Get_Summary())
+        output_decoder, error_decoder = self.decoders.pop(job_id)
+        output = output_decoder.Flush()
+        if output != "":
+            self.Update_Stats(job_id, output)
+            self.ping_output_ready.emit(output)
+        error = error_decoder.Flush()
+        if error != "":
+            self.ping_output_ready.emit(error)
+        self.stats.pop(job_id, None)
+        self.Show_Stats()
+        if self.decoders == {} and self.native_pings == {}:
+            self.ping_stop_button.hide()
+
+    def Start_Ping(self, arg_list):
+        """
+            Starts a ping job.
+
+            The terminal spool starts a new file unless another ping is
+            still running. When ``native_ping`` is checked, the requests
+            are sent by :mod:`ICMP_Engine` instead of a ``ping`` process,
+            when ``tcp_ping`` is checked :mod:`TCP_Probe` connects to the
+            port of ``tcp_port_spinBox`` instead.
+
+            Args:
+                arg_list (:obj:`list` of ``str``): Arguments of ``ping``.
+        """
+
+        command = "ping " + " ".join(arg_list)
+        if self.tcp_ping.isChecked():
+            arg_list = ["-p", str(self.tcp_port_spinBox.value())] + arg_list
+            self.Start_Native_Ping("TCP_Probe " + " ".join(arg_list),
+                                   arg_list, TCP_Probe)
+            return
+        if self.native_ping.isChecked():
+            self.Start_Native_Ping(command, arg_list)
+            return
+        if self.decoders == {} and self.native_pings == {}:
+            self.ping_spool.Start(command)
+        self.ping_stop_button.show()
+        self.job_manager.Submit("ping", command, [("ping", arg_list)])
+
+    def Start_Native_Ping(self, command, arg_list, engine=ICMP_Engine):
+        """
+            Starts a ping sent by :mod:`ICMP_Engine` or :mod:`TCP_Probe`,
+            its output is printed like the output of ``ping``.
+
+            Args:
+                command (:obj:`str`): Command shown in the history.
+                arg_list (:obj:`list` of ``str``): Arguments of ``ping``.
+                engine (:obj:`module`): :mod:`ICMP_Engine` or
+                    :mod:`TCP_Probe`.
         """
-        # Read Error
-        error = self.process.readAllStandardError()
-        # Remove Empty Bytes
-        if error.isEmpty():
+
+        try:
+            target, options = engine.Parse_Arguments(arg_list)
+        except ValueError as error:
+            self.label_error.show()
+            self.label_error.setText(str(error))
+            return
+        if engine is ICMP_Engine and not ICMP_Engine.Is_Available():
+            self.label_error.show()
+            self.label_error.setText("Native ICMP is not allowed, see "
+                                     "net.ipv4.ping_group_range")
             return
-        # Decodes data to a readable String
-        error = bytes(error).decode("utf8").strip()
+        if self.decoders == {} and self.native_pings == {}:
+            self.ping_spool.Start(command)
+        if engine is TCP_Probe:
+            ping = TCP_Probe.TCP_Ping(target, parent=self, **options)
+        else:
+            ping = ICMP_Engine.ICMP_Ping(target, parent=self, **options)
+        ping.output_ready.connect(self.Set_Native_Output)
+        ping.ping_finished.connect(self.Native_Ping_Finished)
+        # The history runs the TCP ping again as a job, through Python
+        if engine is TCP_Probe:
+            stages = [TCP_Probe.Get_Command(arg_list)]
+        else:
+            stages = [("ping", arg_list)]
+        self.native_pings[ping] = (History_Store.Get_Store().Add(
+            "ping", command, stages), time.time())
+        self.stats[ping] = Ping_Stats()
+        self.shown_stats = self.stats[ping]
+        self.Show_Stats()
+        self.ping_stop_button.show()
+        ping.Start()
+
+    def Set_Native_Output(self, line):
+        """
+            Prints a line of a native ping and parses its statistics.
+
+            Args:
+                line (:obj:`str`): Line of output, without new line.
+        """
+
+        self.Update_Stats(self.sender(), line + "\n")
+        self.ping_output_ready.emit(line)
+
+    def Native_Ping_Finished(self, exit_code):
+        """
+            Adds a native ping to the history once it is done, its final
+            statistics are shown.
 
-        self.ping_output_ready.emit(error)
+            The stop button is hidden once no ping is running.
+
+            Args:
+                exit_code (:obj:`int`): Exit code of the ping.
+        """
+
+        ping = self.sender()
+        if ping not in self.native_pings:
+            return
+        entry_id, start = self.native_pings.pop(ping)
+        History_Store.Get_Store().Finish(entry_id, exit_code,
+                                         time.time() - start)
+        self.stats.pop(ping, None)
+        self.Show_Stats()
+        ping.deleteLater()
+        if self.decoders == {} and self.native_pings == {}:
+            self.ping_stop_button.hide()
+
+    def Add_Ping_Job(self, job_id):
+        """
+            Creates the decoders of a new ping job, before it starts.
+
+            Args:
+                job_id (:obj:`int`): Id of the job, the jobs of the other
+                    pages are ignored.
+        """
+
+        if self.job_manager.jobs[job_id].page == "ping":
+            self.decoders[job_id] = (Stream_Decoder(), Stream_Decoder())
+            self.stats[job_id] = Ping_Stats()
+            self.shown_stats = self.stats[job_id]
+            self.Show_Stats()
+
+    def Update_Stats(self, job_id, output):
+        """
+            Parses the complete lines of a ping output, its statistics are
+            shown soon if they are displayed.
+
+            Args:
+                job_id (:obj:`int`): Id of the ping job, or the native ping.
+                output (:obj:`str`): Complete lines of the output.
+        """
+
+        stats = self.stats.get(job_id)
+        if stats is None:
+            return
+        stats.Feed(output)
+        if stats is self.shown_stats and not self.stats_timer.isActive():
+            self.stats_timer.start()
+
+    def Show_Stats(self):
+        """
+            Shows the statistics of the last ping started in
+            ``ping_stats_text`` and its round-trip times in
+            :attr:`rtt_chart`.
+        """
+
+        self.stats_timer.stop()
+        if self.shown_stats is None:
+            self.ping_stats_text.setText(Ping_Stats().Format())
+            self.rtt_chart.Set_Series(None)
+        else:
+            self.ping_stats_text.setText(self.shown_stats.Format())
+            self.rtt_chart.Set_Series(self.shown_stats.series)
 
     def Print_Ping_Terminal(self, string):
         """Prints on output terminal.
@@ -279,6 +563,7 @@ class Ping_UI_Logic(baseUIWidget, baseUIClass):
                 ``ping_terminal_text``
         """        
         #  Emits a signal to Print_Ping_Terminal()
+        self.ping_spool.Write(string)
         self.ping_terminal_text.appendPlainText(string)
 
     def Print_Command(self, str):
@@ -350,8 +635,7 @@ class Ping_UI_Logic(baseUIWidget, baseUIClass):
             # Convert arg_list to readable format
             self.ping_command_history.append("ping " + " ".join(arg_list))
             # Start ping process (ping,[arguments])
-            self.process.start("ping", arg_list)
-            self.ping_stop_button.show()
+            self.Start_Ping(arg_list)
         else:
             # If number of replies is specified (inf_count)
             # is unchecked
@@ -359,8 +643,7 @@ class Ping_UI_Logic(baseUIWidget, baseUIClass):
             arg_list.append(str(self.ping_count))
             self.send_command.emit("ping " + " ".join(arg_list))
             # Convert arg_list to readable format
-            self.process.start("ping", arg_list)
-            self.ping_stop_button.show()
+            self.Start_Ping(arg_list)
 
     def CronTab_Command_Execute(self):
 
@@ -414,8 +697,7 @@ class Ping_UI_Logic(baseUIWidget, baseUIClass):
             # Convert arg_list to readable format
             self.ping_command_history.append("ping " + " ".join(arg_list))
             # Start ping process (ping,[arguments])
-            self.process.start("ping", arg_list)
-            self.ping_stop_button.show()
+            self.Start_Ping(arg_list)
             # Start CronTab Job
             self.crontab_options.Start_Job("ping " + " ".join(arg_list))
         else:
@@ -427,8 +709,7 @@ class Ping_UI_Logic(baseUIWidget, baseUIClass):
             arg_list.insert(1, str(self.ping_count))
             self.send_command.emit("ping " + " ".join(arg_list))
             # Convert arg_list to readable format
-            self.process.start("ping", arg_list)
-            self.ping_stop_button.show()
+            self.Start_Ping(arg_list)
             # Start CronTab Job
             self.crontab_options.Start_Job("ping " + " ".join(arg_list))
 
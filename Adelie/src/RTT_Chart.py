@@ -0,0 +1,101 @@
+"""
+    This module draws the round-trip times of a ping.
+
+    :class:`RTT_Chart` shows every reply of a ping, from the first one, as
+    the range of round-trip times of each pixel column. The times are not
+    read one by one, the minimum and maximum of each column come from the
+    blocks kept by :class:`Ping_Stats.RTT_Series`, drawing the chart of a
+    ping running for days costs about the same as one of a minute.
+
+    Example:
+        The ping page shows the series of the last ping started::
+
+            chart = RTT_Chart()
+            chart.Set_Series(stats.series)
+"""
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+from PyQt5.QtCore import Qt
+
+
+class RTT_Chart(QtWidgets.QWidget):
+    """Chart of the round-trip times of a ping.
+
+    Args:
+        parent (:obj:`QWidget`): Parent widget.
+
+    Attributes:
+        margin (:obj:`int`): Space around the plot, in pixels.
+        series (:obj:`Ping_Stats.RTT_Series`): Round-trip times shown,
+            ``None`` before the first ping.
+    """
+
+    margin = 6
+
+    def __init__(self, parent=None):
+        super(RTT_Chart, self).__init__(parent)
+        self.series = None
+        self.setMinimumSize(200, 100)
+        self.setToolTip("Round-trip time of every reply of the last ping, "
+                        "the range of each pixel column is drawn")
+
+    def Set_Series(self, series):
+        """Shows a series and draws it again.
+
+        Args:
+            series (:obj:`Ping_Stats.RTT_Series`): Round-trip times, ``None``
+                to clear the chart.
+        """
+
+        self.series = series
+        self.update()
+
+    def paintEvent(self, event):
+        """Draws the range of round-trip times of each column.
+
+        Args:
+            event (:obj:`QPaintEvent`): Paint event.
+        """
+
+        painter = QtGui.QPainter(self)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(Qt.white)
+        painter.drawRoundedRect(QtCore.QRectF(self.rect()), 5, 5)
+        metrics = painter.fontMetrics()
+        plot = self.rect().adjusted(self.margin,
+                                    self.margin + metrics.height(),
+                                    -self.margin,
+                                    -self.margin - metrics.height())
+        painter.setPen(Qt.black)
+        if self.series is None or len(self.series) == 0:
+            painter.drawText(self.rect(), Qt.AlignCenter, "No replies")
+            return
+        columns = self.series.Get_Columns(plot.width())
+        highest = max(high for _, high in columns)
+        if highest <= 0:
+            highest = 1.0
+        scale = plot.height() / (highest * 1.1)
+        step = plot.width() / len(columns)
+
+        # One vertical stroke per column, from its minimum to its maximum
+        points = []
+        for index, (low, high) in enumerate(columns):
+            x = plot.left() + index * step
+            points.append(QtCore.QPointF(x, plot.bottom() - high * scale))
+            points.append(QtCore.QPointF(x, plot.bottom() - low * scale))
+        painter.setPen(QtGui.QPen(QtGui.QColor(191, 64, 64), 1))
+        painter.drawPolyline(QtGui.QPolygonF(points))
+
+        painter.setPen(Qt.gray)
+        painter.drawLine(plot.bottomLeft(), plot.bottomRight())
+        painter.setPen(Qt.black)
+        painter.drawText(self.margin, self.margin + metrics.ascent(),
+                         "max %.3f ms" % highest)
+        painter.drawText(self.margin,
+                         self.height() - self.margin - metrics.descent(),
+                         "0 ms")
+        replies = "%d replies" % len(self.series)
+        painter.drawText(
+            self.width() - self.margin - metrics.width(replies),
+            self.height() - self.margin - metrics.descent(), replies)
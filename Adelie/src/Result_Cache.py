@@ -0,0 +1,262 @@
+"""
+    This module replays the output of read-only commands run again.
+
+    Users often run the same ``ls -l``, ``stat``, ``wc`` or ``md5sum`` on
+    files that did not change. When caching is enabled, the output of a
+    command whose tools are all in :attr:`Data.Pure_Tools` is kept in
+    memory and replayed at once the next time the same command runs on the
+    same files.
+
+    A result is keyed on (see :func:`Make_Key`):
+
+    * the program and arguments of each command of the pipe,
+    * the path, inode and modification time of each program,
+    * the working directory and the :data:`ENVIRONMENT` variables,
+    * the inode, mode, size, ``mtime_ns`` and ``ctime_ns`` of every
+      argument naming a file, and of the entries of the directories, the
+      working directory included for ``ls``.
+
+    The least recently used results are dropped once the outputs exceed
+    :attr:`Data.Result_Cache_Bytes`.
+
+    Example:
+        The :class:`Job_Manager.Job_Manager` looks up the commands submitted
+        with ``cache=True``::
+
+            key = Result_Cache.Make_Key([("wc", ["-l", "data"])])
+            result = Result_Cache.Get_Cache().Get(key)
+
+    Attributes:
+        ENVIRONMENT (list): Environment variables that change the output of
+            the pure tools.
+"""
+
+import collections
+import os
+import shutil
+import time
+import Data
+
+
+ENVIRONMENT = ["PATH", "LANG", "LANGUAGE", "LC_ALL", "LC_COLLATE",
+               "LC_CTYPE", "LC_MESSAGES", "LC_NUMERIC", "LC_TIME", "TZ",
+               "COLUMNS", "BLOCK_SIZE", "BLOCKSIZE", "LS_COLORS",
+               "POSIXLY_CORRECT", "QUOTING_STYLE", "TIME_STYLE"]
+
+_cache = None
+
+
+def Get_Cache():
+    """Returns the result cache shared by the pages, creates it on first
+    use.
+
+    Returns:
+        :class:`Result_Cache`: The result cache.
+    """
+
+    global _cache
+    if _cache is None:
+        _cache = Result_Cache()
+    return _cache
+
+
+def Is_Pure(program, arguments):
+    """Checks if a command only reads its files.
+
+    Args:
+        program (:obj:`str`): Program of the command.
+        arguments (:obj:`list` of ``str``): Arguments of the command.
+
+    Returns:
+        :obj:`bool`: ``True`` if the tool is in :attr:`Data.Pure_Tools` and
+        no argument is one of its :attr:`Data.Impure_Options`.
+    """
+
+    if program not in Data.Pure_Tools:
+        return False
+    for option in Data.Impure_Options.get(program, []):
+        for argument in arguments:
+            if option.startswith("--"):
+                if argument == option or argument.startswith(option + "="):
+                    return False
+            # Short options can be grouped, -lR
+            elif (argument.startswith("-") and not argument.startswith("--")
+                  and option[1] in argument[1:]):
+                return False
+    return True
+
+
+def File_State(path):
+    """Returns the state of a file, of a directory and of its entries.
+
+    Args:
+        path (:obj:`str`): Path of the file.
+
+    Returns:
+        :obj:`tuple`: Inode, mode, size, ``mtime_ns`` and ``ctime_ns`` of
+        the file, followed by the name and the same state of each entry of
+        a directory. ``None`` if the file does not exist. ``ctime_ns``
+        changes with the permissions, owner and links ``stat`` and ``ls
+        -l`` print.
+    """
+
+    try:
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    state = (stat.st_ino, stat.st_mode, stat.st_size, stat.st_mtime_ns,
+             stat.st_ctime_ns)
+    if not os.path.isdir(path):
+        return state
+    try:
+        entries = []
+        with os.scandir(path) as directory:
+            for entry in directory:
+                entry_stat = entry.stat(follow_symlinks=False)
+                entries.append((entry.name, entry_stat.st_ino,
+                                entry_stat.st_mode, entry_stat.st_size,
+                                entry_stat.st_mtime_ns,
+                                entry_stat.st_ctime_ns))
+    except OSError:
+        return None
+    return state + tuple(sorted(entries))
+
+
+def Make_Key(stages, cwd=None, environ=None):
+    """Returns the key of the result of a command.
+
+    Every argument that names an existing file is part of the key, the
+    arguments that do not are keyed as missing files so the key changes
+    once they are created.
+
+    Args:
+        stages (:obj:`list` of ``tuple``): Program and list of arguments of
+            each command of the pipe.
+        cwd (:obj:`str`): Working directory of the command, defaults to the
+            current directory.
+        environ (:obj:`dict`): Environment of the command, defaults to
+            ``os.environ``.
+
+    Returns:
+        :obj:`tuple`: The key, ``None`` if the command can not be cached.
+    """
+
+    if stages == [] or not all(Is_Pure(program, arguments)
+                               for program, arguments in stages):
+        return None
+    cwd = cwd if cwd is not None else os.getcwd()
+    environ = environ if environ is not None else os.environ
+    programs = []
+    files = []
+    # ls lists the working directory when it has no file argument
+    if any(program == "ls" for program, _ in stages):
+        files.append(File_State(cwd))
+    for program, arguments in stages:
+        path = shutil.which(program, path=environ.get("PATH"))
+        if path is None:
+            return None
+        programs.append((path, File_State(path)))
+        for argument in arguments:
+            files.append(File_State(os.path.join(cwd, argument)))
+    return (tuple((program, tuple(arguments)) for program, arguments
+                  in stages),
+            cwd,
+            tuple((name, environ.get(name)) for name in ENVIRONMENT),
+            tuple(programs),
+            tuple(files))
+
+
+class Result():
+    """Output and exit codes of a command.
+
+    Args:
+        exit_code (:obj:`int`): Exit code of the pipe.
+        exit_codes (:obj:`list` of ``int``): Exit code of each command.
+        chunks (:obj:`list` of ``tuple``): ``(error, data)`` of each chunk
+            read, ``error`` is ``True`` for the standard error.
+
+    Attributes:
+        exit_code (:obj:`int`): See Args.
+        exit_codes (:obj:`list` of ``int``): See Args.
+        chunks (:obj:`list` of ``tuple``): See Args.
+        size (:obj:`int`): Size of the chunks in bytes.
+        time (:obj:`float`): Time the command ran.
+    """
+
+    def __init__(self, exit_code, exit_codes, chunks):
+        self.exit_code = exit_code
+        self.exit_codes = list(exit_codes)
+        self.chunks = chunks
+        self.size = sum(len(data) for _, data in chunks)
+        self.time = time.time()
+
+
+class Result_Cache():
+    """Results of commands, the least recently used are dropped first.
+
+    Args:
+        limit (:obj:`int`): Maximum size of the outputs kept. Defaults to
+            :attr:`Data.Result_Cache_Bytes`.
+
+    Attributes:
+        limit (:obj:`int`): See Args.
+        results (:obj:`OrderedDict`): Contains the key and the
+            :class:`Result`, the least recently used first.
+        size (:obj:`int`): Size of the outputs kept.
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit if limit is not None else Data.Result_Cache_Bytes
+        self.results = collections.OrderedDict()
+        self.size = 0
+
+    def Get(self, key):
+        """Returns the result of a command.
+
+        Args:
+            key (:obj:`tuple`): Key returned by :func:`Make_Key`.
+
+        Returns:
+            :class:`Result`: The result, ``None`` if it is not cached.
+        """
+
+        if key is None or key not in self.results:
+            return None
+        self.results.move_to_end(key)
+        return self.results[key]
+
+    def Put(self, key, result):
+        """Keeps the result of a command.
+
+        Args:
+            key (:obj:`tuple`): Key returned by :func:`Make_Key`.
+            result (:class:`Result`): Result, it is not kept if it is
+                larger than :attr:`limit`.
+        """
+
+        self.Remove(key)
+        if result.size > self.limit:
+            return
+        self.results[key] = result
+        self.size += result.size
+        while self.size > self.limit:
+            _, oldest = self.results.popitem(last=False)
+            self.size -= oldest.size
+
+    def Remove(self, key):
+        """Forgets the result of a command.
+
+        Args:
+            key (:obj:`tuple`): Key returned by :func:`Make_Key`.
+        """
+
+        result = self.results.pop(key, None)
+        if result is not None:
+            self.size -= result.size
+
+    def Clear(self):
+        """Forgets every result.
+        """
+
+        self.results.clear()
+        self.size = 0
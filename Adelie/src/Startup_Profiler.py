@@ -0,0 +1,191 @@
+"""
+    This module measures where Adelie's launch time goes.
+
+    It is disabled unless the ``ADELIE_PROFILE`` environment variable is set
+    to the path of the report, ``-`` writes the report to the standard
+    error. When disabled every function returns at once and
+    :func:`Profiled` leaves the decorated function untouched.
+
+    Startup phases are recorded with :func:`Phase` (a context manager) or
+    :func:`Profiled` (a decorator), nested phases are allowed::
+
+        with Startup_Profiler.Phase("qt_import"):
+            from PyQt5 import QtWidgets
+
+    The report is written by :func:`Write_Report` as JSON::
+
+        {"version": 1, "total_ms": ..., "subprocesses": ...,
+         "peak_rss_kb": ..., "phases": [{"name": ..., "depth": ...,
+         "start_ms": ..., "duration_ms": ..., "subprocesses": ...}]}
+
+    Note:
+        Subprocesses are counted with an audit hook, processes started by
+        ``QProcess`` are not seen by Python and are not counted.
+
+    Attributes:
+        REPORT_VERSION (int): Version of the report format.
+        ENABLED (bool): ``True`` if ``ADELIE_PROFILE`` is set.
+"""
+
+import functools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+
+
+REPORT_VERSION = 1
+ENABLED = bool(os.environ.get("ADELIE_PROFILE"))
+
+_start = time.perf_counter()
+_lock = threading.Lock()
+_phases = []
+_stack = []
+_subprocesses = 0
+
+
+def _Audit(event, args):
+    """Counts the subprocesses spawned by Python.
+
+    Args:
+        event (:obj:`str`): Audit event name.
+        args (:obj:`tuple`): Audit event arguments.
+    """
+
+    global _subprocesses
+    if event in ("subprocess.Popen", "os.posix_spawn", "os.spawn"):
+        with _lock:
+            _subprocesses += 1
+
+
+if ENABLED:
+    sys.addaudithook(_Audit)
+
+
+def Elapsed():
+    """Returns the time elapsed since the profiler was imported.
+
+    Returns:
+        :obj:`float`: Milliseconds.
+    """
+
+    return (time.perf_counter() - _start) * 1000
+
+
+class Phase():
+    """Records a startup phase, used as a context manager.
+
+    Args:
+        name (:obj:`str`): Phase name.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.record = None
+
+    def __enter__(self):
+        if not ENABLED:
+            return self
+        # Phases entered from worker threads are not nested
+        main = threading.current_thread() is threading.main_thread()
+        self.record = {
+                        "name": self.name,
+                        "depth": len(_stack) if main else 0,
+                        "start_ms": round(Elapsed(), 3),
+                        "duration_ms": None,
+                        "subprocesses": _subprocesses
+                        }
+        with _lock:
+            _phases.append(self.record)
+        if main:
+            _stack.append(self.record)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.record is None:
+            return False
+        record = self.record
+        record["duration_ms"] = round(Elapsed() - record["start_ms"], 3)
+        record["subprocesses"] = _subprocesses - record["subprocesses"]
+        if _stack != [] and _stack[-1] is record:
+            _stack.pop()
+        return False
+
+
+def Profiled(name):
+    """Decorator that records each call of a function as a phase.
+
+    Args:
+        name (:obj:`str`): Phase name.
+
+    Returns:
+        :obj:`callable`: The decorator, it returns the function unchanged
+        when the profiler is disabled.
+    """
+
+    def Decorator(function):
+        if not ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def Wrapper(*args, **kwargs):
+            with Phase(name):
+                return function(*args, **kwargs)
+        return Wrapper
+    return Decorator
+
+
+def Get_Peak_RSS():
+    """Returns the peak resident set size of Adelie.
+
+    Returns:
+        :obj:`int`: Kilobytes.
+    """
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    if sys.platform == "darwin":
+        peak //= 1024
+    return peak
+
+
+def Get_Report():
+    """Returns the startup report.
+
+    Returns:
+        :obj:`dict`: See the module documentation.
+    """
+
+    with _lock:
+        phases = [dict(phase) for phase in _phases]
+    return {
+            "version": REPORT_VERSION,
+            "total_ms": round(Elapsed(), 3),
+            "subprocesses": _subprocesses,
+            "peak_rss_kb": Get_Peak_RSS(),
+            "phases": phases
+            }
+
+
+def Write_Report():
+    """Writes the startup report to the path in ``ADELIE_PROFILE``.
+
+    Does nothing if the profiler is disabled. An unwritable path is
+    reported on the standard error, Adelie keeps running.
+    """
+
+    if not ENABLED:
+        return
+    report = json.dumps(Get_Report(), indent=2)
+    path = os.environ["ADELIE_PROFILE"]
+    if path == "-":
+        print(report, file=sys.stderr)
+        return
+    try:
+        with open(path, "w", encoding="utf8") as report_file:
+            report_file.write(report + "\n")
+    except OSError as error:
+        print("Adelie: can not write the startup report:", error,
+              file=sys.stderr)
@@ -0,0 +1,104 @@
+"""
+    This module decodes the output of a process as it is read.
+
+    ``QProcess`` hands out whatever bytes are available, a chunk can end in
+    the middle of a multibyte character or of a line. Decoding each chunk on
+    its own drops or breaks those characters, :class:`Stream_Decoder` keeps
+    an incremental decoder per stream instead so the characters cut between
+    two chunks are decoded once the rest arrives.
+
+    The decoder reads the ``QByteArray`` returned by ``QProcess`` through a
+    ``memoryview``, the data is not copied to ``bytes`` first.
+
+    Example:
+        One decoder is used per process and per channel::
+
+            decoder = Stream_Decoder()
+            text = decoder.Decode(process.readAllStandardOutput())
+            # Once the process finished
+            text = decoder.Flush()
+"""
+
+import codecs
+
+
+class Stream_Decoder():
+    """Decodes a stream of bytes chunk by chunk.
+
+    :meth:`Decode` returns all the text decoded so far, for terminals that
+    print the output exactly as it is received. :meth:`Read_Lines` only
+    returns complete lines and keeps the last partial line until its new
+    line arrives, for readers that parse the output line by line.
+
+    Args:
+        encoding (:obj:`str`): Encoding of the stream.
+        errors (:obj:`str`): Handling of invalid bytes, see
+            :func:`codecs.decode`.
+
+    Attributes:
+        decoder (:obj:`codecs.IncrementalDecoder`): Keeps the bytes of an
+            incomplete character between two chunks.
+        tail (:obj:`str`): Partial line kept by :meth:`Read_Lines`.
+    """
+
+    def __init__(self, encoding="utf8", errors="replace"):
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors)
+        self.tail = ""
+
+    def Reset(self):
+        """Forgets the state of the previous stream.
+        """
+
+        self.decoder.reset()
+        self.tail = ""
+
+    def Decode(self, data, final=False):
+        """Decodes a chunk of the stream.
+
+        Args:
+            data (:obj:`QByteArray`): Chunk read from the process, any object
+                supporting the buffer protocol.
+            final (:obj:`bool`): ``True`` at the end of the stream, an
+                incomplete character is then decoded as invalid.
+
+        Returns:
+            :obj:`str`: Text of the complete characters.
+        """
+
+        return self.decoder.decode(memoryview(data), final)
+
+    def Read_Lines(self, data, final=False):
+        """Decodes a chunk of the stream and returns its complete lines.
+
+        Args:
+            data (:obj:`QByteArray`): Chunk read from the process.
+            final (:obj:`bool`): ``True`` at the end of the stream, the last
+                line is then returned even without a new line.
+
+        Returns:
+            :obj:`str`: The complete lines, each ending with a new line,
+            empty if no line was completed.
+        """
+
+        text = self.decoder.decode(memoryview(data), final)
+        if self.tail != "":
+            text = self.tail + text
+        if final:
+            self.tail = ""
+            return text
+        end = text.rfind("\n") + 1
+        if end == len(text):
+            self.tail = ""
+            return text
+        self.tail = text[end:]
+        return text[:end]
+
+    def Flush(self):
+        """Ends the stream, the decoder can then read a new stream.
+
+        Returns:
+            :obj:`str`: Text still held by the decoder, an incomplete
+            character is returned as invalid.
+        """
+
+        return self.Read_Lines(b"", final=True)
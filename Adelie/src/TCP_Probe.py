@@ -0,0 +1,363 @@
+"""
+    This module measures the time to connect to a TCP port.
+
+    Many networks drop ICMP, ``ping`` then reports a loss while the services
+    of the host answer. :class:`TCP_Ping` connects to a port of the target
+    instead, the time between the ``connect()`` and the answer of the host
+    is the round-trip time of the ``SYN`` and its ``SYN-ACK``. The
+    connection is reset at once, no data is sent and the service never sees
+    a request.
+
+    Each attempt is a non-blocking socket watched by a ``QSocketNotifier``,
+    no process or thread is started and thousands of attempts can wait at
+    the same time, for one target or for a :mod:`Ping_Sweep` of many.
+
+    :class:`TCP_Ping` prints lines like ``ping``, the ping page and
+    :mod:`Ping_Stats` read them like the output of ``ping``::
+
+        Connected to 127.0.0.1 port 22: seq=1 time=0.061 ms
+        From 127.0.0.1 port 23: seq=2 Connection refused
+
+    A refused connection is counted as lost, the host answered but the
+    service is down.
+
+    Example:
+        Connecting three times to a local web server::
+
+            ping = TCP_Ping("127.0.0.1", port=8080, count=3)
+            ping.output_ready.connect(print)
+            ping.Start()
+
+        The module can also be run like ``ping``::
+
+            python TCP_Probe.py -p 8080 -c 3 127.0.0.1
+
+        :func:`Get_Command` returns this command line, the
+        :mod:`History_View` runs it again as a job.
+
+    Attributes:
+        DEFAULT_PORT (int): Port connected to when none is given.
+        RESET (bytes): ``SO_LINGER`` value closing a connection with a
+            reset, the local port is free again at once instead of waiting
+            in ``TIME_WAIT``.
+"""
+
+import errno
+import os
+import signal
+import socket
+import struct
+import sys
+import time
+from PyQt5.QtCore import QCoreApplication, QSocketNotifier, QTimer
+from PyQt5.QtNetwork import QAbstractSocket, QHostInfo
+from ICMP_Engine import (ADAPTIVE_INTERVAL, ICMP_Ping, Format_Time, MAXWAIT,
+                         MIN_INTERVAL)
+
+
+DEFAULT_PORT = 80
+RESET = struct.pack("ii", 1, 0)
+
+
+def Parse_Arguments(arguments):
+    """Reads the arguments of a TCP ping, the options of ``ping`` and
+    ``-p`` for the port.
+
+    Args:
+        arguments (:obj:`list` of ``str``): For example
+            ``["-p", "443", "-c", "3", "example.com"]``.
+
+    Returns:
+        :obj:`tuple`: The target and a :obj:`dict` of the keyword arguments
+        of :class:`TCP_Ping`.
+
+    Raises:
+        ValueError: An option is not supported, a value is invalid or the
+            target is missing.
+    """
+
+    options = {}
+    names = {"-p": ("port", int), "-c": ("count", int), "-t": ("ttl", int),
+             "-i": ("interval", float), "-W": ("timeout", float)}
+    target = None
+    arguments = list(arguments)
+    while arguments != []:
+        argument = arguments.pop(0)
+        if argument == "-A":
+            options["adaptive"] = True
+        elif argument == "-s":
+            raise ValueError("tcp ping: -s is not supported, no data is "
+                             "sent")
+        elif argument in names:
+            if arguments == []:
+                raise ValueError("tcp ping: option requires an argument -- "
+                                 "'%s'" % argument[1])
+            name, kind = names[argument]
+            options[name] = kind(arguments.pop(0))
+        elif argument.startswith("-"):
+            raise ValueError("tcp ping: invalid option -- '%s'"
+                             % argument[1:])
+        else:
+            target = argument
+    if target is None:
+        raise ValueError("tcp ping: usage error: Destination address "
+                         "required")
+    if options.get("count", 1) < 1:
+        raise ValueError("tcp ping: invalid argument: '%d': out of range: "
+                         "1 <= value <= 9223372036854775807"
+                         % options["count"])
+    if options.get("interval", MIN_INTERVAL) < MIN_INTERVAL:
+        raise ValueError("tcp ping: cannot flood, minimal interval for "
+                         "user must be >= 2 ms, use -i 0.002 (or higher)")
+    if not 1 <= options.get("port", DEFAULT_PORT) <= 65535:
+        raise ValueError("tcp ping: invalid port")
+    if not 1 <= options.get("ttl", 1) <= 255:
+        raise ValueError("tcp ping: invalid ttl")
+    return target, options
+
+
+class TCP_Ping(ICMP_Ping):
+    """Connects to a port of a target again and again, like ``ping``.
+
+    The counts, timers and summary are those of
+    :class:`ICMP_Engine.ICMP_Ping`, only the requests differ.
+
+    Args:
+        target (:obj:`str`): Host name or address.
+        port (:obj:`int`): Port connected to.
+        count (:obj:`int`): Number of connections, ``None`` until stopped.
+        ttl (:obj:`int`): Time to live, ``None`` for the system default.
+        adaptive (:obj:`bool`): ``True`` to connect again as soon as the
+            host answers, at most every
+            :attr:`ICMP_Engine.ADAPTIVE_INTERVAL`.
+        interval (:obj:`float`): Seconds between two connections.
+        timeout (:obj:`float`): Seconds a connection waits for the host.
+        parent (:obj:`QObject`): Parent object.
+
+    Attributes:
+        port (:obj:`int`): See Args.
+        family (:obj:`int`): Address family of the target, ``None`` until
+            it is resolved.
+        waiting (:obj:`dict`): Contains the sequence number of each
+            connection waiting for the host, and its socket, its notifier,
+            the time it started and its deadline.
+        timeout_timer (:obj:`QTimer`): Drops the connections past their
+            deadline.
+    """
+
+    def __init__(self, target, port=DEFAULT_PORT, count=None, ttl=None,
+                 adaptive=False, interval=1.0, timeout=MAXWAIT, parent=None):
+        super(TCP_Ping, self).__init__(target, count, 0, ttl, adaptive,
+                                       interval, timeout, parent)
+        self.port = port
+        self.family = None
+        self.timeout_timer = QTimer(self)
+        self.timeout_timer.setInterval(100)
+        self.timeout_timer.timeout.connect(self.Expire_Connections)
+
+    def Host_Found(self, info):
+        """Connects for the first time once the target is resolved.
+
+        Args:
+            info (:obj:`QHostInfo`): Addresses of the target.
+        """
+
+        if self.finished:
+            return
+        addresses = info.addresses()
+        if info.error() != QHostInfo.NoError or addresses == []:
+            self.Write("tcp ping: %s: %s" % (self.target, info.errorString()))
+            self.Finish(2)
+            return
+        # IPv4 first, like ping
+        addresses.sort(key=lambda address: address.protocol()
+                       != QAbstractSocket.IPv4Protocol)
+        self.address = addresses[0].toString()
+        if addresses[0].protocol() == QAbstractSocket.IPv4Protocol:
+            self.family = socket.AF_INET
+        else:
+            self.family = socket.AF_INET6
+        self.Write("TCP PING %s (%s) port %d." % (self.target, self.address,
+                                                  self.port))
+        self.start_time = time.monotonic()
+        self.Send_Next()
+
+    def Send_Next(self):
+        """Starts the next connection and schedules the one after.
+        """
+
+        if self.finished or (self.count is not None
+                             and self.sent >= self.count):
+            return
+        self.sent += 1
+        self.last_send = time.monotonic()
+        self.Connect(self.sent)
+        if not self.finished and (self.count is None
+                                  or self.sent < self.count):
+            self.send_timer.start(int(self.interval * 1000))
+        self.Check_Done()
+
+    def Connect(self, seq):
+        """Starts a connection, the notifier tells once the host answered.
+
+        Args:
+            seq (:obj:`int`): Sequence number of the connection.
+        """
+
+        try:
+            connection = socket.socket(self.family, socket.SOCK_STREAM)
+        except OSError as error:
+            self.Write("tcp ping: socket: %s" % error.strerror)
+            return
+        connection.setblocking(False)
+        connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, RESET)
+        if self.ttl is not None and self.family == socket.AF_INET:
+            connection.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, self.ttl)
+        elif self.ttl is not None:
+            connection.setsockopt(socket.IPPROTO_IPV6,
+                                  socket.IPV6_UNICAST_HOPS, self.ttl)
+        started = time.perf_counter()
+        code = connection.connect_ex((self.address, self.port))
+        if code not in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+            connection.close()
+            self.Connection_Done(seq, code, started)
+            return
+        notifier = QSocketNotifier(connection.fileno(),
+                                   QSocketNotifier.Write, self)
+        notifier.activated.connect(
+            lambda socket_id: self.Connection_Ready(seq))
+        self.waiting[seq] = (connection, notifier, started,
+                             started + self.timeout)
+        if not self.timeout_timer.isActive():
+            self.timeout_timer.start()
+
+    def Connection_Ready(self, seq):
+        """Reads the result of a connection once the host answered.
+
+        Args:
+            seq (:obj:`int`): Sequence number of the connection.
+        """
+
+        if seq not in self.waiting:
+            return
+        connection, _, started, _ = self.waiting[seq]
+        code = connection.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        self.Close(seq)
+        self.Connection_Done(seq, code, started)
+
+    def Connection_Done(self, seq, code, started):
+        """Prints the result of a connection.
+
+        Args:
+            seq (:obj:`int`): Sequence number of the connection.
+            code (:obj:`int`): ``errno`` of the connection, ``0`` if it
+                succeeded.
+            started (:obj:`float`): Time the connection started.
+        """
+
+        rtt = (time.perf_counter() - started) * 1000
+        if code == 0:
+            self.received += 1
+            self.rtt.Add(rtt)
+            self.Write("Connected to %s port %d: seq=%d time=%s ms" % (
+                self.address, self.port, seq, Format_Time(rtt)))
+            if self.adaptive and self.send_timer.isActive():
+                wait = ADAPTIVE_INTERVAL - (time.monotonic() - self.last_send)
+                self.send_timer.start(max(0, int(wait * 1000)))
+        else:
+            self.Write("From %s port %d: seq=%d %s" % (
+                self.address, self.port, seq, os.strerror(code)))
+        self.Check_Done()
+
+    def Expire_Connections(self):
+        """Drops the connections past their deadline, they are counted as
+        lost.
+        """
+
+        now = time.perf_counter()
+        for seq, (_, _, _, deadline) in list(self.waiting.items()):
+            if deadline <= now:
+                self.Close(seq)
+                self.Write("From %s port %d: seq=%d %s" % (
+                    self.address, self.port, seq,
+                    os.strerror(errno.ETIMEDOUT)))
+        self.Check_Done()
+
+    def Close(self, seq):
+        """Closes a connection, with a reset.
+
+        Args:
+            seq (:obj:`int`): Sequence number of the connection.
+        """
+
+        connection, notifier, _, _ = self.waiting.pop(seq)
+        notifier.setEnabled(False)
+        notifier.deleteLater()
+        connection.close()
+        if self.waiting == {}:
+            self.timeout_timer.stop()
+
+    def Stop(self):
+        """Closes the connections waiting and prints the statistics, like
+        ``Ctrl+C``.
+        """
+
+        if self.finished:
+            return
+        for seq in list(self.waiting):
+            self.Close(seq)
+        self.Finish()
+
+
+def Get_Command(arguments):
+    """Returns the command line that runs a TCP ping as a job, the
+    history runs it again from it.
+
+    Args:
+        arguments (:obj:`list` of ``str``): Arguments, see
+            :func:`Parse_Arguments`.
+
+    Returns:
+        :obj:`tuple`: Program and list of arguments for ``QProcess``.
+    """
+
+    if getattr(sys, "frozen", False):
+        module = ["--adelie-tcp-probe"]
+    else:
+        module = [os.path.abspath(__file__)]
+    return (sys.executable, module + list(arguments))
+
+
+def Main(argv):
+    """Connects to a port of a target from a terminal.
+
+    Args:
+        argv (:obj:`list` of ``str``): Arguments, see
+            :func:`Parse_Arguments`.
+
+    Returns:
+        :obj:`int`: Exit code of the ping.
+    """
+
+    try:
+        target, options = Parse_Arguments(argv)
+    except ValueError as error:
+        sys.stderr.write(str(error) + "\n")
+        return 2
+    app = QCoreApplication([sys.argv[0]])
+    ping = TCP_Ping(target, **options)
+    # The lines are read as they come when a job runs the module
+    ping.output_ready.connect(lambda line: print(line, flush=True))
+    ping.ping_finished.connect(app.exit)
+    signal.signal(signal.SIGINT, lambda signum, frame: ping.Stop())
+    # Python signal handlers only run between two Qt events
+    wake_timer = QTimer()
+    wake_timer.timeout.connect(lambda: None)
+    wake_timer.start(200)
+    # An address starts at once and may fail before the loop runs
+    QTimer.singleShot(0, ping.Start)
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(Main(sys.argv[1:]))
@@ -0,0 +1,207 @@
+"""
+    This module loads the form classes of the ``.ui`` files.
+
+    ``uic.loadUiType`` parses the ``.ui`` XML each time Adelie starts. Each
+    ``.ui`` file is instead compiled once into a Python module next to it,
+    ``GUI/ui_<name>.py``, which is then imported like any other module.
+    The generated module records the SHA-256 of the XML it was compiled
+    from, it is compiled again when the ``.ui`` file changes.
+
+    The frozen build compiles every ``.ui`` file while building, see
+    :func:`Compile_All` and ``main.spec``.
+
+    Attributes:
+        GUI_DIR (str): Directory that contains the ``.ui`` files.
+        PREFIX (str): Prefix of the generated modules names.
+"""
+
+import hashlib
+import importlib
+import os
+import py_compile
+import sys
+import tempfile
+import xml.etree.ElementTree as ElementTree
+import Startup_Profiler
+
+
+CURRENT_DIR = os.path.dirname(os.path.realpath(__file__))
+GUI_DIR = os.path.join(CURRENT_DIR, "GUI")
+PREFIX = "ui_"
+
+
+def Get_Module_Name(ui_filename):
+    """Returns the name of the module generated for a ``.ui`` file.
+
+    Args:
+        ui_filename (:obj:`str`): Path of the ``.ui`` file.
+
+    Returns:
+        :obj:`str`: Module name, e.g. ``GUI.ui_Ping``.
+    """
+
+    name = os.path.splitext(os.path.basename(ui_filename))[0]
+    return "GUI." + PREFIX + name
+
+
+def Get_Module_Path(ui_filename):
+    """Returns the path of the module generated for a ``.ui`` file.
+
+    Args:
+        ui_filename (:obj:`str`): Path of the ``.ui`` file.
+
+    Returns:
+        :obj:`str`: Path of the generated module.
+    """
+
+    directory, filename = os.path.split(ui_filename)
+    name = os.path.splitext(filename)[0]
+    return os.path.join(directory, PREFIX + name + ".py")
+
+
+def Get_Hash(ui_filename):
+    """Returns the SHA-256 of a ``.ui`` file.
+
+    Args:
+        ui_filename (:obj:`str`): Path of the ``.ui`` file.
+
+    Returns:
+        :obj:`str`: Hexadecimal digest.
+    """
+
+    with open(ui_filename, "rb") as ui_file:
+        return hashlib.sha256(ui_file.read()).hexdigest()
+
+
+def Compile_Ui(ui_filename):
+    """Compiles a ``.ui`` file into its Python module.
+
+    The module is written to a temporary file then renamed, an interrupted
+    compilation can not leave a broken module behind. Its bytecode is
+    written at the same time.
+
+    Args:
+        ui_filename (:obj:`str`): Path of the ``.ui`` file.
+
+    Returns:
+        :obj:`str`: Path of the generated module.
+    """
+
+    from PyQt5 import uic
+
+    widget = ElementTree.parse(ui_filename).getroot().find("widget")
+    module_path = Get_Module_Path(ui_filename)
+    directory = os.path.dirname(module_path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf8") as module_file:
+            uic.compileUi(ui_filename, module_file)
+            module_file.write("\n\n# Generated by UI_Loader, do not edit\n")
+            module_file.write("ui_hash = %r\n" % Get_Hash(ui_filename))
+            module_file.write("form_class = Ui_%s\n" % widget.get("name"))
+            module_file.write("base_class = QtWidgets.%s\n"
+                              % widget.get("class"))
+        os.replace(tmp_path, module_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    # The bytecode of the previous module may look up to date, it is
+    # replaced now so the next launch does not compile the module either
+    py_compile.compile(module_path)
+    return module_path
+
+
+def Compile_All(gui_dir=GUI_DIR):
+    """Compiles every ``.ui`` file whose module is missing or stale.
+
+    Args:
+        gui_dir (:obj:`str`): Directory that contains the ``.ui`` files.
+
+    Returns:
+        :obj:`list` of ``str``: Names of the generated modules.
+    """
+
+    modules = []
+    for filename in sorted(os.listdir(gui_dir)):
+        if not filename.endswith(".ui"):
+            continue
+        ui_filename = os.path.join(gui_dir, filename)
+        if Is_Stale(ui_filename):
+            Compile_Ui(ui_filename)
+        modules.append(Get_Module_Name(ui_filename))
+    return modules
+
+
+def Is_Stale(ui_filename):
+    """Returns True if the module of a ``.ui`` file must be compiled again.
+
+    Args:
+        ui_filename (:obj:`str`): Path of the ``.ui`` file.
+
+    Returns:
+        :obj:`bool`: ``True`` if the module is missing or was compiled from
+        a different ``.ui`` file.
+    """
+
+    try:
+        with open(Get_Module_Path(ui_filename), "r",
+                  encoding="utf8") as module_file:
+            content = module_file.read()
+    except OSError:
+        return True
+    return ("ui_hash = %r\n" % Get_Hash(ui_filename)) not in content
+
+
+def Load_Ui_Type(ui_filename):
+    """Returns the form class and the base class of a ``.ui`` file.
+
+    Drop-in replacement of ``uic.loadUiType``. The generated module is
+    imported, it is compiled first if it is missing or stale. If it can not
+    be written (read only installation) the ``.ui`` file is parsed with
+    ``uic.loadUiType``.
+
+    Args:
+        ui_filename (:obj:`str`): Path of the ``.ui`` file.
+
+    Returns:
+        :obj:`tuple`: ``(form_class, base_class)``.
+    """
+
+    with Startup_Profiler.Phase("ui " + os.path.basename(ui_filename)):
+        return Import_Ui_Type(ui_filename)
+
+
+def Import_Ui_Type(ui_filename):
+    """Imports the generated module of a ``.ui`` file, see
+    :func:`Load_Ui_Type`.
+
+    Args:
+        ui_filename (:obj:`str`): Path of the ``.ui`` file.
+
+    Returns:
+        :obj:`tuple`: ``(form_class, base_class)``.
+    """
+
+    module_name = Get_Module_Name(ui_filename)
+    # The frozen build bundles the modules compiled by main.spec
+    if getattr(sys, "frozen", False):
+        module = importlib.import_module(module_name)
+        return module.form_class, module.base_class
+    try:
+        module = importlib.import_module(module_name)
+        if module.ui_hash != Get_Hash(ui_filename):
+            Compile_Ui(ui_filename)
+            module = importlib.reload(module)
+    except (ImportError, AttributeError):
+        try:
+            Compile_Ui(ui_filename)
+        except OSError:
+            from PyQt5 import uic
+            return uic.loadUiType(ui_filename)
+        sys.modules.pop(module_name, None)
+        importlib.invalidate_caches()
+        module = importlib.import_module(module_name)
+    except OSError:
+        from PyQt5 import uic
+        return uic.loadUiType(ui_filename)
+    return module.form_class, module.base_class
@@ -1,7 +1,10 @@
 
 from PyQt5 import QtCore, QtGui, QtWidgets, QtWidgets
 from PyQt5.QtCore import pyqtSignal, pyqtSlot, QObject, QProcess, Qt
-from PyQt5 import uic
+import UI_Loader
+import Startup_Profiler
+import Data
+import History_Store
 from PyQt5.QtWidgets import  QFileDialog
 from CronTab_Options_Logic import CronTab_Options_Logic
 import subprocess
@@ -14,7 +17,7 @@ CURRENT_DIR = os.path.dirname(os.path.realpath(__file__))
 PARENT_DIR = os.path.dirname(CURRENT_DIR)
 GUI_DIR = os.path.join(CURRENT_DIR, "GUI")
 ui_filename = os.path.join(GUI_DIR, "ifconfig.ui")
-baseUIClass, baseUIWidget = uic.loadUiType(ui_filename)
+baseUIClass, baseUIWidget = UI_Loader.Load_Ui_Type(ui_filename)
 
 
 class ifconfig_Logic(baseUIWidget, baseUIClass):
@@ -80,23 +83,24 @@ class ifconfig_Logic(baseUIWidget, baseUIClass):
     +"|1{0,1}[0-9]){0,1}[0-9])\.){3,3}(25[0-5]|(2[0-4]|1{0,1}[0-9]){0,1}"
     +"[0-9]))(?=\s|$)")
 
-    process = QProcess()
-    IPV4_process = QProcess()
-    restart_process = QProcess()
-    netmask_process = QProcess()
-    interface_status_process = QProcess()
-
     send_output = pyqtSignal(str)
     send_command = pyqtSignal(str)
-    flush_process = QProcess()
 
     active_interfaces = {}
 
     prev_item = ""
 
+    @Startup_Profiler.Profiled("ifconfig_Logic")
     def __init__(self, parent=None):
         super(ifconfig_Logic, self).__init__(parent)
         self.setupUi(self)
+        self.process = QProcess(self)
+        self.IPV4_process = QProcess(self)
+        self.restart_process = QProcess(self)
+        self.netmask_process = QProcess(self)
+        self.interface_status_process = QProcess(self)
+        self.flush_process = QProcess(self)
+        self.output_terminal.setMaximumBlockCount(Data.Scrollback_Lines)
         self.setWindowFlags(
                             QtCore.Qt.WindowCloseButtonHint
                             | QtCore.Qt.WindowMinimizeButtonHint)
@@ -401,7 +405,7 @@ class ifconfig_Logic(baseUIWidget, baseUIClass):
     def Print_Command(self, str):
         """
             This method prints the command on the command history
-            ``command_history``
+            ``command_history`` and records it in the :mod:`History_Store`.
 
         Args:
             str (:obj:`str`): Command to be printed on ``command_history``.
@@ -412,6 +416,8 @@ class ifconfig_Logic(baseUIWidget, baseUIClass):
         """
 
         self.command_history.append(str)
+        if str != "clear":
+            History_Store.Get_Store().Add("ifconfig", str)
 
     def Print_On_Terminal(self, str):
         """ This methods prints the process output on
@@ -1,6 +1,9 @@
 from PyQt5 import QtCore, QtGui, QtWidgets, QtWidgets
 from PyQt5.QtCore import pyqtSignal, pyqtSlot, QObject, QProcess, Qt
-from PyQt5 import uic
+import UI_Loader
+import Startup_Profiler
+import Data
+import History_Store
 from PyQt5.QtWidgets import  QFileDialog, QTableWidgetItem
 from CronTab_Options_Logic import CronTab_Options_Logic
 import subprocess
@@ -14,7 +17,7 @@ CURRENT_DIR = os.path.dirname(os.path.realpath(__file__))
 PARENT_DIR = os.path.dirname(CURRENT_DIR)
 GUI_DIR = os.path.join(CURRENT_DIR, "GUI")
 ui_filename = os.path.join(GUI_DIR, "iwconfig.ui")
-baseUIClass, baseUIWidget = uic.loadUiType(ui_filename)
+baseUIClass, baseUIWidget = UI_Loader.Load_Ui_Type(ui_filename)
 
 class iwconfig_Logic(baseUIWidget, baseUIClass):
     """Provides a UI for the ``iwconfig`` utility.
@@ -72,22 +75,23 @@ class iwconfig_Logic(baseUIWidget, baseUIClass):
     """    
 
    
-    iwconfig_process = QProcess()
-    essid_process = QProcess()
-    freq_process = QProcess()
-    mode_process = QProcess()
-    ap_process = QProcess()
-    flush_process = QProcess()
-    restart_process = QProcess()
-
     send_output = pyqtSignal(str)
     send_command = pyqtSignal(str)
 
     wireless_interfaces = {}
 
+    @Startup_Profiler.Profiled("iwconfig_Logic")
     def __init__(self, parent=None):
         super(iwconfig_Logic, self).__init__(parent)
         self.setupUi(self)
+        self.iwconfig_process = QProcess(self)
+        self.essid_process = QProcess(self)
+        self.freq_process = QProcess(self)
+        self.mode_process = QProcess(self)
+        self.ap_process = QProcess(self)
+        self.flush_process = QProcess(self)
+        self.restart_process = QProcess(self)
+        self.output_terminal.setMaximumBlockCount(Data.Scrollback_Lines)
         self.setWindowFlags(
                             QtCore.Qt.WindowCloseButtonHint
                             | QtCore.Qt.WindowMinimizeButtonHint)
@@ -253,7 +257,8 @@ class iwconfig_Logic(baseUIWidget, baseUIClass):
         self.output_terminal.appendPlainText(str)
 
     def Print_Command(self, str):
-        """This method prints the command on the command history.
+        """This method prints the command on the command history and
+        records it in the :mod:`History_Store`.
 
         Args:
             str (:obj:`str`): Command to be printed on the command history
@@ -261,6 +266,8 @@ class iwconfig_Logic(baseUIWidget, baseUIClass):
         """        
 
         self.command_history.append(str)
+        if str != "clear":
+            History_Store.Get_Store().Add("iwconfig", str)
 
     def Configure_Changes(self):
         """
@@ -1,15 +1,17 @@
 
 from PyQt5 import QtCore, QtGui, QtWidgets, QtWidgets
 from PyQt5.QtCore import pyqtSignal, pyqtSlot, QObject, QProcess, Qt
-from PyQt5 import uic
+import UI_Loader
+import Startup_Profiler
 from PyQt5 import QtGui
 from PyQt5.QtWidgets import  QFileDialog
 
 from GNU_Logic import GNU_Logic
-from Ping_UI_Logic import Ping_UI_Logic
-from ifconfig_Logic import ifconfig_Logic
-from iwconfig_Logic import iwconfig_Logic
-from netstat_Logic import netstat_Logic
+from Job_Table import Job_Table
+from History_View import History_View
+import Job_Manager
+import History_Store
+import importlib
 import sys
 import os.path
 
@@ -20,18 +22,48 @@ GUI_DIR = os.path.join(CURRENT_DIR, "GUI")
 
 ui_filename = os.path.join(GUI_DIR, "main_window.ui")
 
-baseUIClass, baseUIWidget = uic.loadUiType(ui_filename)
+baseUIClass, baseUIWidget = UI_Loader.Load_Ui_Type(ui_filename)
 
 
 class main_window_logic(baseUIWidget, baseUIClass):
     """
         Main container of the applications
 
+        The network tools pages are created the first time they are shown,
+        their modules are not even imported before. Launching Adelie only
+        builds the GNU Core Utilities page.
+
+        Args:
+            prewarm (:obj:`bool`): If ``True`` the pages that are not shown
+                are created one by one once the window is displayed.
+
         Attributes:
             GNU_Logic (:class:`GNU_Logic`): The GNU Core Utilities interface.
+            ping_widget (:class:`Ping_UI_Logic.Ping_UI_Logic`): Ping
+                interface, ``None`` until it is shown.
+            ifconfig_widget (:class:`ifconfig_Logic.ifconfig_Logic`):
+                ifconfig interface, ``None`` until it is shown.
+            iwconfig_widget (:class:`iwconfig_Logic.iwconfig_Logic`):
+                iwconfig interface, ``None`` until it is shown.
+            netstat_widget (:class:`netstat_Logic.netstat_Logic`): netstat
+                interface, ``None`` until it is shown.
+            pages (:obj:`dict`): Contains the page attribute and the module
+                and class that create it.
+            job_table (:class:`Job_Table`): Jobs of every page, ``None``
+                until it is shown.
+            history_view (:class:`History_View`): Commands of every page,
+                ``None`` until it is shown.
     """    
 
-    def __init__(self, parent=None):
+    pages = {
+            "ping_widget": ("Ping_UI_Logic", "Ping_UI_Logic"),
+            "ifconfig_widget": ("ifconfig_Logic", "ifconfig_Logic"),
+            "iwconfig_widget": ("iwconfig_Logic", "iwconfig_Logic"),
+            "netstat_widget": ("netstat_Logic", "netstat_Logic"),
+            }
+
+    @Startup_Profiler.Profiled("main_window_logic")
+    def __init__(self, parent=None, prewarm=False):
 
         super(main_window_logic, self).__init__(parent)
         self.setupUi(self)
@@ -45,57 +77,109 @@ class main_window_logic(baseUIWidget, baseUIClass):
         self.actionIwconfig.triggered.connect(self.Show_Iwconfig_Logic)
         self.actionNetstat.triggered.connect(self.Show_Netstat_Logic)
         self.actionGNU_Core_Utilities.triggered.connect(self.Show_GNU_Widgets)
+        self.actionJob_Table.triggered.connect(self.Show_Job_Table)
+        self.actionHistory.triggered.connect(self.Show_History)
 
         self.GNU_Logic = GNU_Logic()
         layout = self.centralWidget()
         layout.setContentsMargins(0, 0, 0, 0)
         self.stackedWidget.addWidget(self.GNU_Logic)
-        self.stackedWidget.setCurrentIndex(0)
         self.stackedWidget.setCurrentWidget(self.GNU_Logic)
 
-        self.ping_widget = Ping_UI_Logic()
-        self.stackedWidget.addWidget(self.ping_widget)
-        
-        self.ifconfig_widget = ifconfig_Logic()
-        self.stackedWidget.addWidget(self.ifconfig_widget)
+        for page in self.pages:
+            setattr(self, page, None)
+        self.job_table = None
+        self.history_view = None
+        self.prewarm = prewarm
+
+    def showEvent(self, event):
+        """Starts pre-warming the pages once the window is displayed.
+
+        Args:
+            event (:obj:`QShowEvent`): Show event.
+        """
+
+        super(main_window_logic, self).showEvent(event)
+        if self.prewarm:
+            self.prewarm = False
+            QtCore.QTimer.singleShot(0, self.Prewarm_Pages)
+
+    def Prewarm_Pages(self):
+        """Creates the next page that is not created yet.
+
+        One page is created per call, the event loop runs between pages so
+        the window stays responsive.
+        """
+
+        for page in self.pages:
+            if getattr(self, page) is None:
+                self.Get_Page(page)
+                QtCore.QTimer.singleShot(0, self.Prewarm_Pages)
+                return
+
+    def Get_Page(self, page):
+        """Returns a network tool page, creates it on first use.
 
-        self.iwconfig_widget = iwconfig_Logic()
-        self.stackedWidget.addWidget(self.iwconfig_widget)
+        Args:
+            page (:obj:`str`): Page attribute, see :attr:`pages`.
+
+        Returns:
+            :obj:`QWidget`: The page.
+        """
 
-        self.netstat_widget = netstat_Logic()
-        self.stackedWidget.addWidget(self.netstat_widget)
+        widget = getattr(self, page)
+        if widget is None:
+            module_name, class_name = self.pages[page]
+            with Startup_Profiler.Phase("import " + module_name):
+                module = importlib.import_module(module_name)
+            widget = getattr(module, class_name)()
+            self.stackedWidget.addWidget(widget)
+            setattr(self, page, widget)
+        return widget
 
     def Show_GNU_Widgets(self):
         """Displays the GNU Core Utilities GUI.
         """ 
-        self.stackedWidget.setCurrentIndex(0)
         self.stackedWidget.setCurrentWidget(self.GNU_Logic)
 
     def Show_Ifconfig_Logic(self):
         """Displays ifconfig GUI
         """
-        self.stackedWidget.setCurrentIndex(1)
-        self.stackedWidget.setCurrentWidget(self.ifconfig_widget)
+        self.stackedWidget.setCurrentWidget(self.Get_Page("ifconfig_widget"))
 
     def Show_Iwconfig_Logic(self):
         """Displays iwconfig GUI
         """
-        self.stackedWidget.setCurrentIndex(2)
-        self.stackedWidget.setCurrentWidget(self.iwconfig_widget)
+        self.stackedWidget.setCurrentWidget(self.Get_Page("iwconfig_widget"))
 
     def Show_Netstat_Logic(self):
         """Displays netstat GUI
         """
-        self.stackedWidget.setCurrentIndex(3)
-        self.stackedWidget.setCurrentWidget(self.netstat_widget)
+        self.stackedWidget.setCurrentWidget(self.Get_Page("netstat_widget"))
 
     def Show_Ping_Widgets(self):
         """Displays Ping GUI
         """
-        self.stackedWidget.setCurrentIndex(4)
-        self.stackedWidget.setCurrentWidget(self.ping_widget)
+        self.stackedWidget.setCurrentWidget(self.Get_Page("ping_widget"))
+
+    def Show_Job_Table(self):
+        """Displays the jobs of every page.
+        """
+        if self.job_table is None:
+            self.job_table = Job_Table(Job_Manager.Get_Manager(), self)
+        self.job_table.show()
+        self.job_table.raise_()
+
+    def Show_History(self):
+        """Displays the commands of every page.
+        """
+        if self.history_view is None:
+            self.history_view = History_View(
+                History_Store.Get_Store(), Job_Manager.Get_Manager(),
+                {"gnu": self.GNU_Logic.Run_Job}, self)
+        self.history_view.show()
+        self.history_view.raise_()
 
-    
 
 
 
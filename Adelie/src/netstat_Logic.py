@@ -1,18 +1,22 @@
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtCore import pyqtSignal, QObject, QProcess, Qt
-from PyQt5 import uic
+import UI_Loader
+import Startup_Profiler
+import Data
+import History_Store
 from PyQt5.QtGui import QColor, QFont
 from PyQt5.QtWidgets import QTableWidgetItem, QHeaderView
 import subprocess
 import sys
 import os.path
 from CronTab_Options_Logic import CronTab_Options_Logic
+from Stream_Decoder import Stream_Decoder
 import re
 CURRENT_DIR = os.path.dirname(os.path.realpath(__file__))
 PARENT_DIR = os.path.dirname(CURRENT_DIR)
 GUI_DIR = os.path.join(CURRENT_DIR, "GUI")
 ui_filename = os.path.join(GUI_DIR, "netstat.ui")
-baseUIClass, baseUIWidget = uic.loadUiType(ui_filename)
+baseUIClass, baseUIWidget = UI_Loader.Load_Ui_Type(ui_filename)
 
 
 class netstat_Logic(baseUIWidget, baseUIClass):
@@ -26,6 +30,12 @@ class netstat_Logic(baseUIWidget, baseUIClass):
     Attributes:
         netstat_process (:obj:`QProcess`): QProcess object that is used 
             to execute the ``netstat`` processes.
+        decoders (:obj:`dict`): Assembles the output lines of each process,
+            a line split between two reads is parsed once complete.
+        output_readers (:obj:`dict`): Contains each process and the method
+            parsing its complete lines.
+        routing_headers (:obj:`int`): Header lines of the routing table
+            still to be read, ``None`` unless the routing table is shown.
         tcp_process (:obj:`QProcess`): QProcess object that is used 
             to execute the ``netstat`` TCP process.
         udp_process (:obj:`QProcess`): QProcess object that is used 
@@ -53,17 +63,19 @@ class netstat_Logic(baseUIWidget, baseUIClass):
             
     """    
 
-    netstat_process = QProcess()
     send_command = pyqtSignal(str)
     send_output = pyqtSignal(str)
-    tcp_process = QProcess()
-    udp_process = QProcess()
-    grep1 = QProcess()
-    grep2 = QProcess()
 
+    @Startup_Profiler.Profiled("netstat_Logic")
     def __init__(self, parent=None):
         super(netstat_Logic, self).__init__(parent)
         self.setupUi(self)
+        self.netstat_process = QProcess(self)
+        self.tcp_process = QProcess(self)
+        self.udp_process = QProcess(self)
+        self.grep1 = QProcess(self)
+        self.grep2 = QProcess(self)
+        self.output_terminal.setMaximumBlockCount(Data.Scrollback_Lines)
         self.setWindowFlags
         (QtCore.Qt.WindowCloseButtonHint | QtCore.Qt.WindowMinimizeButtonHint)
         # Set all tables resize contents width
@@ -71,6 +83,17 @@ class netstat_Logic(baseUIWidget, baseUIClass):
         self.grep1.setStandardOutputProcess(self.grep2)
         self.crontab_options = None
         self.label_error.hide()
+        self.routing_headers = None
+        self.decoders = {}
+        self.output_readers = {self.netstat_process: self.Netstat_Output,
+                               self.tcp_process: self.TCP_Output,
+                               self.udp_process: self.UDP_Output,
+                               self.grep2: self.Grep_Output}
+        for process in self.output_readers:
+            self.decoders[process] = Stream_Decoder()
+            process.finished.connect(
+                lambda exit_code, exit_status, process=process:
+                self.Flush_Output(process))
 # ==============================================================================
 #                       GUI SIGNALS
 # ==============================================================================
@@ -117,7 +140,6 @@ class netstat_Logic(baseUIWidget, baseUIClass):
                 if ``-r`` argument is present, netstat will ignore ``-t``, 
                 ``-u``
         """
-        self.Build_Table_Header("NETSTAT")
         args_list = []  # List of Arguments added
         # Clear Table, required if -r is add,
         # netstat ignores other arguments with it
@@ -129,6 +151,12 @@ class netstat_Logic(baseUIWidget, baseUIClass):
         if self.routing_checkbox.isChecked():
             # Routing table
             args_list.append("-r")
+            # The title and the column names come first
+            self.routing_headers = 2
+            self.Build_Table_Header("ROUTING")
+        else:
+            self.routing_headers = None
+            self.Build_Table_Header("NETSTAT")
         if self.numeric_address_checkbox.isChecked():
             # Numeric Address
             args_list.append("-n")
@@ -163,7 +191,7 @@ class netstat_Logic(baseUIWidget, baseUIClass):
                 return
             self.crontab_options.Start_Job("netstat " + " ".join(args_list))
 
-    def Netstat_Output(self):
+    def Netstat_Output(self, data=None):
 
         """
             Reads netstat result using :obj:`.netstat_process`
@@ -172,23 +200,45 @@ class netstat_Logic(baseUIWidget, baseUIClass):
             Emits the signal :obj:`.send_output` which is connected to 
             :meth:`.Print_On_Terminal` Then the output is is displayed
             on the ``output_terminal``
+
+            Args:
+                data (:obj:`str`): Complete lines to parse, ``None`` to
+                    read them from the process.
         """
+
+        if data is None:
+            output = self.netstat_process.readAllStandardOutput()
+            data = self.decoders[self.netstat_process].Read_Lines(output)
+        if data == "":
+            return
+        if self.routing_headers is None:
+            self.send_output.emit(data[:-1])
+            return
         # Read Routing table line by line and add it to Routing Table
-        if self.routing_checkbox.isChecked():
-            self.Build_Table_Header("ROUTING")
-            for counter in range(2):
-                header = self.netstat_process.readLine()
-                self.send_output.emit(bytes(header).decode("utf8"))
-            while self.netstat_process.canReadLine():
-                line = self.netstat_process.readLine()
-                data = bytes(line).decode("utf8")
-                data = data.split()
-                self.send_output.emit("\t".join(item for item in data))
-                self.Add_Row_Routing_Table(data)
-
-        output = self.netstat_process.readAllStandardOutput()
-        data = bytes(output).decode("utf8")
-        self.send_output.emit(data)
+        for line in data.splitlines():
+            if self.routing_headers > 0:
+                self.routing_headers -= 1
+                self.send_output.emit(line)
+                continue
+            row = line.split()
+            self.send_output.emit("\t".join(row))
+            self.Add_Row_Routing_Table(row)
+
+    def Flush_Output(self, process):
+        """
+            Parses the last line of the output of a process when it
+            finishes, if it did not end with a new line, then resets its
+            decoder for the next run.
+
+            Args:
+                process (:obj:`QProcess`): Finished process.
+        """
+
+        decoder = self.decoders[process]
+        data = decoder.Flush()
+        decoder.Reset()
+        if data != "":
+            self.output_readers[process](data + "\n")
 
     def Print_On_Terminal(self, str):
         """ Prints on output terminal.
@@ -201,7 +251,8 @@ class netstat_Logic(baseUIWidget, baseUIClass):
         self.output_terminal.appendPlainText(str)
 
     def Print_Command(self, str):
-        """Prints the executed command on command history.
+        """Prints the executed command on command history and records it
+        in the :mod:`History_Store`.
 
         Args:
             str (obj:`str`): Command to be printed on the command history
@@ -209,6 +260,8 @@ class netstat_Logic(baseUIWidget, baseUIClass):
         """        
 
         self.command_history.append(str)
+        if str != "clear":
+            History_Store.Get_Store().Add("netstat", str)
 
     def Clear_Terminal(self):
 
@@ -274,7 +327,7 @@ class netstat_Logic(baseUIWidget, baseUIClass):
             # TCP process prints its result on netstat_table
             self.tcp_process.start("netstat", ['-t'])
 
-    def UDP_Output(self):
+    def UDP_Output(self, data=None):
 
         """After ``netstat -u`` is executed this method adds
             the UDP process result the ``netstat_table``.
@@ -287,17 +340,23 @@ class netstat_Logic(baseUIWidget, baseUIClass):
             this method reads that table and adds the data to
             netstat_table
 
+            Args:
+                data (:obj:`str`): Complete lines to parse, ``None`` to
+                    read them from the process.
+
             See Also:
                 :meth:`.TCP_OUTPUT`
         """
 
-        output = self.udp_process.readAllStandardOutput()
-
-        data = bytes(output).decode("utf8").strip()
+        if data is None:
+            output = self.udp_process.readAllStandardOutput()
+            data = self.decoders[self.udp_process].Read_Lines(output)
         # Split the found data line by line
-        data_by_line = data.split('\n')
+        data_by_line = data.splitlines()
         for line in data_by_line:
             # For each line in the result of netstat -u execution
+            if line.strip() == "":
+                continue
             if(line == "Active Internet connections (w/o servers)"):
                 # Unnecessary, remove
                 continue
@@ -310,7 +369,7 @@ class netstat_Logic(baseUIWidget, baseUIClass):
             # Add line_list to the nestat_table
             self.Add_Row_Netstat_Table(list(filter(None, line_list)))
 
-    def TCP_Output(self):
+    def TCP_Output(self, data=None):
 
         """After ``netstat -t`` is executed this method
             Adds the TCP process results to the ``netstat_table``.
@@ -324,17 +383,24 @@ class netstat_Logic(baseUIWidget, baseUIClass):
             this method reads that table and adds the data to
             ``netstat_table``.
 
+            Args:
+                data (:obj:`str`): Complete lines to parse, ``None`` to
+                    read them from the process.
+
             See Also:
                 :meth:`.UDP_OUTPUT`
         """
 
         line_list = []
-        output = self.tcp_process.readAllStandardOutput()
-        data = bytes(output).decode("utf8").strip()
+        if data is None:
+            output = self.tcp_process.readAllStandardOutput()
+            data = self.decoders[self.tcp_process].Read_Lines(output)
         # Split the found data line by line
-        data_by_line = data.split('\n')
+        data_by_line = data.splitlines()
         # For each line in the result of netstat -t execution
         for line in data_by_line:
+            if line.strip() == "":
+                continue
             # Unnecessary, remove
             if(line == "Active Internet connections (w/o servers)"):
                 continue
@@ -381,7 +447,7 @@ class netstat_Logic(baseUIWidget, baseUIClass):
             self.crontab_options.Start_Job("netstat -n -t -u | grep :"
                                            + str(port_number))
 
-    def Grep_Output(self):
+    def Grep_Output(self, data=None):
         """
             Outputs the grep process to ``netstat_table``.
 
@@ -389,14 +455,22 @@ class netstat_Logic(baseUIWidget, baseUIClass):
             :meth:`.Print_On_Terminal` Then the output is is displayed
             on the ``output_terminal``
 
+            Args:
+                data (:obj:`str`): Complete lines to parse, ``None`` to
+                    read them from the process.
         """
-        output = self.grep2.readAllStandardOutput()
-        data = bytes(output).decode("utf8").strip()
-        self.send_output.emit(data)
+        if data is None:
+            output = self.grep2.readAllStandardOutput()
+            data = self.decoders[self.grep2].Read_Lines(output)
+        if data == "":
+            return
+        self.send_output.emit(data[:-1])
         # Split the found data line by line
-        data_by_line = data.split('\n')
+        data_by_line = data.splitlines()
         # For each line in the result of netstat -t execution
         for line in data_by_line:
+            if line.strip() == "":
+                continue
             line_list = line.split(" ")
             self.Add_Row_Netstat_Table(list(filter(None, line_list)))
 
@@ -1,14 +1,24 @@
 # -*- mode: python ; coding: utf-8 -*-
 
 
+import sys
+sys.path.insert(0, 'Adelie/src')
+import UI_Loader
+
 block_cipher = None
 
+# Compile the .ui files so the frozen build never parses their XML
+ui_modules = UI_Loader.Compile_All('Adelie/src/GUI')
+# Pages imported on first use by main_window_logic
+page_modules = ['Ping_UI_Logic', 'ifconfig_Logic', 'iwconfig_Logic',
+                'netstat_Logic']
+
 
 a = Analysis(['Adelie/src/Adelie.py'],
              pathex=['Adelie/src/'],
              binaries=[],
              datas=[],
-             hiddenimports=[],
+             hiddenimports=ui_modules + page_modules,
              hookspath=[],
              runtime_hooks=[],
              excludes=[],
@@ -31,7 +41,8 @@ exe = EXE(pyz,
 
 coll = COLLECT(exe,
                a.binaries,
-               Tree('Adelie/src/GUI/',prefix='GUI'),
+               Tree('Adelie/src/GUI/',prefix='GUI',
+                    excludes=['ui_*.py', '__pycache__']),
                a.zipfiles,
                a.datas,
                strip=False,